@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from typing import Optional
+
+
+def encode_cursor(id: int) -> str:
+    """Encode position after the parsing data item into opaque cursor.
+
+    Args:
+        id: id of the last item of the page.
+
+    Returns:
+        URL-safe cursor of the next page.
+    """
+    return (
+        base64.urlsafe_b64encode(json.dumps({'id': id}).encode('utf-8'))
+        .decode('ascii')
+        .rstrip('=')
+    )
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    """Decode opaque cursor into id of the last item of the previous page.
+
+    Args:
+        cursor: cursor returned with the previous page.
+
+    Returns:
+        Id of the item or None if cursor is invalid.
+    """
+    try:
+        position = json.loads(
+            base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)),
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(position, dict) or type(position.get('id')) is not int:
+        return None
+    return position['id']
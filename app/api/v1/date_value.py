@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date
 from typing import Optional
 
 
@@ -6,7 +6,7 @@ def date_val(
     year: int,
     month: int,
     day: int,
-) -> Optional[datetime]:
+) -> Optional[date]:
     """Program for validation date."""
     if year < 1900:
         year = 1900
@@ -21,6 +21,6 @@ def date_val(
     if day > 31:
         day = 31
     try:
-        return datetime(int(year), int(month), int(day))
+        return date(int(year), int(month), int(day))
     except ValueError:
         return None
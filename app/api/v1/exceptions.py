@@ -23,3 +23,8 @@ DateError = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND,
     detail='Invalid date!',
 )
+
+CursorError = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail='Invalid cursor',
+)
@@ -1,9 +1,13 @@
-from typing import List
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.cursor import decode_cursor, encode_cursor
 from app.api.v1.date_value import date_val
 from app.api.v1.exceptions import (
+    CursorError,
     DateError,
     DealerNotFound,
     ParsedDataNotFound,
@@ -12,26 +16,42 @@ from app.api.v1.exceptions import (
 )
 from app.api.v1.schemas import (
     DealerSchema,
+    DealerStatisticsSchema,
     MenuSchema,
     MenuValidationSchema,
+    MetricsSchema,
     ProductSchema,
     ProductValidationSchema,
+    RecomendationBatchSchema,
     RecomendationSchema,
     RecomendationValidationSchema,
     StatisticsSchema,
 )
-from app.config import logger
+from app.config import CHOOSE_ATTEMPTS, MatchingEngineName, logger, settings
 from app.core.schemas import EmptySchema
-from app.ds.solution_v_2 import get_solution
+from app.database import get_session
+from app.ds.catalog import catalog_manager
+from app.ds.engines import (
+    engines,
+    find_known_solution,
+    get_solution,
+    get_solutions,
+    shadow_scorer,
+)
+from app.ds.executor import matching_executor
+from app.ds.links import link_index
+from app.ds.scoring import pruning_counters
+from app.ds.solution_v_2 import result_cache
 from app.products.dao import (
     DealerDAO,
     ParsedProductDealerDAO,
     ProductDAO,
     ProductDealerDAO,
+    RecommendationDAO,
     StatisticsDAO,
+    total_cache,
 )
 from app.products.models import ParsedProductDealer
-from app.products.utils import generate_product_dealer_key
 from app.users.dependencies import get_current_user
 from app.users.models import User
 
@@ -52,10 +72,18 @@ async def dealer_products(
     yearTo: int = 2100,
     monthTo: int = 1,
     dayTo: int = 1,
+    cursor: Optional[str] = None,
+    withTotal: bool = True,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> MenuValidationSchema:
     """Get information about all dealer's products.
 
+    Page starts after the item encoded in cursor if it is provided,
+    so every page costs the same, page number is ignored then.
+    Cursor of the next page is returned with full pages.
+    Amount of pages is not counted if total is not requested.
+
         Args:
         dealerId: id of selected dealer.
         size: amount of objects on page.
@@ -66,11 +94,20 @@ async def dealer_products(
         yearTo: maximum year of parsing.
         monthTo: maximum month of parsing.
         dayTo: maximum day of parsing.
+        cursor: nextCursor of the previous page.
+        withTotal: count amount of pages.
+        session: request session.
 
     Returns:
         Parsing data according to parameters.
     """
-    dealer = await DealerDAO.find_by_id(dealerId)
+    after_id = None
+    if cursor is not None:
+        after_id = decode_cursor(cursor)
+        if after_id is None:
+            logger.error(CursorError.detail)
+            raise CursorError
+    dealer = await DealerDAO.find_by_id(dealerId, session)
     if not dealer:
         logger.error(DealerNotFound.detail)
         raise DealerNotFound
@@ -79,53 +116,92 @@ async def dealer_products(
     if (not date_from) or (not date_to):
         logger.error(DateError.detail)
         raise DateError
+    menu = await ParsedProductDealerDAO.product_list(
+        dealer_id=dealerId,
+        limit=size,
+        page=page,
+        date_from=date_from,
+        date_to=date_to,
+        after_id=after_id,
+        with_total=withTotal,
+        session=session,
+    )
+    if menu['items'] and len(menu['items']) == size:
+        menu['next_cursor'] = encode_cursor(menu['items'][-1]['id'])
     return MenuValidationSchema(
-        **MenuSchema.model_validate(
-            await ParsedProductDealerDAO.product_list(
-                dealer_id=dealerId,
-                limit=size,
-                page=page,
-                date_from=date_from,
-                date_to=date_to,
-            ),
-        ).model_dump(),
+        **MenuSchema.model_validate(menu).model_dump(),
     )
 
 
 @router_v1.get('/dealers')
 async def get_dealers(
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> List[DealerSchema]:
     """Get all dealers.
 
+    Args:
+        session: request session.
+
     Returns:
         All dealers data.
     """
-    return await DealerDAO.find_all()
+    return await DealerDAO.find_all(session)
 
 
 @router_v1.get('/recommendations/{dealerpriceId}')
 async def get_recommendations(
     dealerpriceId: int,
     limit: int = 10,
+    strategy: Optional[MatchingEngineName] = None,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> List[RecomendationValidationSchema]:
     """Receive a number of recommendations.
 
+    Product already linked with the same dealer product is returned alone.
+    Otherwise precomputed recommendations are used when they exist
+    for the actual catalog version and no strategy is requested.
+
     Args:
         dealerprice_id: id of specific parsed data item.
         limit: maximum amount of recommendations.
+        strategy: matching engine, default engine is used if not provided.
+        session: request session.
 
     Returns:
         List of recommendation products.
     """
     parsed_data: ParsedProductDealer = await ParsedProductDealerDAO.find_by_id(
         dealerpriceId,
+        session,
     )
     if not parsed_data:
         logger.error(ParsedDataNotFound.detail)
         raise ParsedDataNotFound
-    solutions = await get_solution(str(parsed_data.product_name), limit)
+    solutions = await find_known_solution(
+        int(parsed_data.dealer_id),
+        str(parsed_data.product_name),
+        parsed_data.product_url,  # type: ignore[arg-type]
+        strategy,
+    )
+    if (
+        not solutions
+        and strategy is None
+        and limit <= settings.RECOMMENDATIONS_TOP_K
+    ):
+        solutions = await RecommendationDAO.get_recommendations(
+            dealerpriceId,
+            await catalog_manager.get_version(),
+            limit,
+            session,
+        )
+    if not solutions:
+        solutions = await get_solution(
+            str(parsed_data.product_name),
+            limit,
+            strategy=strategy,
+        )
     return [
         RecomendationValidationSchema(
             **RecomendationSchema.model_validate(solution).model_dump(),
@@ -134,76 +210,122 @@ async def get_recommendations(
     ]
 
 
+@router_v1.post('/recommendations/batch')
+async def get_batch_recommendations(
+    batch: RecomendationBatchSchema,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> Dict[int, List[RecomendationValidationSchema]]:
+    """Receive recommendations for many parsed data items at once.
+
+    Args:
+        batch: ids of parsed data items and maximum amount
+            of recommendations for each of them.
+        session: request session.
+
+    Returns:
+        Lists of recommendation products by parsed data item id.
+        Unknown ids are not included.
+    """
+    parsed_data = await ParsedProductDealerDAO.get_product_names(
+        batch.ids,
+        session,
+    )
+    solutions = await get_solutions(
+        [str(item['product_name']) for item in parsed_data],
+        batch.limit,
+        dealer_ids=[item['dealer_id'] for item in parsed_data],
+        product_urls=[item['product_url'] for item in parsed_data],
+        strategy=batch.strategy,
+    )
+    return {
+        item['id']: [
+            RecomendationValidationSchema(
+                **RecomendationSchema.model_validate(solution).model_dump(),
+            )
+            for solution in item_solutions
+        ]
+        for item, item_solutions in zip(parsed_data, solutions)
+    }
+
+
 @router_v1.patch('/recommendations/{dealerpriceId}/choose')
 async def add_product_key(
     dealerpriceId: int,
     productId: int,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> EmptySchema:
     """Choose the product from base.
 
+    Parsing data is linked in one transaction of one statement,
+    it is repeated when a concurrent choice takes the same new key.
+
     Args:
         dealerpriceId: specific parsed pada item id.
         productId: choosed product id.
+        session: request session.
 
     Returns:
         Empty responce.
     """
-    parsed_data = await ParsedProductDealerDAO.find_by_id(
-        dealerpriceId,
-    )
+    for attempt in range(1, CHOOSE_ATTEMPTS + 1):
+        try:
+            parsed_data = await ParsedProductDealerDAO.choose_product(
+                dealerpriceId,
+                productId,
+                session,
+            )
+            break
+        except IntegrityError:
+            await session.rollback()
+            if attempt == CHOOSE_ATTEMPTS:
+                raise
+            logger.warning(
+                f'Product-dealer key of parsing data {dealerpriceId} '
+                f'was taken, attempt {attempt} failed',
+            )
     if not parsed_data:
         logger.error(ParsedDataNotFound.detail)
         raise ParsedDataNotFound
-    product = await ProductDAO.find_by_id(productId)
-    if not product:
+    if parsed_data['product_id'] is None:
         logger.error(ProductNotFound.detail)
         raise ProductNotFound
-    connection = await ProductDealerDAO.find_one_or_none(
-        dealer_id=parsed_data.dealer_id,
-        product_id=productId,
+    await session.commit()
+    link_index.add(
+        parsed_data['dealer_id'],
+        parsed_data['product_name'],
+        parsed_data['product_url'],
+        productId,
     )
-    if not parsed_data.product_key:
-        await StatisticsDAO.update_success(dealerpriceId)
-    if not connection:
-        key = await generate_product_dealer_key()
-        await ProductDealerDAO.create(
-            dealer_id=parsed_data.dealer_id,
-            product_id=productId,
-            key=key,
-        )
-    else:
-        if connection.key == parsed_data.product_key:
-            return EmptySchema()
-        key = await ProductDealerDAO.get_key(
-            dealer_id=parsed_data.dealer_id,
-            product_id=productId,
-        )
-    await ParsedProductDealerDAO.update_key(id=dealerpriceId, key=key)
     return EmptySchema()
 
 
 @router_v1.patch('/recommendations/{dealerpriceId}/skip')
 async def add_skipped(
     dealerpriceId: int,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> EmptySchema:
     """Mark parsing data as skipped.
 
     Args:
         dealerpriceId: specific parsed pada item id.
+        session: request session.
 
     Returns:
         Empty responce.
     """
     parsed_data = await ParsedProductDealerDAO.find_by_id(
         dealerpriceId,
+        session,
     )
     if not parsed_data:
         logger.error(ParsedDataNotFound.detail)
         raise ParsedDataNotFound
     if not parsed_data.product_key:
-        await StatisticsDAO.update_skip(dealerpriceId)
+        await StatisticsDAO.update_skip(dealerpriceId, session)
+        await session.commit()
     return EmptySchema()
 
 
@@ -215,6 +337,7 @@ async def general_static(
     yearTo: int = 2100,
     monthTo: int = 1,
     dayTo: int = 1,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> StatisticsSchema:
     """Get statistics for all dealers.
@@ -226,6 +349,7 @@ async def general_static(
         yearTo: maximum year of parsing.
         monthTo: maximum month of parsing.
         dayTo: maximum day of parsing.
+        session: request session.
 
     Returns:
         All statistics information.
@@ -239,10 +363,51 @@ async def general_static(
         await StatisticsDAO.get_general_stat(
             date_from,
             date_to,
+            session,
         ),
     )
 
 
+@router_v1.get('/statistics/by-dealer')
+async def dealers_static(
+    yearFrom: int = 1900,
+    monthFrom: int = 1,
+    dayFrom: int = 1,
+    yearTo: int = 2100,
+    monthTo: int = 1,
+    dayTo: int = 1,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> List[DealerStatisticsSchema]:
+    """Get statistics of every dealer.
+
+        Args:
+        yearFrom: minimum year of parsing.
+        monthFrom: minimum month of parsing.
+        dayFrom: minimum day of parsing.
+        yearTo: maximum year of parsing.
+        monthTo: maximum month of parsing.
+        dayTo: maximum day of parsing.
+        session: request session.
+
+    Returns:
+        Statistics of all dealers ordered by dealer id.
+    """
+    date_from = date_val(yearFrom, monthFrom, dayFrom)
+    date_to = date_val(yearTo, monthTo, dayTo)
+    if (not date_from) or (not date_to):
+        logger.error(DateError.detail)
+        raise DateError
+    return [
+        DealerStatisticsSchema.model_validate(statistics)
+        for statistics in await StatisticsDAO.get_dealers_stat(
+            date_from,
+            date_to,
+            session,
+        )
+    ]
+
+
 @router_v1.get('/statistics/{dealerId}')
 async def dealer_static(
     dealerId: int,
@@ -252,6 +417,7 @@ async def dealer_static(
     yearTo: int = 2100,
     monthTo: int = 1,
     dayTo: int = 1,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> StatisticsSchema:
     """Get dealer statistics.
@@ -264,6 +430,7 @@ async def dealer_static(
         yearTo: maximum year of parsing.
         monthTo: maximum month of parsing.
         dayTo: maximum day of parsing.
+        session: request session.
 
     Returns:
         Statistics corresponding to provided dealer.
@@ -273,7 +440,7 @@ async def dealer_static(
     if (not date_from) or (not date_to):
         logger.error(DateError.detail)
         raise DateError
-    dealer = await DealerDAO.find_by_id(dealerId)
+    dealer = await DealerDAO.find_by_id(dealerId, session)
     if not dealer:
         logger.error(DealerNotFound.detail)
         raise DealerNotFound
@@ -282,29 +449,62 @@ async def dealer_static(
             dealerId,
             date_from,
             date_to,
+            session,
         ),
     )
 
 
+@router_v1.get('/metrics')
+async def get_metrics(
+    current_user: User = Depends(get_current_user),
+) -> MetricsSchema:
+    """Get metrics of the matching system.
+
+    Returns:
+        Matching executor queue depth and size,
+        recommendation and total cache hits and misses,
+        amounts of candidates pruned by score bounds,
+        latency of every matching engine and agreement
+        of the shadow engine with the primary one.
+    """
+    return MetricsSchema.model_validate(
+        {
+            'executor': matching_executor.metrics(),
+            'cache': result_cache.metrics(),
+            'totals': total_cache.metrics(),
+            'pruning': pruning_counters.metrics(),
+            'engines': {
+                name: engine.metrics() for name, engine in engines.items()
+            },
+            'shadow': shadow_scorer.metrics(),
+        },
+    )
+
+
 @router_v1.get('/product/{productKey}')
 async def get_product(
     productKey: int,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> ProductValidationSchema:
     """Get product information by product-dealer connection key.
 
     Args:
         productKey: product-dealer connection key.
+        session: request session.
 
     Returns:
         Product data.
     """
-    product_dealer = await ProductDealerDAO.find_one_or_none(key=productKey)
+    product_dealer = await ProductDealerDAO.find_one_or_none(
+        session,
+        key=productKey,
+    )
     if not product_dealer:
         logger.error(ProductDealerNotFound.detail)
         raise ProductDealerNotFound
     return ProductValidationSchema(
         **ProductSchema.model_validate(
-            await ProductDAO.find_by_id(product_dealer.product_id),
+            await ProductDAO.find_by_id(product_dealer.product_id, session),
         ).model_dump(),
     )
@@ -1,8 +1,9 @@
 from datetime import date as datetype
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
+from app.config import MAX_RECOMENDATION_BATCH, MatchingEngineName
 from app.core.schemas import to_snake_case
 
 
@@ -61,7 +62,8 @@ class MenuValidationSchema(BaseModel):
     items: List[ParsedProductValidationSchema]
     page: int
     size: int
-    totalPage: int
+    totalPage: Optional[int] = None
+    nextCursor: Optional[str] = None
 
 
 class MenuSchema(MenuValidationSchema):
@@ -98,9 +100,86 @@ class RecomendationSchema(RecomendationValidationSchema):
     model_config = ConfigDict(alias_generator=to_snake_case)
 
 
+class RecomendationBatchSchema(BaseModel):
+    """Schema of the batch recommendations request."""
+
+    ids: List[int] = Field(max_length=MAX_RECOMENDATION_BATCH)
+    limit: int = 10
+    strategy: Optional[MatchingEngineName] = None
+
+
 class StatisticsSchema(BaseModel):
     """Statistic schema."""
 
     QuantitySuccessfull: int
     QuantitySkipped: int
     percent: str
+
+
+class DealerStatisticsSchema(StatisticsSchema):
+    """Dealer statistic schema."""
+
+    dealerId: int
+
+
+class ExecutorMetricsSchema(BaseModel):
+    """Matching executor metrics schema."""
+
+    mode: str
+    workers: int
+    pending: int
+    maxPending: int
+    completed: int
+
+
+class CacheMetricsSchema(BaseModel):
+    """Cache metrics schema."""
+
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+
+
+class PruningMetricsSchema(BaseModel):
+    """Score bounds cascade metrics schema."""
+
+    candidates: int
+    length: int
+    histogram: int
+    heap: int
+    scored: int
+
+
+class EngineMetricsSchema(BaseModel):
+    """Matching engine metrics schema."""
+
+    calls: int
+    errors: int
+    latencyP50Ms: float
+    latencyP95Ms: float
+    latencyP99Ms: float
+
+
+class ShadowMetricsSchema(BaseModel):
+    """Shadow scoring metrics schema."""
+
+    engine: Optional[str]
+    sampleRate: float
+    pending: int
+    skipped: int
+    failed: int
+    comparisons: int
+    topAgreement: float
+    topKOverlap: float
+
+
+class MetricsSchema(BaseModel):
+    """Matching metrics schema."""
+
+    executor: ExecutorMetricsSchema
+    cache: CacheMetricsSchema
+    totals: CacheMetricsSchema
+    pruning: PruningMetricsSchema
+    engines: Dict[str, EngineMetricsSchema]
+    shadow: ShadowMetricsSchema
@@ -1,7 +1,7 @@
 import logging
 from logging.config import dictConfig
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -9,6 +9,8 @@ from typing_extensions import Literal
 
 BASE_DIR = Path(__file__).resolve().parent
 
+MatchingEngineName = Literal['solution', 'levenshtein', 'trgm', 'tfidf']
+
 
 class Settings(BaseSettings):
     """Project Settings."""
@@ -60,12 +62,37 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
 
+    DB_WARM_UP_CONNECTIONS: int = 5
+    CATALOG_CHECK_INTERVAL: int = 30
+    CATALOG_SNAPSHOT: bool = True
+    NGRAM_CANDIDATES: int = 200
+    SCORE_BOUNDS: bool = True
+    CANDIDATES_RETRIEVAL: Literal['memory', 'database'] = 'memory'
+    TRGM_SIMILARITY_THRESHOLD: float = 0.3
+    MATCHING_EXECUTOR: Literal['process', 'thread', 'inline'] = 'thread'
+    MATCHING_WORKERS: int = 2
+    MATCHING_ENGINE: MatchingEngineName = 'levenshtein'
+    SHADOW_ENGINE: Optional[MatchingEngineName] = None
+    SHADOW_SAMPLE_RATE: float = 0.1
+    RECOMMENDATIONS_TOP_K: int = 10
+    RESULT_CACHE_SIZE: int = 10000
+    RESULT_CACHE_TTL: int = 3600
+    RESULT_CACHE_DEPTH: int = 50
+    TOTAL_CACHE_SIZE: int = 10000
+    TOTAL_CACHE_TTL: int = 300
+    AUTO_MATCH_THRESHOLD: int = 95
+    AUTO_MATCH_WORKERS: int = 0
+
 
 settings = Settings()
 
 API_URL = '/api/v1'
 TOKEN_NAME = 'access_token'
 DATA_IMPORT_LOCATION = str(BASE_DIR / 'data')
+MAX_RECOMENDATION_BATCH = 500
+CHOOSE_ATTEMPTS = 3
+AUTO_MATCH_CHECKPOINT = str(BASE_DIR / 'auto_match_checkpoint.json')
+CATALOG_SNAPSHOT_LOCATION = str(BASE_DIR / 'snapshots')
 
 
 class CSVFilenames:
@@ -1,6 +1,8 @@
-from typing import Any, Dict, Generic, List, TypeVar
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, TypeVar
 
 from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.models import Base
 from app.database import async_session_maker
@@ -8,8 +10,35 @@ from app.database import async_session_maker
 Model = TypeVar('Model', bound=Base)
 
 
+@asynccontextmanager
+async def use_session(
+    session: Optional[AsyncSession] = None,
+) -> AsyncIterator[Any]:
+    """Use the provided session or open a new one.
+
+    Provided session is committed by its owner, new session
+    is committed when the block succeeds.
+
+    Args:
+        session: request session.
+
+    Yields:
+        Session executing the queries.
+    """
+    if session is not None:
+        yield session
+    else:
+        async with async_session_maker() as new_session:
+            yield new_session
+            await new_session.commit()
+
+
 class BaseDAO(Generic[Model]):
-    """Database interface."""
+    """Database interface.
+
+    Every method uses the provided session, so one request
+    checks out one connection, or opens its own session.
+    """
 
     model = Model  # type: ignore[misc]
 
@@ -17,103 +46,128 @@ class BaseDAO(Generic[Model]):
     async def find_by_id(
         cls,
         model_id: int,
+        session: Optional[AsyncSession] = None,
     ) -> Model:
         """Find an object in the database by id.
 
         Args:
             model_id: id model.
+            session: request session.
 
         Returns:
             One object from the database or None.
         """
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = select(cls.model).filter_by(id=model_id)
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def find_all(cls) -> List[Model]:
+    async def find_all(
+        cls,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Model]:
         """Find all objects of this model in the database.
 
+        Args:
+            session: request session.
+
         Returns:
             All objects of this type from the database.
         """
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = select(cls.model)
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalars().all()
 
     @classmethod
     async def find_one_or_none(
         cls,
+        session: Optional[AsyncSession] = None,
         **parameters: Any,
     ) -> Model:
         """Find an object in the database using parameters.
 
         Args:
             parameters: model parameters.
+            session: request session.
 
         Returns:
             One object from the database or None.
         """
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = select(cls.model).filter_by(**parameters)
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def create(cls, **data: Any) -> None:
+    async def create(
+        cls,
+        session: Optional[AsyncSession] = None,
+        **data: Any,
+    ) -> None:
         """Create an object in the database using the data.
 
         Args:
             data: model data.
+            session: request session.
         """
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = insert(cls.model).values(**data)
-            await session.execute(query)
-            await session.commit()
+            await db_session.execute(query)
 
     @classmethod
-    async def create_many(cls, values: List[Dict[str, Any]]) -> None:
+    async def create_many(
+        cls,
+        values: List[Dict[str, Any]],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
         """Create many objects in the database using provided values.
 
         Args:
             values: provided list of values.
+            session: request session.
         """
         if not values:
             return None
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = insert(cls.model).values(values)
-            await session.execute(query)
-            await session.commit()
+            await db_session.execute(query)
 
     @classmethod
-    async def get_ids(cls) -> List[int]:
+    async def get_ids(
+        cls,
+        session: Optional[AsyncSession] = None,
+    ) -> List[int]:
         """Find all objects of this model in the database.
 
+        Args:
+            session: request session.
+
         Returns:
             All objects of this type from the database.
         """
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = select(cls.model.id)
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalars().all()
 
     @classmethod
     async def delete(
         cls,
+        session: Optional[AsyncSession] = None,
         **parameters: Any,
     ) -> None:
         """Delete an object in the database using parameters.
 
         Args:
             parameters: model parameters.
+            session: request session.
         """
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             model_parameters = [
                 getattr(cls.model, key) == value
                 for key, value in parameters.items()
             ]
             query = delete(cls.model).where(*model_parameters)
-            await session.execute(query)
-            await session.commit()
+            await db_session.execute(query)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Response, status
+
+from app.core.schemas import ReadinessSchema
+from app.core.warm_up import readiness
+
+router_core = APIRouter(
+    prefix='/v1',
+    tags=['Service'],
+)
+
+
+@router_core.get('/ready')
+async def get_readiness(response: Response) -> ReadinessSchema:
+    """Check if worker is warmed up and ready to serve requests.
+
+    Returns:
+        Readiness and result of every warm-up step,
+        status is 503 until the worker is ready.
+    """
+    if not readiness.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessSchema.model_validate(readiness.metrics())
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic import BaseModel
 
 
@@ -17,3 +19,10 @@ def to_snake_case(string: str) -> str:
 
 class EmptySchema(BaseModel):
     """Empty response schema."""
+
+
+class ReadinessSchema(BaseModel):
+    """Worker readiness schema."""
+
+    ready: bool
+    steps: Dict[str, bool]
@@ -0,0 +1,127 @@
+import inspect
+from contextlib import AsyncExitStack
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+import sqlalchemy as sa
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.api.v1 import schemas
+from app.config import logger
+from app.database import engine
+from app.ds.catalog import catalog_manager
+from app.ds.engines import MatchingEngine
+from app.ds.executor import matching_executor
+
+WARM_UP_PRODUCT = 'Средство для удаления ленты клейкой'
+
+
+class Readiness:
+    """Warm-up state of the worker."""
+
+    def __init__(self) -> None:
+        """Create state of the worker before warm-up."""
+        self.completed = False
+        self.steps: Dict[str, bool] = {}
+
+    @property
+    def ready(self) -> bool:
+        """Check if worker is warmed up.
+
+        Returns:
+            True if warm-up is completed and all its steps succeeded.
+        """
+        return self.completed and all(self.steps.values())
+
+    async def run(
+        self,
+        step: str,
+        function: Callable[..., Any],
+        *args: Any,
+    ) -> None:
+        """Run warm-up step recording its result.
+
+        Args:
+            step: name of the step.
+            function: function or coroutine function doing the step.
+            args: arguments of the function.
+        """
+        started = perf_counter()
+        try:
+            result = function(*args)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception(f'Warm-up step {step} failed')
+            self.steps[step] = False
+            return None
+        self.steps[step] = True
+        logger.debug(
+            f'Warm-up step {step} took {perf_counter() - started:.3f} sec',
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get readiness of the worker.
+
+        Returns:
+            Readiness and result of every warm-up step.
+        """
+        return {'ready': self.ready, 'steps': dict(self.steps)}
+
+
+readiness = Readiness()
+
+
+async def open_connections(number: int) -> None:
+    """Open database connections kept by the pool for requests.
+
+    Connections are held together, so the pool opens
+    a new connection for each of them.
+
+    Args:
+        number: amount of connections.
+    """
+    async with AsyncExitStack() as stack:
+        for _ in range(number):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(sa.text('SELECT 1'))
+
+
+async def prepare_catalog(matching_engines: List[MatchingEngine]) -> None:
+    """Load catalog index and prepare engines using it.
+
+    Args:
+        matching_engines: engines serving the worker traffic.
+    """
+    catalog = await catalog_manager.load()
+    matching_executor.start(catalog)
+    for matching_engine in matching_engines:
+        if matching_engine.prepare is not None:
+            matching_engine.prepare(catalog)
+
+
+async def score_dummy_product(matching_engines: List[MatchingEngine]) -> None:
+    """Score dummy product with every engine.
+
+    Args:
+        matching_engines: engines serving the worker traffic.
+    """
+    for matching_engine in matching_engines:
+        await matching_engine.get_solution(WARM_UP_PRODUCT, 1)
+
+
+def build_schemas(app: FastAPI) -> None:
+    """Build validators of the v1 schemas and OpenAPI schema.
+
+    Args:
+        app: application instance.
+    """
+    for schema in vars(schemas).values():
+        if (
+            isinstance(schema, type)
+            and issubclass(schema, BaseModel)
+            and schema.__module__ == schemas.__name__
+        ):
+            schema.model_rebuild(force=True)
+    app.openapi()
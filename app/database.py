@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
@@ -18,3 +20,17 @@ async_session_maker = sessionmaker(
     class_=AsyncSession,  # type: ignore[call-overload]
     expire_on_commit=False,
 )
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Provide one session for the whole request.
+
+    Queries of the request share one connection checked out
+    from the pool, endpoints changing data commit the session,
+    otherwise it is rolled back when the request is finished.
+
+    Yields:
+        Request session.
+    """
+    async with async_session_maker() as session:
+        yield session
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+Value = TypeVar('Value')
+
+
+class ResultCache(Generic[Value]):
+    """Bounded cache with least recently used eviction and expiration."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Create cache.
+
+        Args:
+            maxsize: maximum amount of stored results.
+            ttl: lifetime of a result in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Tuple[float, Value]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get amount of stored results.
+
+        Returns:
+            Amount of stored results.
+        """
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Value]:
+        """Get result by key.
+
+        Args:
+            key: key of the result.
+
+        Returns:
+            Stored result or None if it is missing or expired.
+        """
+        item = self._data.get(key)
+        if item is None or item[0] < monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Value) -> None:
+        """Store result.
+
+        Args:
+            key: key of the result.
+            value: result.
+        """
+        if self.maxsize <= 0:
+            return None
+        self._data[key] = (monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all results."""
+        self._data.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get cache metrics.
+
+        Returns:
+            Size, hits and misses of the cache.
+        """
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,406 @@
+import asyncio
+from functools import cached_property
+from itertools import count
+from time import monotonic
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import CATALOG_SNAPSHOT_LOCATION, logger, settings
+from app.ds.ngram import NgramIndex
+from app.ds.normalizer import full_process, get_not_continuous_words
+from app.ds.scoring import ScoreBounds
+from app.ds.snapshot import get_current_snapshot, read_snapshot, write_snapshot
+from app.products.dao import ProductDAO
+
+CATALOG_GENERATIONS = count()
+
+
+class CatalogIndex:
+    """Manufacturer catalog prepared for matching.
+
+    Every index created in the process gets the next generation,
+    so indexes of the worker are ordered from older to newer.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        ids: List[int],
+        names: List[str],
+        names_split: List[str],
+        names_processed: Optional[List[str]] = None,
+        names_raw_processed: Optional[List[str]] = None,
+        ngrams: Optional[NgramIndex] = None,
+        snapshot: Optional[str] = None,
+    ) -> None:
+        """Create catalog index.
+
+        Processed names and n-gram index are calculated
+        unless they are loaded from a snapshot.
+
+        Args:
+            version: fingerprint of the product table.
+            ids: ids of the manufacturer products.
+            names: raw names of the manufacturer products.
+            names_split: preprocessed names of the manufacturer products.
+            names_processed: processed preprocessed names.
+            names_raw_processed: processed raw names.
+            ngrams: n-gram index of the processed names.
+            snapshot: path of the snapshot the index is loaded from.
+        """
+        self.version = version
+        self.ids = ids
+        self.names = names
+        self.names_split = names_split
+        self.snapshot = snapshot
+        self.generation = next(CATALOG_GENERATIONS)
+        self.positions = {id: position for position, id in enumerate(ids)}
+        if names_processed is None:
+            names_processed = [full_process(name) for name in names_split]
+        self.names_processed = names_processed
+        if names_raw_processed is None:
+            names_raw_processed = [full_process(name) for name in names]
+        self.names_raw_processed = names_raw_processed
+        if ngrams is None:
+            ngrams = NgramIndex(self.names_processed)
+        self.ngrams = ngrams
+
+    @cached_property
+    def bounds(self) -> ScoreBounds:
+        """Get score bounds data of the processed names.
+
+        Returns:
+            Bounds data calculated on the first use.
+        """
+        return ScoreBounds.from_choices(self.names_processed)
+
+    def __len__(self) -> int:
+        """Get amount of products in catalog.
+
+        Returns:
+            Amount of products.
+        """
+        return len(self.ids)
+
+    @classmethod
+    def from_records(
+        cls,
+        version: str,
+        records: List[Dict[str, Any]],
+    ) -> 'CatalogIndex':
+        """Build catalog index from product records.
+
+        Products are ordered by id, so ties of scores are broken
+        the same way in every worker.
+
+        Args:
+            version: fingerprint of the product table.
+            records: id and name of each manufacturer product.
+
+        Returns:
+            Catalog index.
+        """
+        records = sorted(
+            (
+                record
+                for record in records
+                if record['id'] is not None and record['name'] is not None
+            ),
+            key=lambda record: record['id'],
+        )
+        names = [str(record['name']) for record in records]
+        return cls(
+            version=version,
+            ids=[int(record['id']) for record in records],
+            names=names,
+            names_split=[get_not_continuous_words(name) for name in names],
+        )
+
+    def updated(
+        self,
+        version: str,
+        records: List[Dict[str, Any]],
+        ids: List[int],
+    ) -> 'CatalogIndex':
+        """Build catalog index with changed products.
+
+        Changed products are removed and inserted at their positions
+        by id, so the index equals the one built from all products.
+        Names of other products are not processed again.
+
+        Args:
+            version: fingerprint of the product table.
+            records: actual id and name of the changed products.
+            ids: ids of the changed products including deleted ones.
+
+        Returns:
+            Updated catalog index.
+        """
+        changed = set(ids)
+        inserted = CatalogIndex.from_records(version, records)
+        order = sorted(
+            [
+                (id, position, self)
+                for position, id in enumerate(self.ids)
+                if id not in changed
+            ]
+            + [
+                (id, position, inserted)
+                for position, id in enumerate(inserted.ids)
+            ],
+            key=lambda item: item[0],
+        )
+        mapping = np.full(len(self), -1, dtype=np.int32)
+        added = []
+        for new_position, (_, position, source) in enumerate(order):
+            if source is self:
+                mapping[position] = new_position
+            else:
+                added.append(new_position)
+        names_processed = [
+            source.names_processed[position] for _, position, source in order
+        ]
+        return CatalogIndex(
+            version=version,
+            ids=[id for id, _, _ in order],
+            names=[source.names[position] for _, position, source in order],
+            names_split=[
+                source.names_split[position] for _, position, source in order
+            ],
+            names_processed=names_processed,
+            names_raw_processed=[
+                source.names_raw_processed[position]
+                for _, position, source in order
+            ],
+            ngrams=self.ngrams.updated(names_processed, mapping, added),
+        )
+
+    @classmethod
+    def from_snapshot(cls, path: str) -> 'CatalogIndex':
+        """Load catalog index from the snapshot.
+
+        Args:
+            path: path of the snapshot file.
+
+        Returns:
+            Catalog index.
+        """
+        return cls(**read_snapshot(path))
+
+
+class CatalogManager:
+    """Keeper of the catalog index of the current worker."""
+
+    def __init__(self) -> None:
+        """Create catalog manager."""
+        self.index: Optional[CatalogIndex] = None
+        self.checked_at = 0.0
+        self.version: Optional[str] = None
+        self.listening = False
+        self.synchronized = False
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Get lock guarding catalog rebuild.
+
+        Lock is created lazily to be bound to the running event loop.
+
+        Returns:
+            Rebuild lock.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def build(self, version: Optional[str] = None) -> CatalogIndex:
+        """Load products from database and build catalog index.
+
+        Args:
+            version: already known fingerprint of the product table.
+
+        Returns:
+            New catalog index.
+        """
+        if version is None:
+            version = await ProductDAO.get_catalog_version()
+        records = await ProductDAO.get_ids_names()
+        self.index = CatalogIndex.from_records(version, records)
+        self.checked_at = monotonic()
+        self.synchronized = self.listening
+        logger.debug(
+            f'Catalog index {version} built, {len(self.index)} products',
+        )
+        return self.index
+
+    def load_snapshot(
+        self,
+        version: Optional[str] = None,
+    ) -> Optional[CatalogIndex]:
+        """Load catalog index from the current snapshot.
+
+        Args:
+            version: required fingerprint of the product table.
+
+        Returns:
+            Catalog index or None if snapshots are disabled, missing,
+            unreadable or made for another catalog version.
+        """
+        if not settings.CATALOG_SNAPSHOT:
+            return None
+        path = get_current_snapshot(CATALOG_SNAPSHOT_LOCATION)
+        if path is None:
+            return None
+        if self.index is not None and self.index.snapshot == path:
+            index = self.index
+        else:
+            try:
+                index = CatalogIndex.from_snapshot(path)
+            except (OSError, ValueError, KeyError):
+                logger.exception(f'Catalog snapshot {path} was not loaded')
+                return None
+        if version is not None and index.version != version:
+            return None
+        self.index = index
+        self.checked_at = monotonic()
+        self.synchronized = self.listening and version is not None
+        logger.debug(
+            f'Catalog index {index.version} loaded from {path}, '
+            f'{len(index)} products',
+        )
+        return index
+
+    async def save_snapshot(self, index: CatalogIndex) -> None:
+        """Write snapshot of the catalog index for other workers.
+
+        Args:
+            index: catalog index.
+        """
+        if not settings.CATALOG_SNAPSHOT:
+            return None
+        try:
+            index.snapshot = await asyncio.get_running_loop().run_in_executor(
+                None,
+                write_snapshot,
+                index,
+                CATALOG_SNAPSHOT_LOCATION,
+            )
+        except OSError:
+            logger.exception('Catalog snapshot was not written')
+
+    async def load(self) -> CatalogIndex:
+        """Load catalog index of the current product table version.
+
+        Fingerprint is checked at once, snapshot of another version
+        is not used and index is built from database then.
+
+        Returns:
+            Catalog index.
+        """
+        self.invalidate()
+        return await self.get()
+
+    async def get(self) -> CatalogIndex:
+        """Get actual catalog index.
+
+        Product table fingerprint is checked not more often than
+        CATALOG_CHECK_INTERVAL seconds. When fingerprint has changed,
+        index is loaded from the current snapshot of that version
+        or rebuilt from database.
+
+        Returns:
+            Catalog index.
+        """
+        index = self.index
+        if (
+            index is not None
+            and monotonic() - self.checked_at < settings.CATALOG_CHECK_INTERVAL
+        ):
+            return index
+        async with self.lock:
+            if self.index is not index and self.index is not None:
+                return self.index
+            version = await ProductDAO.get_catalog_version()
+            if self.index is not None and self.index.version == version:
+                self.checked_at = monotonic()
+                self.synchronized = self.listening
+                return self.index
+            index = self.load_snapshot(version)
+            if index is None:
+                index = await self.build(version)
+                await self.save_snapshot(index)
+            return index
+
+    async def get_version(self) -> str:
+        """Get fingerprint of the product table without building index.
+
+        Version of the built index is checked as by get, otherwise
+        fingerprint is read not more often than CATALOG_CHECK_INTERVAL
+        seconds.
+
+        Returns:
+            Fingerprint of the product table.
+        """
+        if self.index is not None:
+            return (await self.get()).version
+        if (
+            self.version is None
+            or monotonic() - self.checked_at >= settings.CATALOG_CHECK_INTERVAL
+        ):
+            self.version = await ProductDAO.get_catalog_version()
+            self.checked_at = monotonic()
+        return self.version
+
+    async def apply_changes(
+        self,
+        changes: List[Dict[str, Any]],
+    ) -> Optional[CatalogIndex]:
+        """Apply product changes received from database notifications.
+
+        Every change has ids of changed products, which are reloaded
+        and updated in the index in place. A listening connection
+        receives every committed change, so changes are applied even
+        when their sequence numbers have gaps or come late, numbers
+        only order the changes. Index is rebuilt when a change has
+        no ids or the index was not checked since listening started,
+        changes made while the connection was lost are missed then.
+        Fingerprint check of the product table remains the consistency
+        guarantee.
+
+        Args:
+            changes: product changes ordered by sequence number.
+
+        Returns:
+            Catalog index or None if it was not built yet.
+        """
+        async with self.lock:
+            if self.index is None or not changes:
+                if changes:
+                    self.invalidate()
+                return self.index
+            if not self.synchronized or any(
+                change['ids'] is None for change in changes
+            ):
+                logger.debug(
+                    'Product changes are incomplete, '
+                    'rebuilding catalog index',
+                )
+                return await self.build()
+            ids = sorted({id for change in changes for id in change['ids']})
+            records = await ProductDAO.get_ids_names(ids)
+            version = await ProductDAO.get_catalog_version()
+            self.index = self.index.updated(version, records, ids)
+            self.checked_at = monotonic()
+            logger.debug(
+                f'Catalog index {version} updated, {len(ids)} products '
+                'changed',
+            )
+            return self.index
+
+    def invalidate(self) -> None:
+        """Force fingerprint check on next access."""
+        self.checked_at = 0.0
+
+
+catalog_manager = CatalogManager()
@@ -0,0 +1,214 @@
+import argparse
+import json
+import random
+import sys
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import logger
+from app.ds.catalog import CatalogIndex
+from app.ds.engines import MatchingEngine
+from app.ds.engines import engines as matching_engines
+from app.products.dao import ParsedProductDealerDAO, ProductDAO
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore[assignment]
+
+BENCHMARK_QUERIES = 500
+BENCHMARK_FACTORS = '1,2,4'
+BENCHMARK_OUTPUT = 'benchmark.json'
+RECALL_DEPTHS = (1, 5, 10)
+RANDOM_SEED = 42
+
+
+def get_peak_rss() -> Optional[float]:
+    """Get peak resident set size of the process.
+
+    Returns:
+        Peak memory in megabytes or None if it is not available.
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return round(peak_rss / 1024 / 1024, 1)
+    return round(peak_rss / 1024, 1)
+
+
+def inflate_catalog(
+    records: List[Dict[str, Any]],
+    factor: int,
+) -> List[Dict[str, Any]]:
+    """Add synthetic products with names close to the real ones.
+
+    Every copy of the product drops one word of the name and gets
+    a random article, so it competes with the original product.
+
+    Args:
+        records: id and name of each manufacturer product.
+        factor: size of the inflated catalog relative to the real one.
+
+    Returns:
+        Real products followed by synthetic products.
+    """
+    randomizer = random.Random(RANDOM_SEED)
+    records = [record for record in records if record['name']]
+    next_id = max((record['id'] for record in records), default=0) + 1
+    inflated = list(records)
+    for _ in range(factor - 1):
+        for record in records:
+            words = str(record['name']).split()
+            if len(words) > 2:
+                words.pop(randomizer.randrange(len(words)))
+            words.append(f'{randomizer.randrange(1000, 9999)}')
+            inflated.append({'id': next_id, 'name': ' '.join(words)})
+            next_id += 1
+    return inflated
+
+
+async def run_engine(
+    engine: MatchingEngine,
+    catalog: CatalogIndex,
+    queries: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Measure accuracy and speed of the engine.
+
+    Args:
+        engine: matching engine from the registry.
+        catalog: index of the manufacturer products.
+        queries: dealer product names with ids of linked products.
+
+    Returns:
+        Recall, latency percentiles, throughput and peak memory.
+    """
+    if queries:
+        await engine.score(queries[0]['product_name'], catalog)
+    latencies = []
+    found = {depth: 0 for depth in RECALL_DEPTHS}
+    started = perf_counter()
+    for query in queries:
+        query_started = perf_counter()
+        solutions = await engine.score(query['product_name'], catalog)
+        latencies.append(perf_counter() - query_started)
+        ids = [item['id'] for item in solutions]
+        for depth in RECALL_DEPTHS:
+            found[depth] += query['product_id'] in ids[:depth]
+    elapsed = perf_counter() - started
+    percentiles = (
+        np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        if latencies
+        else [0.0, 0.0, 0.0]
+    )
+    result: Dict[str, Any] = {
+        f'recall{depth}': round(found[depth] / len(queries), 4)
+        if queries
+        else 0.0
+        for depth in RECALL_DEPTHS
+    }
+    result.update(
+        {
+            'latencyP50Ms': round(float(percentiles[0]), 3),
+            'latencyP95Ms': round(float(percentiles[1]), 3),
+            'latencyP99Ms': round(float(percentiles[2]), 3),
+            'throughput': round(len(queries) / elapsed, 1) if elapsed else 0,
+            'peakRssMb': get_peak_rss(),
+        },
+    )
+    return result
+
+
+async def benchmark(
+    queries_number: int = BENCHMARK_QUERIES,
+    factors: str = BENCHMARK_FACTORS,
+    engines: str = ','.join(matching_engines),
+    output: str = BENCHMARK_OUTPUT,
+) -> Dict[str, Any]:
+    """Benchmark matching engines on parsing data linked with products.
+
+    Args:
+        queries_number: maximum amount of dealer products to match.
+        factors: comma separated sizes of the catalog
+            relative to the real one.
+        engines: comma separated names of the engines, engines
+            scoring against database are run with the real catalog only.
+        output: path of the JSON file with results.
+
+    Returns:
+        Benchmark results.
+    """
+    records = await ProductDAO.get_ids_names()
+    queries = [
+        {
+            'product_name': link['product_name'],
+            'product_id': link['product_id'],
+        }
+        for link in await ParsedProductDealerDAO.get_confirmed_links()
+        if link['product_name']
+    ]
+    randomizer = random.Random(RANDOM_SEED)
+    if len(queries) > queries_number:
+        queries = randomizer.sample(queries, queries_number)
+    logger.debug(
+        f'Benchmarking on {len(queries)} linked parsing data '
+        f'and {len(records)} products',
+    )
+    results = []
+    for factor in [int(factor) for factor in factors.split(',')]:
+        build_started = perf_counter()
+        catalog = CatalogIndex.from_records(
+            f'benchmark-{factor}',
+            inflate_catalog(records, factor),
+        )
+        build_seconds = perf_counter() - build_started
+        for name in engines.split(','):
+            engine = matching_engines[name]
+            if engine.get_suitable_products is None and factor != 1:
+                logger.debug(
+                    f'Engine {name} scores products stored in database, '
+                    f'catalog of size {factor} is skipped',
+                )
+                continue
+            result = {
+                'engine': name,
+                'factor': factor,
+                'catalogSize': len(catalog),
+                'queries': len(queries),
+                'buildSeconds': round(build_seconds, 3),
+            }
+            result.update(await run_engine(engine, catalog, queries))
+            logger.debug(f'Benchmark result: {result}')
+            results.append(result)
+    report = {'createdAt': datetime.now().isoformat(), 'results': results}
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=4)
+    logger.debug(f'Benchmark results saved to {output}')
+    return report
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark matching engines.',
+    )
+    parser.add_argument('--queries', type=int, default=BENCHMARK_QUERIES)
+    parser.add_argument('--factors', default=BENCHMARK_FACTORS)
+    parser.add_argument('--engines', default=','.join(matching_engines))
+    parser.add_argument('--output', default=BENCHMARK_OUTPUT)
+    arguments = parser.parse_args()
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(
+        benchmark(
+            arguments.queries,
+            arguments.factors,
+            arguments.engines,
+            arguments.output,
+        ),
+    )
@@ -0,0 +1,23 @@
+import sys
+
+from app.config import CATALOG_SNAPSHOT_LOCATION, logger
+from app.ds.catalog import catalog_manager
+from app.ds.snapshot import write_snapshot
+
+
+async def snapshot() -> None:
+    """Write snapshot of the manufacturer catalog for app workers."""
+    catalog = await catalog_manager.build()
+    path = write_snapshot(catalog, CATALOG_SNAPSHOT_LOCATION)
+    logger.debug(
+        f'Snapshot completed, {len(catalog)} products saved to {path}',
+    )
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(snapshot())
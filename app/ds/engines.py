@@ -0,0 +1,496 @@
+import asyncio
+import random
+from collections import deque
+from time import perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+import numpy as np
+
+from app.config import logger, settings
+from app.ds import solution, solution_tfidf, solution_trgm, solution_v_2
+from app.ds.catalog import CatalogIndex
+from app.ds.normalizer import get_not_continuous_words_when_entering
+
+LATENCY_WINDOW = 1000
+SHADOW_MAX_PENDING = 4
+
+Value = TypeVar('Value')
+
+
+class MatchingEngine:
+    """Matching engine with the common interface and latency metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        get_solution: Callable[..., Awaitable[List[Dict[str, Any]]]],
+        get_solutions: Callable[..., Awaitable[List[List[Dict[str, Any]]]]],
+        find_known_solution: Callable[
+            ...,
+            Awaitable[List[Dict[str, Any]]],
+        ],
+        uses_catalog: bool = True,
+        prepare: Optional[Callable[[CatalogIndex], Any]] = None,
+        get_suitable_products: Optional[
+            Callable[[str, CatalogIndex, int, int], List[Dict[str, Any]]]
+        ] = None,
+        process_query: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        """Create engine.
+
+        Args:
+            name: name of the engine used as strategy.
+            get_solution: coroutine function recommending products
+                for one dealer product.
+            get_solutions: coroutine function recommending products
+                for many dealer products.
+            find_known_solution: coroutine function finding product
+                already linked with dealer product.
+            uses_catalog: engine uses the in-memory catalog index.
+            prepare: function preparing engine data for the catalog.
+            get_suitable_products: function scoring dealer product
+                against the catalog in the current process.
+            process_query: function preparing dealer product
+                for get_suitable_products.
+        """
+        self.name = name
+        self.get_solution = get_solution
+        self.get_solutions = get_solutions
+        self.find_known_solution = find_known_solution
+        self.uses_catalog = uses_catalog
+        self.prepare = prepare
+        self.get_suitable_products = get_suitable_products
+        self.process_query = process_query
+        self.calls = 0
+        self.errors = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    async def score(
+        self,
+        dealer_product: str,
+        catalog: CatalogIndex,
+        levenshtein_distance_max: int = 50,
+        length: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Score dealer product against the provided catalog.
+
+        Engines without get_suitable_products score against products
+        stored in database, so the catalog has to be built from them.
+
+        Args:
+            dealer_product: product sold by dealer.
+            catalog: index of the manufacturer products.
+            levenshtein_distance_max: minimal score of the product.
+            length: length of the list of recommended products.
+
+        Returns:
+            Array of matching products.
+        """
+        if self.get_suitable_products is None:
+            return await self.get_solution(
+                dealer_product,
+                length,
+                levenshtein_distance_max,
+            )
+        if self.process_query is not None:
+            dealer_product = self.process_query(dealer_product)
+        return self.get_suitable_products(
+            dealer_product,
+            catalog,
+            levenshtein_distance_max,
+            length,
+        )
+
+    async def measure(self, call: Awaitable[Value]) -> Value:
+        """Await engine call recording its latency.
+
+        Args:
+            call: awaitable call of the engine.
+
+        Returns:
+            Result of the call.
+        """
+        started = perf_counter()
+        self.calls += 1
+        try:
+            return await call
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.latencies.append(perf_counter() - started)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get engine metrics.
+
+        Returns:
+            Amounts of calls and errors, latency percentiles
+            of the last LATENCY_WINDOW calls.
+        """
+        percentiles = (
+            np.percentile(np.array(self.latencies) * 1000, [50, 95, 99])
+            if self.latencies
+            else [0.0, 0.0, 0.0]
+        )
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'latencyP50Ms': round(float(percentiles[0]), 3),
+            'latencyP95Ms': round(float(percentiles[1]), 3),
+            'latencyP99Ms': round(float(percentiles[2]), 3),
+        }
+
+
+engines: Dict[str, MatchingEngine] = {
+    engine.name: engine
+    for engine in (
+        MatchingEngine(
+            'solution',
+            solution.get_solution,
+            solution.get_solutions,
+            solution_v_2.find_known_solution,
+            get_suitable_products=solution.get_suitable_products,
+        ),
+        MatchingEngine(
+            'levenshtein',
+            solution_v_2.get_solution,
+            solution_v_2.get_solutions,
+            solution_v_2.find_known_solution,
+            get_suitable_products=solution_v_2.get_suitable_products,
+            process_query=get_not_continuous_words_when_entering,
+        ),
+        MatchingEngine(
+            'trgm',
+            solution_trgm.get_solution,
+            solution_trgm.get_solutions,
+            solution_trgm.find_known_solution,
+            uses_catalog=False,
+        ),
+        MatchingEngine(
+            'tfidf',
+            solution_tfidf.get_solution,
+            solution_tfidf.get_solutions,
+            solution_v_2.find_known_solution,
+            prepare=solution_tfidf.get_tfidf_index,
+            get_suitable_products=solution_tfidf.get_suitable_products,
+            process_query=get_not_continuous_words_when_entering,
+        ),
+    )
+}
+
+
+def get_engine(strategy: Optional[str] = None) -> MatchingEngine:
+    """Get engine by strategy.
+
+    Default engine is selected by MATCHING_ENGINE, levenshtein engine
+    retrieves candidates from database when CANDIDATES_RETRIEVAL
+    is database.
+
+    Args:
+        strategy: name of the engine, default engine is used if None.
+
+    Returns:
+        Matching engine.
+
+    Raises:
+        KeyError: engine is not registered.
+    """
+    if strategy is None:
+        strategy = settings.MATCHING_ENGINE
+        if (
+            strategy == 'levenshtein'
+            and settings.CANDIDATES_RETRIEVAL == 'database'
+        ):
+            strategy = 'trgm'
+    return engines[strategy]
+
+
+def get_configured_engines() -> List[MatchingEngine]:
+    """Get default and shadow engines of the deployment.
+
+    Returns:
+        Engines serving traffic without explicit strategy.
+    """
+    configured = [get_engine()]
+    if settings.SHADOW_ENGINE is not None:
+        configured.append(get_engine(settings.SHADOW_ENGINE))
+    return configured
+
+
+class ShadowScorer:
+    """Secondary engine scoring sampled traffic in background.
+
+    Its results are never returned, only latency and agreement
+    of the top-k products with the primary engine are recorded.
+    """
+
+    def __init__(self) -> None:
+        """Create shadow scorer."""
+        self.tasks: Set[asyncio.Task[None]] = set()
+        self.skipped = 0
+        self.failed = 0
+        self.comparisons = 0
+        self.top_agreements = 0
+        self.overlap = 0.0
+
+    def submit(
+        self,
+        primary: MatchingEngine,
+        solutions: List[List[Dict[str, Any]]],
+        dealer_products: List[str],
+        length: int,
+        levenshtein_distance_max: int,
+        dealer_ids: Optional[List[int]] = None,
+        product_urls: Optional[List[Optional[str]]] = None,
+    ) -> None:
+        """Score sampled request with shadow engine in background.
+
+        Request is skipped when SHADOW_MAX_PENDING shadow tasks
+        are already running, so shadow scoring never piles up.
+
+        Args:
+            primary: engine answering the request.
+            solutions: recommendations of the primary engine.
+            dealer_products: products sold by dealers.
+            length: length of the list of recommended products.
+            levenshtein_distance_max: minimal score of the product.
+            dealer_ids: ids of dealers selling the products.
+            product_urls: urls of the dealer products.
+        """
+        if (
+            settings.SHADOW_ENGINE is None
+            or settings.SHADOW_ENGINE == primary.name
+            or random.random() >= settings.SHADOW_SAMPLE_RATE
+        ):
+            return None
+        if len(self.tasks) >= SHADOW_MAX_PENDING:
+            self.skipped += 1
+            return None
+        task = asyncio.create_task(
+            self.compare(
+                get_engine(settings.SHADOW_ENGINE),
+                solutions,
+                dealer_products,
+                length,
+                levenshtein_distance_max,
+                dealer_ids,
+                product_urls,
+            ),
+        )
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def compare(
+        self,
+        engine: MatchingEngine,
+        solutions: List[List[Dict[str, Any]]],
+        dealer_products: List[str],
+        length: int,
+        levenshtein_distance_max: int,
+        dealer_ids: Optional[List[int]] = None,
+        product_urls: Optional[List[Optional[str]]] = None,
+    ) -> None:
+        """Score request with shadow engine and compare results.
+
+        Args:
+            engine: shadow engine.
+            solutions: recommendations of the primary engine.
+            dealer_products: products sold by dealers.
+            length: length of the list of recommended products.
+            levenshtein_distance_max: minimal score of the product.
+            dealer_ids: ids of dealers selling the products.
+            product_urls: urls of the dealer products.
+        """
+        try:
+            if dealer_ids is None and len(dealer_products) == 1:
+                shadow_solutions = [
+                    await engine.measure(
+                        engine.get_solution(
+                            dealer_products[0],
+                            length,
+                            levenshtein_distance_max,
+                        ),
+                    ),
+                ]
+            else:
+                shadow_solutions = await engine.measure(
+                    engine.get_solutions(
+                        dealer_products,
+                        length,
+                        levenshtein_distance_max,
+                        dealer_ids,
+                        product_urls,
+                    ),
+                )
+        except Exception:
+            self.failed += 1
+            logger.exception(f'Shadow engine {engine.name} failed')
+            return None
+        for primary_solution, shadow_solution in zip(
+            solutions,
+            shadow_solutions,
+        ):
+            self.record(primary_solution, shadow_solution)
+
+    def record(
+        self,
+        primary_solution: List[Dict[str, Any]],
+        shadow_solution: List[Dict[str, Any]],
+    ) -> None:
+        """Record agreement of two recommendation lists.
+
+        Args:
+            primary_solution: recommendations of the primary engine.
+            shadow_solution: recommendations of the shadow engine.
+        """
+        ids = [product['id'] for product in primary_solution]
+        shadow_ids = [product['id'] for product in shadow_solution]
+        self.comparisons += 1
+        self.top_agreements += ids[:1] == shadow_ids[:1]
+        if ids:
+            self.overlap += len(set(ids) & set(shadow_ids)) / len(ids)
+        else:
+            self.overlap += not shadow_ids
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get shadow scoring metrics.
+
+        Returns:
+            Shadow engine, sample rate, amounts of running, skipped
+            and failed tasks, amount of compared recommendation lists,
+            share of equal top products and mean share of primary
+            top-k products found by shadow engine.
+        """
+        return {
+            'engine': settings.SHADOW_ENGINE,
+            'sampleRate': settings.SHADOW_SAMPLE_RATE,
+            'pending': len(self.tasks),
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'comparisons': self.comparisons,
+            'topAgreement': round(
+                self.top_agreements / self.comparisons
+                if self.comparisons
+                else 0.0,
+                4,
+            ),
+            'topKOverlap': round(
+                self.overlap / self.comparisons if self.comparisons else 0.0,
+                4,
+            ),
+        }
+
+
+shadow_scorer = ShadowScorer()
+
+
+async def find_known_solution(
+    dealer_id: int,
+    dealer_product: str,
+    product_url: Optional[str],
+    strategy: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Find manufacturer product already linked with dealer product.
+
+    Args:
+        dealer_id: id of dealer selling the product.
+        dealer_product: product sold by dealer.
+        product_url: url of the dealer product.
+        strategy: name of the engine, default engine is used if None.
+
+    Returns:
+        Linked product with top score or empty array.
+    """
+    return await get_engine(strategy).find_known_solution(
+        dealer_id,
+        dealer_product,
+        product_url,
+    )
+
+
+async def get_solution(
+    dealer_product: str,
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+    strategy: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Get recommendations with engine selected by strategy.
+
+    Sampled requests are also scored by the shadow engine.
+
+    Args:
+        dealer_product: product sold by dealer,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: minimal score of the product,
+        strategy: name of the engine, default engine is used if None.
+
+    Returns:
+        array of matching products in descending order of score.
+    """
+    engine = get_engine(strategy)
+    suitable_products = await engine.measure(
+        engine.get_solution(dealer_product, length, levenshtein_distance_max),
+    )
+    shadow_scorer.submit(
+        engine,
+        [suitable_products],
+        [dealer_product],
+        length,
+        levenshtein_distance_max,
+    )
+    return suitable_products
+
+
+async def get_solutions(
+    dealer_products: List[str],
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+    dealer_ids: Optional[List[int]] = None,
+    product_urls: Optional[List[Optional[str]]] = None,
+    strategy: Optional[str] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Get recommendations for many dealer products with selected engine.
+
+    Sampled requests are also scored by the shadow engine.
+
+    Args:
+        dealer_products: products sold by dealers,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: minimal score of the product,
+        dealer_ids: ids of dealers selling the products,
+        product_urls: urls of the dealer products,
+        strategy: name of the engine, default engine is used if None.
+
+    Returns:
+        arrays of matching products for every dealer product.
+    """
+    engine = get_engine(strategy)
+    solutions = await engine.measure(
+        engine.get_solutions(
+            dealer_products,
+            length,
+            levenshtein_distance_max,
+            dealer_ids,
+            product_urls,
+        ),
+    )
+    shadow_scorer.submit(
+        engine,
+        solutions,
+        dealer_products,
+        length,
+        levenshtein_distance_max,
+        dealer_ids,
+        product_urls,
+    )
+    return solutions
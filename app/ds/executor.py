@@ -0,0 +1,279 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import logger, settings
+from app.ds.catalog import CatalogIndex
+
+worker_catalog: Optional[CatalogIndex] = None
+
+
+def init_worker(
+    version: str,
+    ids: List[int],
+    names: List[str],
+    snapshot: Optional[str] = None,
+) -> None:
+    """Build catalog index once in a child process.
+
+    Catalog snapshot is loaded when it is available, so the child
+    process shares n-gram postings with other workers and does not
+    process names again.
+
+    Args:
+        version: fingerprint of the product table.
+        ids: ids of the manufacturer products.
+        names: raw names of the manufacturer products.
+        snapshot: path of the catalog snapshot.
+    """
+    global worker_catalog
+    if snapshot is not None:
+        try:
+            worker_catalog = CatalogIndex.from_snapshot(snapshot)
+            return None
+        except (OSError, ValueError, KeyError):
+            logger.exception(f'Catalog snapshot {snapshot} was not loaded')
+    worker_catalog = CatalogIndex.from_records(
+        version,
+        [{'id': id, 'name': name} for id, name in zip(ids, names)],
+    )
+
+
+def call_with_worker_catalog(
+    function: Callable[..., Any],
+    version: Optional[str] = None,
+    snapshot: Optional[str] = None,
+) -> Any:
+    """Call matching function with catalog of the child process.
+
+    Catalog of another version is replaced with the provided snapshot
+    first, previous catalog is used if the snapshot is not loaded.
+
+    Args:
+        function: matching function accepting catalog argument.
+        version: fingerprint of the catalog used by the pool.
+        snapshot: path of the snapshot of that catalog.
+
+    Returns:
+        Result of the matching function.
+    """
+    global worker_catalog
+    if (
+        snapshot is not None
+        and worker_catalog is not None
+        and worker_catalog.version != version
+    ):
+        try:
+            worker_catalog = CatalogIndex.from_snapshot(snapshot)
+        except (OSError, ValueError, KeyError):
+            logger.exception(f'Catalog snapshot {snapshot} was not loaded')
+    return function(catalog=worker_catalog)
+
+
+def warm_up() -> None:
+    """Do nothing, used to start child processes in advance."""
+
+
+class MatchingExecutor:
+    """Executor running CPU-bound matching outside the event loop.
+
+    MATCHING_EXECUTOR setting selects the mode:
+    process - pool of processes, each holding its own catalog index;
+    thread - pool of threads, useful as scorer releases the GIL;
+    inline - matching is done in the event loop.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        """Create executor.
+
+        Args:
+            mode: executor mode overriding MATCHING_EXECUTOR setting.
+            workers: amount of workers overriding MATCHING_WORKERS setting.
+        """
+        self._mode = mode
+        self._workers = workers
+        self.pool: Optional[Executor] = None
+        self.version: Optional[str] = None
+        self.snapshot: Optional[str] = None
+        self.generation = -1
+        self._lock: Optional[asyncio.Lock] = None
+        self.pending = 0
+        self.max_pending = 0
+        self.completed = 0
+
+    @property
+    def mode(self) -> str:
+        """Get executor mode.
+
+        Returns:
+            Executor mode.
+        """
+        return self._mode or settings.MATCHING_EXECUTOR
+
+    @property
+    def workers(self) -> int:
+        """Get amount of workers.
+
+        Returns:
+            Amount of workers.
+        """
+        return self._workers or settings.MATCHING_WORKERS
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Get lock guarding catalog change of the pool.
+
+        Lock is created lazily to be bound to the running event loop.
+
+        Returns:
+            Catalog change lock.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def start(self, catalog: Optional[CatalogIndex] = None) -> None:
+        """Create pool and start its workers.
+
+        Args:
+            catalog: catalog index to load into child processes.
+        """
+        self.shutdown()
+        if self.mode == 'thread':
+            self.pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix='matching',
+            )
+        elif self.mode == 'process' and catalog is not None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(
+                    catalog.version,
+                    catalog.ids,
+                    catalog.names,
+                    catalog.snapshot,
+                ),
+            )
+            for _ in range(self.workers):
+                self.pool.submit(warm_up)
+            self.use(catalog)
+        logger.debug(
+            f'Matching executor started in {self.mode} mode '
+            f'with {self.workers} workers',
+        )
+
+    def shutdown(self) -> None:
+        """Stop pool workers."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+        self.pool = None
+        self.version = None
+        self.snapshot = None
+        self.generation = -1
+
+    def use(self, catalog: CatalogIndex) -> None:
+        """Remember catalog used by child processes.
+
+        Args:
+            catalog: catalog index.
+        """
+        self.version = catalog.version
+        self.snapshot = catalog.snapshot
+        self.generation = catalog.generation
+
+    async def switch(self, catalog: CatalogIndex) -> None:
+        """Make child processes use newer catalog.
+
+        Requests holding an older catalog do not switch the pool back,
+        they are served with the newer one. Catalog with a snapshot is
+        loaded by running child processes on their next call, the pool
+        is restarted only for catalog without snapshot.
+
+        Args:
+            catalog: catalog index of the request.
+        """
+        async with self.lock:
+            if self.pool is not None and catalog.generation <= self.generation:
+                return None
+            if self.pool is None or catalog.snapshot is None:
+                self.start(catalog)
+            else:
+                self.use(catalog)
+                logger.debug(
+                    f'Matching executor switched to catalog {catalog.version} '
+                    f'from {catalog.snapshot}',
+                )
+
+    async def run(
+        self,
+        catalog: CatalogIndex,
+        function: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Run matching function with catalog argument.
+
+        Args:
+            catalog: actual catalog index.
+            function: matching function accepting catalog argument.
+            args: positional arguments of the function.
+            kwargs: keyword arguments of the function.
+
+        Returns:
+            Result of the matching function.
+        """
+        call = partial(function, *args, **kwargs)
+        if self.mode == 'inline':
+            return call(catalog=catalog)
+        if self.mode == 'process':
+            if self.pool is None or catalog.generation > self.generation:
+                await self.switch(catalog)
+            task = partial(
+                call_with_worker_catalog,
+                call,
+                self.version,
+                self.snapshot,
+            )
+        else:
+            if self.pool is None:
+                self.start()
+            task = partial(call, catalog=catalog)
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.pool,
+                task,
+            )
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get executor metrics.
+
+        Returns:
+            Mode, size and queue depth of the executor.
+        """
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'pending': self.pending,
+            'maxPending': self.max_pending,
+            'completed': self.completed,
+        }
+
+
+matching_executor = MatchingExecutor()
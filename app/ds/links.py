@@ -0,0 +1,293 @@
+import asyncio
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import logger, settings
+from app.ds.catalog import CatalogIndex
+from app.ds.normalizer import full_process
+from app.products.dao import ParsedProductDealerDAO, ProductDAO
+
+
+def get_name_key(product_name: str) -> str:
+    """Get normalized dealer product name used as index key.
+
+    Args:
+        product_name: name of the dealer product.
+
+    Returns:
+        Lowercase name without punctuation and repeated spaces.
+    """
+    return ' '.join(full_process(product_name).split())
+
+
+class LinkIndex:
+    """Index of dealer products already linked to manufacturer products.
+
+    Links chosen in other workers are received by the listener of
+    product changes. While it is not listening, the index is reloaded
+    not more often than CATALOG_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self) -> None:
+        """Create empty index."""
+        self.by_name: Dict[Tuple[int, str], int] = {}
+        self.by_url: Dict[Tuple[int, str], int] = {}
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.generation = 0
+        self.listening = False
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Get lock guarding index loading.
+
+        Lock is created lazily to be bound to the running event loop.
+
+        Returns:
+            Loading lock.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def expired(self) -> bool:
+        """Check whether the index has to be loaded again."""
+        return not self.loaded or (
+            not self.listening
+            and monotonic() - self.loaded_at >= settings.CATALOG_CHECK_INTERVAL
+        )
+
+    def add(
+        self,
+        dealer_id: int,
+        product_name: Optional[str],
+        product_url: Optional[str],
+        product_id: int,
+    ) -> None:
+        """Remember link of dealer product with manufacturer product.
+
+        Args:
+            dealer_id: id of dealer.
+            product_name: name of the dealer product.
+            product_url: url of the dealer product.
+            product_id: id of the manufacturer product.
+        """
+        if product_name:
+            self.by_name[(dealer_id, get_name_key(product_name))] = product_id
+        if product_url:
+            self.by_url[(dealer_id, product_url.strip())] = product_id
+
+    def find(
+        self,
+        dealer_id: int,
+        product_name: Optional[str],
+        product_url: Optional[str],
+    ) -> Optional[int]:
+        """Find manufacturer product linked to dealer product.
+
+        Args:
+            dealer_id: id of dealer.
+            product_name: name of the dealer product.
+            product_url: url of the dealer product.
+
+        Returns:
+            Id of the manufacturer product or None.
+        """
+        if product_url:
+            product_id = self.by_url.get((dealer_id, product_url.strip()))
+            if product_id is not None:
+                return product_id
+        if product_name:
+            return self.by_name.get((dealer_id, get_name_key(product_name)))
+        return None
+
+    async def load(self) -> None:
+        """Load links from parsing data with product key.
+
+        New links replace the old ones at once, so the index is
+        available while it is loaded again.
+        """
+        if not self.expired:
+            return None
+        async with self.lock:
+            if not self.expired:
+                return None
+            loaded_at = monotonic()
+            generation = self.generation
+            links = await ParsedProductDealerDAO.get_confirmed_links()
+            index = LinkIndex()
+            for link in links:
+                index.add(
+                    link['dealer_id'],
+                    link['product_name'],
+                    link['product_url'],
+                    link['product_id'],
+                )
+            self.by_name = index.by_name
+            self.by_url = index.by_url
+            self.loaded = generation == self.generation
+            self.loaded_at = loaded_at
+            logger.debug(f'Link index built, {len(links)} links')
+
+    async def update(self, ids: List[int]) -> None:
+        """Add links of changed parsing data.
+
+        Not loaded index is left as is, it gets the links when loaded.
+
+        Args:
+            ids: ids of parsing data with changed product key.
+        """
+        async with self.lock:
+            if not self.loaded:
+                return None
+            links = await ParsedProductDealerDAO.get_confirmed_links(ids)
+            for link in links:
+                self.add(
+                    link['dealer_id'],
+                    link['product_name'],
+                    link['product_url'],
+                    link['product_id'],
+                )
+
+    def invalidate(self) -> None:
+        """Load the index again on the next use.
+
+        Links being loaded are used, but loaded again on the next use.
+        """
+        self.generation += 1
+        self.loaded = False
+
+
+link_index = LinkIndex()
+
+
+def get_known_solution(
+    catalog: CatalogIndex,
+    dealer_id: int,
+    dealer_product: str,
+    product_url: Optional[str],
+) -> List[Dict[str, Any]]:
+    """Get manufacturer product already linked with dealer product.
+
+    Link index must be loaded.
+
+    Args:
+        catalog: index of the manufacturer products.
+        dealer_id: id of dealer selling the product.
+        dealer_product: product sold by dealer.
+        product_url: url of the dealer product.
+
+    Returns:
+        Linked product with top score or empty array.
+    """
+    product_id = link_index.find(dealer_id, dealer_product, product_url)
+    if product_id is None or product_id not in catalog.positions:
+        return []
+    return [
+        {
+            'id': product_id,
+            'product_name': catalog.names[catalog.positions[product_id]],
+            'levenshtein_distance': 100,
+        },
+    ]
+
+
+async def get_known_solutions(
+    dealer_ids: List[int],
+    dealer_products: List[str],
+    product_urls: List[Optional[str]],
+    catalog: Optional[CatalogIndex] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Find manufacturer products already linked with dealer products.
+
+    Without catalog index product names are read from database
+    in one query.
+
+    Args:
+        dealer_ids: ids of dealers selling the products.
+        dealer_products: products sold by dealers.
+        product_urls: urls of the dealer products.
+        catalog: index of the manufacturer products.
+
+    Returns:
+        Linked product with top score or empty array
+        for every dealer product.
+    """
+    await link_index.load()
+    if catalog is not None:
+        return [
+            get_known_solution(catalog, dealer_id, product, product_url)
+            for dealer_id, product, product_url in zip(
+                dealer_ids,
+                dealer_products,
+                product_urls,
+            )
+        ]
+    product_ids = [
+        link_index.find(dealer_id, product, product_url)
+        for dealer_id, product, product_url in zip(
+            dealer_ids,
+            dealer_products,
+            product_urls,
+        )
+    ]
+    linked_ids = [id for id in product_ids if id is not None]
+    names = {}
+    if linked_ids:
+        names = {
+            product['id']: product['name']
+            for product in await ProductDAO.get_ids_names(linked_ids)
+        }
+    return [
+        [
+            {
+                'id': product_id,
+                'product_name': names[product_id],
+                'levenshtein_distance': 100,
+            },
+        ]
+        if product_id in names
+        else []
+        for product_id in product_ids
+    ]
+
+
+async def merge_known_solutions(
+    dealer_products: List[str],
+    dealer_ids: Optional[List[int]],
+    product_urls: Optional[List[Optional[str]]],
+    score: Callable[[List[str]], Awaitable[List[List[Dict[str, Any]]]]],
+    catalog: Optional[CatalogIndex] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Score only dealer products not linked with manufacturer products.
+
+    Args:
+        dealer_products: products sold by dealers.
+        dealer_ids: ids of dealers selling the products,
+            links are not used if None.
+        product_urls: urls of the dealer products.
+        score: coroutine function scoring dealer products.
+        catalog: index of the manufacturer products.
+
+    Returns:
+        Linked product or scored products for every dealer product.
+    """
+    solutions: List[List[Dict[str, Any]]] = [[] for _ in dealer_products]
+    if dealer_ids is not None:
+        solutions = await get_known_solutions(
+            dealer_ids,
+            dealer_products,
+            product_urls or [None] * len(dealer_products),
+            catalog,
+        )
+    unknown = [
+        product
+        for product, solution in zip(dealer_products, solutions)
+        if not solution
+    ]
+    if not unknown:
+        return solutions
+    scored_solutions = iter(await score(unknown))
+    return [solution or next(scored_solutions) for solution in solutions]
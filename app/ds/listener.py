@@ -0,0 +1,222 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+
+from app.config import logger, settings
+from app.database import engine
+from app.ds.catalog import catalog_manager
+from app.ds.links import link_index
+from app.ds.solution_trgm import fill_normalized_names
+
+PRODUCT_CHANGES_CHANNEL = 'product_changes'
+PRODUCT_LINKS_CHANNEL = 'product_links'
+RECONNECT_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+
+
+class CatalogListener:
+    """Listener of product changes keeping catalog and links up to date."""
+
+    def __init__(self) -> None:
+        """Create listener."""
+        self.connection: Optional[asyncpg.Connection] = None
+        self.queue: Optional[asyncio.Queue[Tuple[str, str]]] = None
+        self.lost: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task[None]] = None
+        self.listening: Optional[asyncio.Task[None]] = None
+
+    async def start(self) -> None:
+        """Listen to product changes on a dedicated connection.
+
+        First connection is opened before returning, so connection
+        errors are raised. Lost connection is opened again in background.
+        """
+        await self.stop()
+        self.queue = asyncio.Queue()
+        self.lost = asyncio.Event()
+        await self.connect()
+        self.task = asyncio.create_task(self.consume())
+        self.listening = asyncio.create_task(self.reconnect())
+
+    async def connect(self) -> None:
+        """Open connection and listen to product changes.
+
+        Links chosen while there was no connection are not received,
+        so link index is loaded again.
+        """
+        assert self.lost is not None
+        self.lost.clear()
+        self.connection = await asyncpg.connect(
+            engine.url.set(drivername='postgresql').render_as_string(
+                hide_password=False,
+            ),
+        )
+        try:
+            for channel in (PRODUCT_CHANGES_CHANNEL, PRODUCT_LINKS_CHANNEL):
+                await self.connection.add_listener(channel, self.notify)
+            self.connection.add_termination_listener(self.terminate)
+        except Exception:
+            await self.close()
+            raise
+        catalog_manager.listening = True
+        link_index.listening = True
+        link_index.invalidate()
+        logger.debug('Listening to product changes')
+        await self.normalize()
+
+    async def normalize(
+        self,
+        changes: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Fill missing normalized names for candidates retrieval.
+
+        Names are normalized only when candidates are retrieved
+        by database.
+
+        Args:
+            changes: product changes, all products are checked if None.
+        """
+        if settings.CANDIDATES_RETRIEVAL != 'database':
+            return None
+        ids = None
+        if changes is not None and all(
+            change['ids'] is not None for change in changes
+        ):
+            ids = sorted({id for change in changes for id in change['ids']})
+        try:
+            normalized = await fill_normalized_names(ids)
+        except Exception:
+            logger.exception('Product names were not normalized')
+            return None
+        if normalized:
+            logger.debug(f'{normalized} product names normalized')
+
+    async def reconnect(self) -> None:
+        """Open lost connection again with exponential backoff."""
+        assert self.lost is not None
+        while True:
+            await self.lost.wait()
+            await self.close()
+            delay = RECONNECT_DELAY
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    await self.connect()
+                    break
+                except Exception:
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                    logger.warning(
+                        'Product changes listener is not connected, '
+                        f'next attempt in {delay:.0f} sec',
+                    )
+
+    def notify(
+        self,
+        connection: asyncpg.Connection,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        """Queue product change notification.
+
+        Args:
+            connection: listening connection.
+            pid: id of the notifying database process.
+            channel: notification channel.
+            payload: JSON with ids of changed products or parsing data.
+        """
+        if self.queue is not None:
+            self.queue.put_nowait((channel, payload))
+
+    def terminate(self, connection: asyncpg.Connection) -> None:
+        """Mark catalog index as not synchronized when connection is lost.
+
+        Changes made until reconnection are not received, so the next
+        notification causes a rebuild. Fingerprint checks keep the index
+        up to date while there is no connection, link index is loaded
+        again periodically.
+
+        Args:
+            connection: listening connection.
+        """
+        if connection is not self.connection:
+            return None
+        logger.warning('Product changes listener connection is lost')
+        catalog_manager.listening = False
+        catalog_manager.synchronized = False
+        link_index.listening = False
+        if self.lost is not None:
+            self.lost.set()
+
+    async def consume(self) -> None:
+        """Apply queued product changes in batches."""
+        assert self.queue is not None
+        while True:
+            payloads = [await self.queue.get()]
+            while not self.queue.empty():
+                payloads.append(self.queue.get_nowait())
+            changes: List[Dict[str, Any]] = []
+            links: List[Dict[str, Any]] = []
+            for channel, payload in payloads:
+                try:
+                    change = json.loads(payload)
+                except ValueError:
+                    logger.error(f'Invalid product change: {payload}')
+                    continue
+                if channel == PRODUCT_LINKS_CHANNEL:
+                    links.append(change)
+                else:
+                    changes.append(change)
+            if links:
+                await self.update_links(links)
+            if not changes:
+                continue
+            await self.normalize(changes)
+            try:
+                await catalog_manager.apply_changes(
+                    sorted(changes, key=lambda change: change['sequence']),
+                )
+            except Exception:
+                logger.exception('Product changes were not applied')
+                catalog_manager.invalidate()
+
+    async def update_links(self, links: List[Dict[str, Any]]) -> None:
+        """Add links chosen in other workers to link index.
+
+        Args:
+            links: link changes with ids of parsing data, link index
+                is loaded again if some ids are None.
+        """
+        if any(link['ids'] is None for link in links):
+            link_index.invalidate()
+            return None
+        try:
+            await link_index.update(
+                sorted({id for link in links for id in link['ids']}),
+            )
+        except Exception:
+            logger.exception('Product links were not updated')
+            link_index.invalidate()
+
+    async def close(self) -> None:
+        """Close listening connection."""
+        connection, self.connection = self.connection, None
+        catalog_manager.listening = False
+        catalog_manager.synchronized = False
+        link_index.listening = False
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+    async def stop(self) -> None:
+        """Stop listening to product changes."""
+        for task in (self.listening, self.task):
+            if task is not None:
+                task.cancel()
+        self.listening = None
+        self.task = None
+        await self.close()
+
+
+catalog_listener = CatalogListener()
@@ -0,0 +1,126 @@
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+NGRAM_SIZE = 3
+
+
+def get_ngrams(string: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """Split string into character n-grams.
+
+    Every word is padded with spaces, so short words
+    and word boundaries also produce n-grams.
+
+    Args:
+        string: prepared product name.
+        size: length of n-gram.
+
+    Returns:
+        Set of n-grams of the string.
+    """
+    ngrams: Set[str] = set()
+    for word in string.split():
+        word = f' {word} '
+        ngrams.update(
+            word[start : start + size]
+            for start in range(max(len(word) - size + 1, 1))
+        )
+    return ngrams
+
+
+class NgramIndex:
+    """Inverted index from n-grams to catalog positions."""
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        size: int = NGRAM_SIZE,
+        postings: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        """Build inverted index.
+
+        Args:
+            names: prepared names of the manufacturer products.
+            size: length of n-gram.
+            postings: already built catalog positions of every n-gram.
+        """
+        self.size = size
+        self.length = len(names)
+        if postings is None:
+            positions: Dict[str, List[int]] = {}
+            for position, name in enumerate(names):
+                for ngram in get_ngrams(name, size):
+                    positions.setdefault(ngram, []).append(position)
+            postings = {
+                ngram: np.array(ngram_positions, dtype=np.int32)
+                for ngram, ngram_positions in positions.items()
+            }
+        self.postings = postings
+
+    def updated(
+        self,
+        names: Sequence[str],
+        mapping: np.ndarray,
+        added: Sequence[int],
+    ) -> 'NgramIndex':
+        """Build index after removing and inserting products.
+
+        Postings of kept products are moved to their new positions,
+        only inserted products are split into n-grams.
+
+        Args:
+            names: prepared names of all products of the updated index.
+            mapping: new position of every position of this index,
+                -1 for removed products.
+            added: positions of the inserted products.
+
+        Returns:
+            Updated n-gram index.
+        """
+        if np.array_equal(mapping, np.arange(self.length)):
+            postings = dict(self.postings)
+        else:
+            postings = {}
+            for ngram, positions in self.postings.items():
+                moved = mapping[positions]
+                moved = moved[moved >= 0]
+                if len(moved):
+                    postings[ngram] = moved
+        inserted: Dict[str, List[int]] = {}
+        for position in added:
+            for ngram in get_ngrams(names[position], self.size):
+                inserted.setdefault(ngram, []).append(position)
+        for ngram, inserted_positions in inserted.items():
+            positions = np.array(inserted_positions, dtype=np.int32)
+            if ngram in postings:
+                positions = np.sort(
+                    np.concatenate((postings[ngram], positions)),
+                )
+            postings[ngram] = positions
+        return NgramIndex(names, self.size, postings)
+
+    def candidates(self, query: str, limit: int) -> np.ndarray:
+        """Find products sharing the most n-grams with the query.
+
+        Args:
+            query: prepared name of the dealer product.
+            limit: maximum amount of candidates.
+
+        Returns:
+            Sorted catalog positions of candidates.
+        """
+        postings = [
+            self.postings[ngram]
+            for ngram in get_ngrams(query, self.size)
+            if ngram in self.postings
+        ]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        counts = np.bincount(np.concatenate(postings), minlength=self.length)
+        positions = np.flatnonzero(counts)
+        if len(positions) > limit:
+            positions = positions[
+                np.argpartition(-counts[positions], limit - 1)[:limit]
+            ]
+            positions.sort()
+        return positions
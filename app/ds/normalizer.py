@@ -0,0 +1,203 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Pattern
+
+DEALER_NAMES_CACHE_SIZE = 10000
+
+NON_WORD_CHARACTERS = re.compile(r'(?ui)\W')
+NON_ASCII_LATIN_CHARACTERS = re.compile('[\x80-\xff]')
+
+PRODUCT_WORDS = [
+    'PROSEPT',
+    'концентрат',
+    'Crystal',
+    'готовый',
+    'Duty',
+    'Multipower',
+    'MULTIPOWER',
+    'White',
+    'Belizna',
+    'Cooky',
+    'Diona',
+    'готовое',
+    'ULTRA',
+    'Antifoam',
+    'Bath',
+    'Universal',
+    'Carpet',
+    'концентрированное',
+    'Flox',
+    'эффектом',
+    'splash',
+    'epoxy',
+    'Candy',
+    'Optic',
+    'Clean',
+    'шампунь',
+    'штуки',
+    'Super',
+    'Plastix',
+    'Proplast',
+    'Ириса',
+    'FLOX',
+]
+
+DEALER_WORDS = [
+    'антижук',
+    'PROSEPT',
+    'universal',
+    'ULTRA',
+    'grill',
+    'удаления',
+    'floor',
+    'remover',
+    'средство',
+    'стекол',
+    'зеркал',
+    'пластика',
+    'акриловых',
+    'bath',
+    'acryl',
+    'profi',
+    'Eco',
+    'multipower',
+    'xm11',
+    'graffiti',
+    'плесени',
+    'грибка',
+    'gel',
+    'снятия',
+    'shine',
+    'грунтовка',
+    '20л',
+    '10л',
+    '2л',
+    'hand',
+    'cristal',
+    'против',
+    'лак',
+    'полуматовый',
+    'глянцевый',
+    'невымываемый',
+    'машины',
+    'splash',
+    'орех',
+    'сlean',
+    'acid',
+    'polish',
+    'hard',
+    'посуды',
+    'полов',
+    'комнат',
+    'spray',
+    'посудомоечной',
+    'lime',
+    'rinser',
+    'sport',
+    'спортивной',
+    'черных',
+    'black',
+    'сауны',
+    'бани',
+    'труб',
+    'засоров',
+    'extra',
+    'после',
+    'очистки',
+    'ухода',
+    'мебелью',
+    'зеленый',
+    'красный',
+    'fungi',
+]
+
+
+def compile_words(words: Iterable[str]) -> Pattern[str]:
+    """Compile dictionary words into one regular expression.
+
+    Longer words go first, so a word is not split
+    by a shorter word contained in it.
+
+    Args:
+        words: dictionary words.
+
+    Returns:
+        Alternation of all dictionary words.
+    """
+    ordered_words = sorted(set(words), key=lambda word: (-len(word), word))
+    return re.compile('|'.join(re.escape(word) for word in ordered_words))
+
+
+PRODUCT_WORDS_PATTERN = compile_words(PRODUCT_WORDS)
+DEALER_WORDS_PATTERN = compile_words(DEALER_WORDS)
+
+
+def full_process(string: str) -> str:
+    """Prepare string for comparison the same way as fuzzywuzzy does.
+
+    Characters from 128 to 255 are removed as fuzzywuzzy scorers do
+    with default force_ascii.
+
+    Args:
+        string: provided string.
+
+    Returns:
+        Lowercase string without punctuation.
+    """
+    string = NON_ASCII_LATIN_CHARACTERS.sub('', string)
+    return NON_WORD_CHARACTERS.sub(' ', string).lower().strip()
+
+
+def get_not_continuous_words(name: str) -> str:
+    """Separate the combined words in a manufacturer product name.
+
+    Args:
+        name: name of the product produced by the manufacturer.
+
+    Returns:
+        not continuous words in the name of the manufacturer's product.
+    """
+    return PRODUCT_WORDS_PATTERN.sub(r' \g<0> ', name)
+
+
+def normalize_product_name(name: str) -> str:
+    """Get manufacturer product name prepared for matching.
+
+    Args:
+        name: name of the product produced by the manufacturer.
+
+    Returns:
+        Name with separated words, without punctuation, in lowercase.
+    """
+    return full_process(get_not_continuous_words(name))
+
+
+@lru_cache(maxsize=DEALER_NAMES_CACHE_SIZE)
+def get_not_continuous_words_when_entering(row: str) -> str:
+    """Separates merged words when entering a dealer product.
+
+    Results are memoized, because the same dealer names are parsed
+    every day.
+
+    Args:
+        row: product sold by dealer.
+
+    Returns:
+        there are no merged words when entering a dealer product.
+    """
+    return DEALER_WORDS_PATTERN.sub(r' \g<0> ', row)
+
+
+def normalize_dealer_name(name: str) -> str:
+    """Get dealer product name prepared for matching.
+
+    Names of the same listing parsed on different days
+    are usually equal after normalization.
+
+    Args:
+        name: product sold by dealer.
+
+    Returns:
+        Name with separated words, without punctuation, in lowercase.
+    """
+    return full_process(get_not_continuous_words_when_entering(name))
@@ -0,0 +1,373 @@
+from heapq import heappush, heappushpop, nlargest
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+QUERIES_PER_MATRIX = 64
+CHOICES_PER_CHUNK = 64
+HISTOGRAM_ALPHABET = (
+    ' 0123456789abcdefghijklmnopqrstuvwxyz' 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+)
+HISTOGRAM_OTHER = len(HISTOGRAM_ALPHABET)
+HISTOGRAM_BUCKETS = HISTOGRAM_OTHER + 1
+HISTOGRAM_TABLE = np.full(
+    max(ord(char) for char in HISTOGRAM_ALPHABET) + 1,
+    HISTOGRAM_OTHER,
+    dtype=np.int64,
+)
+HISTOGRAM_TABLE[[ord(char) for char in HISTOGRAM_ALPHABET]] = np.arange(
+    HISTOGRAM_OTHER,
+)
+BOUND_TOLERANCE = 1e-6
+
+
+class PruningCounters:
+    """Amounts of candidates discarded by every stage of the cascade.
+
+    Counters are kept by the process doing the scoring.
+    """
+
+    def __init__(self) -> None:
+        """Create counters."""
+        self.candidates = 0
+        self.length = 0
+        self.histogram = 0
+        self.heap = 0
+        self.scored = 0
+
+    def metrics(self) -> Dict[str, int]:
+        """Get pruning metrics.
+
+        Returns:
+            Amount of candidates, amounts pruned by length, histogram
+            and heap bounds and amount of fully scored candidates.
+        """
+        return {
+            'candidates': self.candidates,
+            'length': self.length,
+            'histogram': self.histogram,
+            'heap': self.heap,
+            'scored': self.scored,
+        }
+
+
+pruning_counters = PruningCounters()
+
+
+def get_histograms(strings: Sequence[str]) -> np.ndarray:
+    """Count characters of every string.
+
+    Characters missing in HISTOGRAM_ALPHABET share one bucket,
+    so histograms still give an upper bound of common characters.
+
+    Args:
+        strings: strings to count.
+
+    Returns:
+        Matrix of character counts, one row per string.
+    """
+    codes = np.frombuffer(
+        ''.join(strings).encode('utf-32-le'),
+        dtype=np.uint32,
+    ).astype(np.int64)
+    buckets = np.where(
+        codes < len(HISTOGRAM_TABLE),
+        HISTOGRAM_TABLE[np.minimum(codes, len(HISTOGRAM_TABLE) - 1)],
+        HISTOGRAM_OTHER,
+    )
+    rows = np.repeat(
+        np.arange(len(strings)),
+        [len(string) for string in strings],
+    )
+    return (
+        np.bincount(
+            rows * HISTOGRAM_BUCKETS + buckets,
+            minlength=len(strings) * HISTOGRAM_BUCKETS,
+        )
+        .reshape(len(strings), HISTOGRAM_BUCKETS)
+        .astype(np.uint16)
+    )
+
+
+class ScoreBounds:
+    """Data for cheap upper bounds of token sort ratio of the choices.
+
+    Token sort ratio is 200 * LCS / (len1 + len2) of the names
+    with sorted words, LCS is not longer than the shorter name
+    and than the amount of common characters.
+    """
+
+    def __init__(self, lengths: np.ndarray, histograms: np.ndarray) -> None:
+        """Create bounds.
+
+        Args:
+            lengths: lengths of the choices with single spaces.
+            histograms: character counts of the choices.
+        """
+        self.lengths = lengths
+        self.histograms = histograms
+
+    def __len__(self) -> int:
+        """Get amount of choices.
+
+        Returns:
+            Amount of choices.
+        """
+        return len(self.lengths)
+
+    @classmethod
+    def from_choices(cls, choices: Sequence[str]) -> 'ScoreBounds':
+        """Calculate bounds data of the choices.
+
+        Args:
+            choices: prepared names of the manufacturer products.
+
+        Returns:
+            Bounds data.
+        """
+        joined = [' '.join(choice.split()) for choice in choices]
+        return cls(
+            np.array([len(choice) for choice in joined], dtype=np.int64),
+            get_histograms(joined),
+        )
+
+    def take(self, positions: Sequence[int]) -> 'ScoreBounds':
+        """Get bounds data of the part of the choices.
+
+        Args:
+            positions: positions of the selected choices.
+
+        Returns:
+            Bounds data of the selected choices.
+        """
+        return ScoreBounds(
+            self.lengths[positions],
+            self.histograms[positions],
+        )
+
+    def upper(self, query: str) -> np.ndarray:
+        """Get the best possible scores of the query with the choices.
+
+        Args:
+            query: prepared name of the dealer product.
+
+        Returns:
+            Rounded histogram bounds of the score of every choice.
+        """
+        joined = ' '.join(query.split())
+        common = np.minimum(
+            self.histograms,
+            get_histograms([joined])[0],
+        ).sum(axis=1, dtype=np.int64)
+        return np.rint(
+            200 * common / np.maximum(self.lengths + len(joined), 1)
+            + BOUND_TOLERANCE,
+        )
+
+
+def score_matrix(
+    queries: Sequence[str],
+    choices: Sequence[str],
+    score_cutoff: int,
+) -> np.ndarray:
+    """Score every query against every choice in one native call.
+
+    Queries and choices must be already prepared by full_process.
+    Scores are rounded like fuzzywuzzy does, scores below the cutoff
+    are set to zero.
+
+    Args:
+        queries: prepared names of the dealer products.
+        choices: prepared names of the manufacturer products.
+        score_cutoff: minimum score of suitable product.
+
+    Returns:
+        Matrix of scores, one row per query.
+    """
+    scores = process.cdist(
+        queries,
+        choices,
+        scorer=fuzz.token_sort_ratio,
+        processor=None,
+        score_cutoff=max(score_cutoff - 0.5, 0),
+        dtype=np.float64,  # type: ignore[arg-type]
+    )
+    return np.rint(scores)
+
+
+def top_k(
+    scores: np.ndarray,
+    score_cutoff: int,
+    length: int,
+) -> List[Tuple[int, int]]:
+    """Select best scores with a heap.
+
+    Order of equal scores is kept as in the catalog.
+
+    Args:
+        scores: scores of one query against all choices.
+        score_cutoff: minimum score of suitable product.
+        length: maximum amount of selected products.
+
+    Returns:
+        Positions of selected choices with their scores.
+    """
+    candidates = np.flatnonzero(scores >= score_cutoff)
+    best = nlargest(length, candidates.tolist(), key=scores.__getitem__)
+    return [(position, int(scores[position])) for position in best]
+
+
+def extract_bounded(
+    query: str,
+    choices: Sequence[str],
+    bounds: ScoreBounds,
+    score_cutoff: int,
+    length: int,
+) -> List[Tuple[int, int]]:
+    """Find the best choices scoring only those able to be selected.
+
+    Candidates are discarded by the length bound, then by the character
+    histogram bound when their best possible score is below the cutoff.
+    The rest are scored in descending order of the bounds
+    until the bound is below the score of the last selected choice.
+    Result is equal to scoring all choices.
+
+    Args:
+        query: prepared name of the dealer product.
+        choices: prepared names of the manufacturer products.
+        bounds: bounds data of the choices.
+        score_cutoff: minimum score of suitable product.
+        length: maximum amount of selected products.
+
+    Returns:
+        Positions of selected choices with their scores.
+    """
+    joined = ' '.join(query.split())
+    pruning_counters.candidates += len(choices)
+    upper = (
+        200
+        * np.minimum(bounds.lengths, len(joined))
+        / (bounds.lengths + len(joined))
+    )
+    candidates = np.flatnonzero(
+        np.rint(upper + BOUND_TOLERANCE) >= score_cutoff,
+    )
+    pruning_counters.length += len(choices) - len(candidates)
+    common = np.minimum(
+        bounds.histograms[candidates],
+        get_histograms([joined])[0],
+    ).sum(axis=1, dtype=np.int64)
+    upper = np.rint(
+        200 * common / (bounds.lengths[candidates] + len(joined))
+        + BOUND_TOLERANCE,
+    )
+    suitable = upper >= score_cutoff
+    pruning_counters.histogram += len(candidates) - int(suitable.sum())
+    order = np.argsort(-upper[suitable], kind='stable')
+    candidates = candidates[suitable][order]
+    upper = upper[suitable][order]
+    positions: List[np.ndarray] = []
+    scores: List[np.ndarray] = []
+    best: List[float] = []
+    start = 0
+    while start < len(candidates):
+        if len(best) >= length and upper[start] < best[0]:
+            break
+        chunk = candidates[start : start + CHOICES_PER_CHUNK]
+        chunk_scores = score_matrix(
+            [query],
+            [choices[position] for position in chunk],
+            score_cutoff,
+        )[0]
+        for score in chunk_scores[chunk_scores >= score_cutoff].tolist():
+            if len(best) < length:
+                heappush(best, score)
+            elif score > best[0]:
+                heappushpop(best, score)
+        positions.append(chunk)
+        scores.append(chunk_scores)
+        start += len(chunk)
+    pruning_counters.heap += len(candidates) - start
+    pruning_counters.scored += start
+    if not positions:
+        return []
+    selected_positions = np.concatenate(positions)
+    selected_scores = np.concatenate(scores)
+    suitable = selected_scores >= score_cutoff
+    selected_positions = selected_positions[suitable]
+    selected_scores = selected_scores[suitable]
+    order = np.lexsort((selected_positions, -selected_scores))[:length]
+    return [
+        (int(selected_positions[number]), int(selected_scores[number]))
+        for number in order
+    ]
+
+
+def extract(
+    query: str,
+    choices: Sequence[str],
+    score_cutoff: int,
+    length: int,
+    bounds: Optional[ScoreBounds] = None,
+) -> List[Tuple[int, int]]:
+    """Find the best choices for one query.
+
+    Args:
+        query: prepared name of the dealer product.
+        choices: prepared names of the manufacturer products.
+        score_cutoff: minimum score of suitable product.
+        length: maximum amount of selected products.
+        bounds: bounds data of the choices, hopeless choices
+            are not scored when it is provided.
+
+    Returns:
+        Positions of selected choices with their scores.
+    """
+    if not query or not choices or length <= 0:
+        return []
+    if bounds is not None:
+        return extract_bounded(query, choices, bounds, score_cutoff, length)
+    scores = score_matrix([query], choices, score_cutoff)[0]
+    return top_k(scores, score_cutoff, length)
+
+
+def extract_many(
+    queries: Sequence[str],
+    choices: Sequence[str],
+    score_cutoff: int,
+    length: int,
+    bounds: Optional[ScoreBounds] = None,
+) -> List[List[Tuple[int, int]]]:
+    """Find the best choices for many queries with matrix scoring.
+
+    Queries are scored in chunks of QUERIES_PER_MATRIX rows
+    to keep the matrix size bounded. When bounds data is provided,
+    every query is scored by the cascade instead.
+
+    Args:
+        queries: prepared names of the dealer products.
+        choices: prepared names of the manufacturer products.
+        score_cutoff: minimum score of suitable product.
+        length: maximum amount of selected products per query.
+        bounds: bounds data of the choices.
+
+    Returns:
+        Positions of selected choices with their scores for every query.
+    """
+    if not choices or length <= 0:
+        return [[] for _ in queries]
+    if bounds is not None:
+        return [
+            extract(query, choices, score_cutoff, length, bounds)
+            for query in queries
+        ]
+    results: List[List[Tuple[int, int]]] = []
+    for start in range(0, len(queries), QUERIES_PER_MATRIX):
+        chunk = queries[start : start + QUERIES_PER_MATRIX]
+        scores = score_matrix(chunk, choices, score_cutoff)
+        results.extend(
+            top_k(row, score_cutoff, length) if query else []
+            for query, row in zip(chunk, scores)
+        )
+    return results
@@ -0,0 +1,262 @@
+import json
+import mmap
+import os
+import struct
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import logger
+from app.ds.ngram import NgramIndex
+
+if TYPE_CHECKING:
+    from app.ds.catalog import CatalogIndex
+
+SNAPSHOT_MAGIC = b'PRCATv2\x00'
+SNAPSHOT_POINTER = 'CURRENT'
+SNAPSHOT_ALIGNMENT = 8
+SNAPSHOT_NAMES = (
+    'names',
+    'names_split',
+    'names_processed',
+    'names_raw_processed',
+)
+
+
+def get_padding(length: int) -> int:
+    """Get amount of bytes aligning section to SNAPSHOT_ALIGNMENT.
+
+    Args:
+        length: length of data before the section.
+
+    Returns:
+        Amount of padding bytes.
+    """
+    return -length % SNAPSHOT_ALIGNMENT
+
+
+def encode_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings into one UTF-8 blob with offsets.
+
+    Args:
+        strings: strings to encode.
+
+    Returns:
+        Blob and byte offsets of every string, the last offset
+        is the length of the blob.
+    """
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def decode_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Decode strings from UTF-8 blob with offsets.
+
+    Args:
+        blob: UTF-8 blob.
+        offsets: byte offsets of every string.
+
+    Returns:
+        Decoded strings.
+    """
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [
+        data[start:end].decode('utf-8')
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def get_snapshot_path(directory: str, version: str) -> str:
+    """Get path of the catalog snapshot.
+
+    Args:
+        directory: directory with snapshots.
+        version: fingerprint of the product table.
+
+    Returns:
+        Path of the snapshot file.
+    """
+    return os.path.join(directory, f'catalog-{version}.snapshot')
+
+
+def get_current_snapshot(directory: str) -> Optional[str]:
+    """Get path of the current catalog snapshot.
+
+    Args:
+        directory: directory with snapshots.
+
+    Returns:
+        Path of the snapshot file or None if there is no snapshot.
+    """
+    try:
+        with open(
+            os.path.join(directory, SNAPSHOT_POINTER),
+            'r',
+            encoding='utf-8',
+        ) as file:
+            name = file.read().strip()
+    except OSError:
+        return None
+    return os.path.join(directory, name) if name else None
+
+
+def replace_file(path: str, data: bytes) -> None:
+    """Write file atomically.
+
+    Args:
+        path: path of the file.
+        data: content of the file.
+    """
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def write_snapshot(catalog: 'CatalogIndex', directory: str) -> str:
+    """Write immutable snapshot of the catalog and make it current.
+
+    Snapshot consists of int32 ids, UTF-8 blobs of names with offsets
+    and n-gram postings, every section is aligned to be read
+    as numpy array directly from the memory map. Snapshots of older
+    catalog versions except the previous one are deleted.
+
+    Args:
+        catalog: index of the manufacturer products.
+        directory: directory with snapshots.
+
+    Returns:
+        Path of the snapshot file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    ngrams = list(catalog.ngrams.postings)
+    sections: Dict[str, np.ndarray] = {
+        'ids': np.array(catalog.ids, dtype=np.int32),
+    }
+    for name in SNAPSHOT_NAMES:
+        blob, offsets = encode_strings(getattr(catalog, name))
+        sections[f'{name}.blob'] = blob
+        sections[f'{name}.offsets'] = offsets
+    sections['ngrams.blob'], sections['ngrams.offsets'] = encode_strings(
+        ngrams,
+    )
+    postings = [catalog.ngrams.postings[ngram] for ngram in ngrams]
+    sections['postings.offsets'] = np.zeros(len(postings) + 1, np.int64)
+    np.cumsum(
+        [len(positions) for positions in postings],
+        out=sections['postings.offsets'][1:],
+    )
+    sections['postings.positions'] = (
+        np.concatenate(postings).astype(np.int32)
+        if postings
+        else np.empty(0, dtype=np.int32)
+    )
+    layout: Dict[str, Any] = {}
+    data = bytearray()
+    for name, array in sections.items():
+        data.extend(b'\x00' * get_padding(len(data)))
+        layout[name] = [len(data), len(array), array.dtype.str]
+        data.extend(array.tobytes())
+    header = json.dumps(
+        {
+            'version': catalog.version,
+            'ngramSize': catalog.ngrams.size,
+            'sections': layout,
+        },
+    ).encode('utf-8')
+    prefix = SNAPSHOT_MAGIC + struct.pack('<Q', len(header)) + header
+    prefix += b'\x00' * get_padding(len(prefix))
+    path = get_snapshot_path(directory, catalog.version)
+    previous = get_current_snapshot(directory)
+    replace_file(path, prefix + bytes(data))
+    replace_file(
+        os.path.join(directory, SNAPSHOT_POINTER),
+        os.path.basename(path).encode('utf-8'),
+    )
+    for name in os.listdir(directory):
+        stale = os.path.join(directory, name)
+        if name.endswith('.snapshot') and stale not in (path, previous):
+            try:
+                os.remove(stale)
+            except OSError:
+                logger.warning(f'Catalog snapshot {stale} was not deleted')
+    logger.debug(f'Catalog snapshot {catalog.version} written to {path}')
+    return path
+
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    """Load catalog index data from the snapshot file.
+
+    Only n-gram postings are read directly from the read-only memory
+    map, so their pages are shared by all processes using the snapshot.
+    Ids and names are decoded into lists of every process, because
+    scoring needs Python strings, and decoding names for every query
+    would cost more than the saved memory.
+
+    Args:
+        path: path of the snapshot file.
+
+    Returns:
+        Arguments of the catalog index.
+
+    Raises:
+        ValueError: file is not a catalog snapshot.
+    """
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f'{path} is not a catalog snapshot')
+    (header_length,) = struct.unpack_from('<Q', buffer, len(SNAPSHOT_MAGIC))
+    header_start = len(SNAPSHOT_MAGIC) + 8
+    header = json.loads(buffer[header_start : header_start + header_length])
+    data_start = header_start + header_length
+    data_start += get_padding(data_start)
+
+    def get_section(name: str) -> np.ndarray:
+        offset, length, dtype = header['sections'][name]
+        return np.frombuffer(
+            buffer,
+            dtype=np.dtype(dtype),
+            count=length,
+            offset=data_start + offset,
+        )
+
+    names = {
+        name: decode_strings(
+            get_section(f'{name}.blob'),
+            get_section(f'{name}.offsets'),
+        )
+        for name in SNAPSHOT_NAMES
+    }
+    positions = get_section('postings.positions')
+    offsets = get_section('postings.offsets').tolist()
+    postings = {
+        ngram: positions[start:end]
+        for ngram, start, end in zip(
+            decode_strings(
+                get_section('ngrams.blob'),
+                get_section('ngrams.offsets'),
+            ),
+            offsets,
+            offsets[1:],
+        )
+    }
+    return dict(
+        version=header['version'],
+        ids=get_section('ids').tolist(),
+        names=names['names'],
+        names_split=names['names_split'],
+        names_processed=names['names_processed'],
+        names_raw_processed=names['names_raw_processed'],
+        ngrams=NgramIndex(
+            names['names_processed'],
+            header['ngramSize'],
+            postings,
+        ),
+        snapshot=path,
+    )
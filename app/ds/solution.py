@@ -1,69 +1,140 @@
 import sys
+from typing import Any, Dict, List, Optional
 
-import pandas as pd
-from fuzzywuzzy import fuzz
-
-from app.products.dao import ProductDAO
+from app.ds.catalog import CatalogIndex, catalog_manager
+from app.ds.executor import matching_executor
+from app.ds.links import merge_known_solutions
+from app.ds.normalizer import full_process
+from app.ds.scoring import extract, extract_many
 
 
 def get_suitable_products(
     dealer_product: str,
-    manufactur_products: pd.Series,
+    catalog: CatalogIndex,
     levenshtein_distance_max: int,
-) -> list:
+    length: int,
+) -> List[Dict[str, Any]]:
     """Create a model explanation system.
 
+    Args:
+        dealer_product: product sold by dealer.
+        catalog: index of the manufacturer products.
+        levenshtein_distance_max: difference between the names of two products.
+        length: length of the list of recommended products.
+
     Returns:
         Array of suitable manufactur products.
     """
-    suitable_products = []
-    for product in manufactur_products['name']:
-        l_d = fuzz.token_sort_ratio(dealer_product, product)
-        if l_d >= levenshtein_distance_max:
-            manufactur_product_id = manufactur_products[
-                manufactur_products['name'] == product
-            ]['id'].to_string(index=False)
-            suitable_products.append(
-                {
-                    'id': manufactur_product_id,
-                    'product_name': product,
-                    'levenshtein_distance': l_d,
-                },
-            )
-    return suitable_products
+    return [
+        {
+            'id': catalog.ids[position],
+            'product_name': catalog.names[position],
+            'levenshtein_distance': l_d,
+        }
+        for position, l_d in extract(
+            full_process(dealer_product),
+            catalog.names_raw_processed,
+            levenshtein_distance_max,
+            length,
+        )
+    ]
+
+
+def get_suitable_products_many(
+    dealer_products: List[str],
+    catalog: CatalogIndex,
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[List[Dict[str, Any]]]:
+    """Create a model explanation system for many dealer products.
+
+    Args:
+        dealer_products: products sold by dealers.
+        catalog: index of the manufacturer products.
+        levenshtein_distance_max: difference between the names of two products.
+        length: length of the list of recommended products.
+
+    Returns:
+        Arrays of suitable manufactur products for every dealer product.
+    """
+    return [
+        [
+            {
+                'id': catalog.ids[position],
+                'product_name': catalog.names[position],
+                'levenshtein_distance': l_d,
+            }
+            for position, l_d in suitable_products
+        ]
+        for suitable_products in extract_many(
+            [full_process(product) for product in dealer_products],
+            catalog.names_raw_processed,
+            levenshtein_distance_max,
+            length,
+        )
+    ]
 
 
 async def get_solution(
     dealer_product: str,
     length: int = 10,
     levenshtein_distance_max: int = 50,
-) -> list:
+) -> List[Dict[str, Any]]:
     """Get solution.
 
     Args:
-        dealer_product:
-        lengthL
-        levenshtein_distance_max:
+        dealer_product: product sold by dealer.
+        length: length of the list of recommended products.
+        levenshtein_distance_max: difference between the names of two products.
 
     Returns:
         List of solutions.
     """
-    manufactur_products1 = pd.DataFrame(await ProductDAO.get_ids_names())
-    # manufactur_products = pd.read_csv('app/ds/manufacturer_data.csv')
-
-    suitable_solution = get_suitable_products(
+    return await matching_executor.run(
+        await catalog_manager.get(),
+        get_suitable_products,
         dealer_product,
-        manufactur_products1,
-        levenshtein_distance_max,
+        levenshtein_distance_max=levenshtein_distance_max,
+        length=length,
     )
-    solution = sorted(
-        suitable_solution,
-        key=lambda x: x['levenshtein_distance'],
-        reverse=True,
-    )
-    last_index = length if length < len(solution) else len(solution)
 
-    return solution[0:last_index]
+
+async def get_solutions(
+    dealer_products: List[str],
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+    dealer_ids: Optional[List[int]] = None,
+    product_urls: Optional[List[Optional[str]]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Get solutions for many dealer products.
+
+    Dealer products already linked with manufacturer products
+    are not scored.
+
+    Args:
+        dealer_products: products sold by dealers.
+        length: length of the list of recommended products.
+        levenshtein_distance_max: difference between the names of two products.
+        dealer_ids: ids of dealers selling the products.
+        product_urls: urls of the dealer products.
+
+    Returns:
+        Lists of solutions for every dealer product.
+    """
+    catalog = await catalog_manager.get()
+    return await merge_known_solutions(
+        dealer_products,
+        dealer_ids,
+        product_urls,
+        lambda products: matching_executor.run(
+            catalog,
+            get_suitable_products_many,
+            products,
+            levenshtein_distance_max=levenshtein_distance_max,
+            length=length,
+        ),
+        catalog,
+    )
 
 
 if __name__ == '__main__':
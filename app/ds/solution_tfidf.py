@@ -0,0 +1,254 @@
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.ds.catalog import CatalogIndex, catalog_manager
+from app.ds.executor import matching_executor
+from app.ds.links import merge_known_solutions
+from app.ds.normalizer import (
+    full_process,
+    get_not_continuous_words_when_entering,
+)
+
+NGRAM_RANGE = (3, 3)
+QUERIES_PER_MATRIX = 256
+
+tfidf_indexes: 'WeakKeyDictionary[CatalogIndex, TfidfIndex]' = (
+    WeakKeyDictionary()
+)
+tfidf_indexes_lock = threading.Lock()
+
+
+class TfidfIndex:
+    """Character n-gram TF-IDF vectors of the manufacturer products."""
+
+    def __init__(self, names: List[str]) -> None:
+        """Fit vectorizer on the catalog and vectorize product names.
+
+        Args:
+            names: normalized names of the manufacturer products.
+        """
+        self.vectorizer = TfidfVectorizer(
+            analyzer='char_wb',
+            ngram_range=NGRAM_RANGE,
+            lowercase=False,
+            dtype=np.float32,
+        )
+        self.matrix = None
+        try:
+            self.matrix = self.vectorizer.fit_transform(names).T.tocsr()
+        except ValueError:
+            pass
+
+    def score(self, queries: List[str]) -> Any:
+        """Score dealer products against every manufacturer product.
+
+        Args:
+            queries: normalized names of the dealer products.
+
+        Returns:
+            Sparse matrix of cosine similarities,
+            one row for every dealer product.
+        """
+        if self.matrix is None:
+            return None
+        return (self.vectorizer.transform(queries) @ self.matrix).tocsr()
+
+
+def get_tfidf_index(catalog: CatalogIndex) -> TfidfIndex:
+    """Get TF-IDF index built once per catalog index.
+
+    Args:
+        catalog: index of the manufacturer products.
+
+    Returns:
+        TF-IDF index of the catalog.
+    """
+    with tfidf_indexes_lock:
+        index = tfidf_indexes.get(catalog)
+        if index is None:
+            index = TfidfIndex(catalog.names_processed)
+            tfidf_indexes[catalog] = index
+    return index
+
+
+def top_k(
+    positions: np.ndarray,
+    similarities: np.ndarray,
+    score_cutoff: int,
+    length: int,
+) -> List[Tuple[int, int]]:
+    """Select best scored products.
+
+    Args:
+        positions: positions of the products sharing n-grams with query.
+        similarities: cosine similarities of these products.
+        score_cutoff: minimal score of the product.
+        length: length of the list of recommended products.
+
+    Returns:
+        Positions and scores of the products in descending order of score.
+    """
+    scores = np.rint(similarities * 100)
+    selected = np.flatnonzero(scores >= score_cutoff)
+    if length <= 0 or not len(selected):
+        return []
+    if len(selected) > length:
+        selected = selected[
+            np.argpartition(-scores[selected], length - 1)[:length]
+        ]
+    selected = selected[np.lexsort((positions[selected], -scores[selected]))]
+    return [(int(positions[item]), int(scores[item])) for item in selected]
+
+
+def get_suitable_products_many(
+    dealer_products: List[str],
+    catalog: CatalogIndex,
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[List[Dict[str, Any]]]:
+    """Create a model explanation system with TF-IDF similarity.
+
+    Cosine similarity of character trigrams multiplied by 100 is returned
+    as Levenshtein distance, so results are compatible with other engines.
+
+    Args:
+        dealer_products: preprocessed products sold by dealers.
+        catalog: index of the manufacturer products.
+        levenshtein_distance_max: minimal similarity of two products.
+        length: length of the list of recommended products.
+
+    Returns:
+        Arrays of suitable manufacturer products for every dealer product.
+    """
+    index = get_tfidf_index(catalog)
+    queries = [full_process(product) for product in dealer_products]
+    solutions: List[List[Dict[str, Any]]] = []
+    for start in range(0, len(queries), QUERIES_PER_MATRIX):
+        chunk = queries[start : start + QUERIES_PER_MATRIX]
+        similarities = index.score(chunk)
+        if similarities is None:
+            solutions.extend([] for _ in chunk)
+            continue
+        for row in range(len(chunk)):
+            begin, end = similarities.indptr[row : row + 2]
+            solutions.append(
+                [
+                    {
+                        'id': catalog.ids[position],
+                        'product_name': catalog.names[position],
+                        'levenshtein_distance': l_d,
+                    }
+                    for position, l_d in top_k(
+                        similarities.indices[begin:end],
+                        similarities.data[begin:end],
+                        levenshtein_distance_max,
+                        length,
+                    )
+                ],
+            )
+    return solutions
+
+
+def get_suitable_products(
+    dealer_product: str,
+    catalog: CatalogIndex,
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[Dict[str, Any]]:
+    """Create a model explanation system with TF-IDF similarity.
+
+    Args:
+        dealer_product: preprocessed product sold by dealer.
+        catalog: index of the manufacturer products.
+        levenshtein_distance_max: minimal similarity of two products.
+        length: length of the list of recommended products.
+
+    Returns:
+        Array of suitable manufacturer products
+        in descending order of similarity.
+    """
+    return get_suitable_products_many(
+        [dealer_product],
+        catalog,
+        levenshtein_distance_max,
+        length,
+    )[0]
+
+
+async def get_solution(
+    dealer_product: str,
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+) -> List[Dict[str, Any]]:
+    """Sorting products in descending order of TF-IDF similarity.
+
+    Args:
+        dealer_product: product sold by dealer,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: minimal similarity of two products.
+
+    Returns:
+        array of matching products in descending order of similarity.
+    """
+    return await matching_executor.run(
+        await catalog_manager.get(),
+        get_suitable_products,
+        get_not_continuous_words_when_entering(dealer_product),
+        levenshtein_distance_max=levenshtein_distance_max,
+        length=length,
+    )
+
+
+async def get_solutions(
+    dealer_products: List[str],
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+    dealer_ids: Optional[List[int]] = None,
+    product_urls: Optional[List[Optional[str]]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Get TF-IDF recommendations for many dealer products in one pass.
+
+    Dealer products already linked with manufacturer products
+    are not scored.
+
+    Args:
+        dealer_products: products sold by dealers,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: minimal similarity of two products,
+        dealer_ids: ids of dealers selling the products,
+        product_urls: urls of the dealer products.
+
+    Returns:
+        arrays of matching products for every dealer product.
+    """
+    catalog = await catalog_manager.get()
+    return await merge_known_solutions(
+        dealer_products,
+        dealer_ids,
+        product_urls,
+        lambda products: matching_executor.run(
+            catalog,
+            get_suitable_products_many,
+            [
+                get_not_continuous_words_when_entering(product)
+                for product in products
+            ],
+            levenshtein_distance_max=levenshtein_distance_max,
+            length=length,
+        ),
+        catalog,
+    )
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(get_solution('Средство для удаления ленты  клейкой '))
@@ -0,0 +1,190 @@
+import sys
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.ds.links import get_known_solutions, merge_known_solutions
+from app.ds.normalizer import (
+    full_process,
+    get_not_continuous_words_when_entering,
+    normalize_product_name,
+)
+from app.ds.scoring import extract
+from app.products.dao import ProductDAO
+
+
+def rescore_candidates(
+    dealer_product: str,
+    candidates: List[Dict[str, Any]],
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[Dict[str, Any]]:
+    """Score candidates found by database with token sort ratio.
+
+    Args:
+        dealer_product: preprocessed product sold by dealer.
+        candidates: id, name and normalized name of the candidates.
+        levenshtein_distance_max: difference between the names of two products.
+        length: length of the list of recommended products.
+
+    Returns:
+        Array of suitable manufacturer products
+        in descending order of Levenshtein distance.
+    """
+    return [
+        {
+            'id': candidates[position]['id'],
+            'product_name': candidates[position]['name'],
+            'levenshtein_distance': l_d,
+        }
+        for position, l_d in extract(
+            full_process(dealer_product),
+            [candidate['name_normalized'] for candidate in candidates],
+            levenshtein_distance_max,
+            length,
+        )
+    ]
+
+
+async def fill_normalized_names(ids: Optional[List[int]] = None) -> int:
+    """Normalize names of products created or renamed without it.
+
+    Products inserted or renamed by raw SQL have no normalized name
+    and can not be retrieved by database until it is filled.
+
+    Args:
+        ids: ids of changed products, all products are checked if None.
+
+    Returns:
+        Amount of normalized names.
+    """
+    names = {
+        product['id']: normalize_product_name(product['name'])
+        for product in await ProductDAO.get_not_normalized(ids)
+    }
+    await ProductDAO.update_normalized_names(names)
+    return len(names)
+
+
+async def find_known_solution(
+    dealer_id: int,
+    dealer_product: str,
+    product_url: Optional[str],
+) -> List[Dict[str, Any]]:
+    """Find manufacturer product already linked with dealer product.
+
+    Args:
+        dealer_id: id of dealer selling the product.
+        dealer_product: product sold by dealer.
+        product_url: url of the dealer product.
+
+    Returns:
+        Linked product with top score or empty array.
+    """
+    return (
+        await get_known_solutions([dealer_id], [dealer_product], [product_url])
+    )[0]
+
+
+async def score_candidates(
+    dealer_products: List[str],
+    length: int,
+    levenshtein_distance_max: int,
+) -> List[List[Dict[str, Any]]]:
+    """Score candidates retrieved by database for many dealer products.
+
+    Args:
+        dealer_products: products sold by dealers.
+        length: length of the list of recommended products.
+        levenshtein_distance_max: difference between the names of two products.
+
+    Returns:
+        Arrays of matching products for every dealer product.
+    """
+    queries = [
+        get_not_continuous_words_when_entering(dealer_product)
+        for dealer_product in dealer_products
+    ]
+    candidates: List[List[Dict[str, Any]]] = [[] for _ in queries]
+    for candidate in await ProductDAO.get_similar(
+        [full_process(query) for query in queries],
+        settings.NGRAM_CANDIDATES,
+        settings.TRGM_SIMILARITY_THRESHOLD,
+    ):
+        candidates[candidate['position'] - 1].append(candidate)
+    return [
+        rescore_candidates(
+            query,
+            query_candidates,
+            levenshtein_distance_max,
+            length,
+        )
+        for query, query_candidates in zip(queries, candidates)
+    ]
+
+
+async def get_solutions(
+    dealer_products: List[str],
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+    dealer_ids: Optional[List[int]] = None,
+    product_urls: Optional[List[Optional[str]]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Get recommendations with candidates retrieved by database.
+
+    Postgres returns NGRAM_CANDIDATES products with the most similar
+    normalized names for every dealer product in one query, only these
+    candidates are scored.
+
+    Args:
+        dealer_products: products sold by dealers,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: difference between the names of two products,
+        dealer_ids: ids of dealers selling the products,
+        product_urls: urls of the dealer products.
+
+    Returns:
+        arrays of matching products for every dealer product.
+    """
+    return await merge_known_solutions(
+        dealer_products,
+        dealer_ids,
+        product_urls,
+        lambda products: score_candidates(
+            products,
+            length,
+            levenshtein_distance_max,
+        ),
+    )
+
+
+async def get_solution(
+    dealer_product: str,
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+) -> List[Dict[str, Any]]:
+    """Sorting candidates found by database by Levenshtein distance.
+
+    Args:
+        dealer_product: product sold by dealer,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: difference between the names of two products.
+
+    Returns:
+        array of matching products in descending order of Levenshtein distance.
+    """
+    return (
+        await get_solutions(
+            [dealer_product],
+            length,
+            levenshtein_distance_max,
+        )
+    )[0]
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(get_solution('Средство для удаления ленты  клейкой '))
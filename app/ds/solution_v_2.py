@@ -1,220 +1,405 @@
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
-from fuzzywuzzy import fuzz
+import numpy as np
 
-from app.products.dao import ProductDAO
+from app.config import settings
+from app.ds.cache import ResultCache
+from app.ds.catalog import CatalogIndex, catalog_manager
+from app.ds.executor import matching_executor
+from app.ds.links import get_known_solution, link_index, merge_known_solutions
+from app.ds.normalizer import (
+    full_process,
+    get_not_continuous_words_when_entering,
+)
+from app.ds.scoring import extract, extract_many
 
+SCORER_VERSION = '2.1'
 
-def get_not_continuous_words(data: pd.DataFrame) -> str:
-    """Separate the combined words in a column 'name'.
+result_cache: ResultCache[List[Dict[str, Any]]] = ResultCache(
+    settings.RESULT_CACHE_SIZE,
+    settings.RESULT_CACHE_TTL,
+)
+
+
+def get_suitable_products(
+    dealer_product: str,
+    catalog: CatalogIndex,
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[Dict[str, Any]]:
+    """Create a model explanation system.
+
+    When the catalog is larger than NGRAM_CANDIDATES, the products
+    sharing the most n-grams with the dealer product are scored first.
+    With SCORE_BOUNDS products unable to be recommended are discarded
+    by cheap bounds before scoring.
 
     Args:
-        data: list of produscts produced and distributed by the manufacturer.
+        dealer_product: preprocessed product sold by dealer.
+        catalog: index of the manufacturer products.
+        levenshtein_distance_max: difference between the names of two products.
+        length: length of the list of recommended products.
 
     Returns:
-        not continuous words in the names of the manufacturer's products.
+        Array of suitable manufacturer products
+        in descending order of Levenshtein distance.
     """
-    list_product_word = [
-        'PROSEPT',
-        'концентрат',
-        'Crystal',
-        'готовый',
-        'Duty',
-        'Multipower',
-        'MULTIPOWER',
-        'White',
-        'Belizna',
-        'Cooky',
-        'Diona',
-        'готовое',
-        'ULTRA',
-        'Antifoam',
-        'Bath',
-        'Universal',
-        'Carpet',
-        'концентрированное',
-        'Flox',
-        'эффектом',
-        'splash',
-        'epoxy',
-        'Candy',
-        'Optic',
-        'Clean',
-        'шампунь',
-        'штуки',
-        'Super',
-        'Plastix',
-        'Proplast',
-        'Ириса',
-        'FLOX',
+    query = full_process(dealer_product)
+    if query and 0 < settings.NGRAM_CANDIDATES < len(catalog):
+        suitable_products = extract_candidates(
+            query,
+            catalog,
+            levenshtein_distance_max,
+            length,
+        )
+    else:
+        suitable_products = extract(
+            query,
+            catalog.names_processed,
+            levenshtein_distance_max,
+            length,
+            catalog.bounds if settings.SCORE_BOUNDS else None,
+        )
+    return [
+        {
+            'id': catalog.ids[position],
+            'product_name': catalog.names[position],
+            'levenshtein_distance': l_d,
+        }
+        for position, l_d in suitable_products
     ]
-    result = data['name']
-    for word in list_product_word:
-        tmp_str = result.split(str(word))
-        if len(tmp_str) > 1:
-            result = tmp_str[0] + ' ' + word + ' ' + tmp_str[1]
-    return result
 
 
-def get_not_continuous_words_when_entering(row: str) -> str:
-    """Separates merged words when entering a dealer product.
+def extract_positions(
+    query: str,
+    catalog: CatalogIndex,
+    positions: np.ndarray,
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[Tuple[int, int]]:
+    """Find the best products among the part of the catalog.
 
     Args:
-        row: product sold by dealer.
+        query: prepared name of the dealer product.
+        catalog: index of the manufacturer products.
+        positions: sorted catalog positions of the scored products.
+        levenshtein_distance_max: difference between the names of two products.
+        length: length of the list of recommended products.
 
     Returns:
-        there are no merged words when entering a dealer product.
+        Catalog positions of selected products with their scores.
     """
-    list_product_dealer = [
-        'антижук',
-        'PROSEPT',
-        'universal',
-        'ULTRA',
-        'grill',
-        'удаления',
-        'floor',
-        'remover',
-        'средство',
-        'стекол',
-        'зеркал',
-        'пластика',
-        'акриловых',
-        'bath',
-        'acryl',
-        'profi',
-        'Eco',
-        'multipower',
-        'xm11',
-        'graffiti',
-        'плесени',
-        'грибка',
-        'gel',
-        'снятия',
-        'shine',
-        'грунтовка',
-        '20л',
-        '10л',
-        '2л',
-        'hand',
-        'cristal',
-        'против',
-        'лак',
-        'полуматовый',
-        'глянцевый',
-        'невымываемый',
-        'машины',
-        'splash',
-        'орех',
-        'сlean',
-        'acid',
-        'polish',
-        'удаления',
-        'hard',
-        'посуды',
-        'полов',
-        'комнат',
-        'spray',
-        'посудомоечной',
-        'lime',
-        'rinser',
-        'sport',
-        'спортивной',
-        'черных',
-        'black',
-        'сауны',
-        'бани',
-        'труб',
-        'засоров',
-        'extra',
-        'после',
-        'очистки',
-        'ухода',
-        'мебелью',
-        'зеленый',
-        'красный',
-        'fungi',
+    selected = positions.tolist()
+    return [
+        (selected[position], l_d)
+        for position, l_d in extract(
+            query,
+            [catalog.names_processed[position] for position in selected],
+            levenshtein_distance_max,
+            length,
+            catalog.bounds.take(selected) if settings.SCORE_BOUNDS else None,
+        )
     ]
-    result = row
-    if type(result) is None:
-        return '-'
-    else:
-        for word in list_product_dealer:
-            tmp_str = result.split(str(word))
-            if len(tmp_str) > 1:
-                result = tmp_str[0] + ' ' + word + ' ' + tmp_str[1]
 
-        return result
 
+def extract_candidates(
+    query: str,
+    catalog: CatalogIndex,
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[Tuple[int, int]]:
+    """Find the best products scoring n-gram candidates first.
 
-def get_suitable_products(
-    dealer_product: str,
-    manufacturer_products: pd.Series,
+    Other products are scored only when their histogram bound reaches
+    the score of the last selected candidate, so the result is equal
+    to scoring the whole catalog.
+
+    Args:
+        query: prepared name of the dealer product.
+        catalog: index of the manufacturer products.
+        levenshtein_distance_max: difference between the names of two products.
+        length: length of the list of recommended products.
+
+    Returns:
+        Catalog positions of selected products with their scores.
+    """
+    candidates = catalog.ngrams.candidates(query, settings.NGRAM_CANDIDATES)
+    suitable_products = extract_positions(
+        query,
+        catalog,
+        candidates,
+        levenshtein_distance_max,
+        length,
+    )
+    threshold = levenshtein_distance_max
+    if len(suitable_products) >= length:
+        threshold = max(threshold, suitable_products[-1][1])
+    rest = catalog.bounds.upper(query) >= threshold
+    rest[candidates] = False
+    suitable_products.extend(
+        extract_positions(
+            query,
+            catalog,
+            np.flatnonzero(rest),
+            levenshtein_distance_max,
+            length,
+        ),
+    )
+    return sorted(
+        suitable_products,
+        key=lambda suitable_product: (
+            -suitable_product[1],
+            suitable_product[0],
+        ),
+    )[:length]
+
+
+def get_suitable_products_many(
+    dealer_products: List[str],
+    catalog: CatalogIndex,
     levenshtein_distance_max: int,
-) -> list:
-    """Create a model explanation system.
+    length: int,
+) -> List[List[Dict[str, Any]]]:
+    """Create a model explanation system for many dealer products.
+
+    Every distinct dealer product is scored once against the whole catalog.
 
     Args:
-        dealer_product: product sold by dealer.
-        manufacturer_products: list of the manufacturer products.
+        dealer_products: preprocessed products sold by dealers.
+        catalog: index of the manufacturer products.
         levenshtein_distance_max: difference between the names of two products.
+        length: length of the list of recommended products.
 
     Returns:
-        Array of suitable manufacturer products.
+        Arrays of suitable manufacturer products for every dealer product.
     """
-    suitable_products = []
-    for i in range(len(manufacturer_products)):
-        product = manufacturer_products['name_split'][i]
-        l_d = fuzz.token_sort_ratio(
-            get_not_continuous_words_when_entering(dealer_product),
-            product,
+    prepared = [full_process(product) for product in dealer_products]
+    queries = list(dict.fromkeys(prepared))
+    solutions = {
+        query: [
+            {
+                'id': catalog.ids[position],
+                'product_name': catalog.names[position],
+                'levenshtein_distance': l_d,
+            }
+            for position, l_d in suitable_products
+        ]
+        for query, suitable_products in zip(
+            queries,
+            extract_many(
+                queries,
+                catalog.names_processed,
+                levenshtein_distance_max,
+                length,
+                catalog.bounds if settings.SCORE_BOUNDS else None,
+            ),
         )
-        if l_d >= levenshtein_distance_max:
-            suitable_products.append(
-                {
-                    'id': manufacturer_products.loc[i]['id'],
-                    'product_name': manufacturer_products['name'][i],
-                    'levenshtein_distance': l_d,
-                },
-            )
-    return suitable_products
+    }
+    return [solutions[query] for query in prepared]
+
+
+def get_cache_key(
+    catalog: CatalogIndex,
+    dealer_product: str,
+    levenshtein_distance_max: int,
+) -> Tuple[str, str, str, int]:
+    """Get key of the cached ranking of dealer product.
+
+    N-gram pruning returns the same products as the full scan,
+    so single and batch rankings share the key.
+
+    Args:
+        catalog: index of the manufacturer products.
+        dealer_product: preprocessed product sold by dealer.
+        levenshtein_distance_max: difference between the names of two products.
+
+    Returns:
+        Normalized dealer product, catalog and scorer versions
+        and minimal score.
+    """
+    return (
+        full_process(dealer_product),
+        catalog.version,
+        SCORER_VERSION,
+        levenshtein_distance_max,
+    )
+
+
+async def find_known_solution(
+    dealer_id: int,
+    dealer_product: str,
+    product_url: Optional[str],
+) -> List[Dict[str, Any]]:
+    """Find manufacturer product already linked with dealer product.
+
+    Args:
+        dealer_id: id of dealer selling the product.
+        dealer_product: product sold by dealer.
+        product_url: url of the dealer product.
+
+    Returns:
+        Linked product with top score or empty array.
+    """
+    await link_index.load()
+    return get_known_solution(
+        await catalog_manager.get(),
+        dealer_id,
+        dealer_product,
+        product_url,
+    )
 
 
 async def get_solution(
     dealer_product: str,
     length: int = 10,
     levenshtein_distance_max: int = 50,
+    dealer_id: Optional[int] = None,
+    product_url: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """Sorting products in descending order of Levenshtein distance.
 
+    When the dealer product is already linked with a manufacturer product,
+    only that product is returned. Rankings of RESULT_CACHE_DEPTH products
+    are cached by normalized dealer product, so shorter lists are served
+    from the cache.
+
     Args:
         dealer_product: product sold by dealer,
         length: length of the list of recommended products,
-        levenshtein_distance_max: difference between the names of two products.
+        levenshtein_distance_max: difference between the names of two products,
+        dealer_id: id of dealer selling the product,
+        product_url: url of the dealer product.
 
     Returns:
         array of matching products in descending order of Levenshtein distance.
     """
-    manufacturer_products = pd.DataFrame(await ProductDAO.get_ids_names())
-    # manufacturer_products = pd.read_csv('manufacturer_data.csv')
-    manufacturer_products = manufacturer_products.dropna()
-    manufacturer_products['name_split'] = manufacturer_products.apply(
-        get_not_continuous_words,
-        axis=1,
-    )
-    suitable_solution = get_suitable_products(
-        get_not_continuous_words_when_entering(dealer_product),
-        manufacturer_products,
-        levenshtein_distance_max,
-    )
-    solution = sorted(
-        suitable_solution,
-        key=lambda x: x['levenshtein_distance'],
-        reverse=True,
+    if dealer_id is not None:
+        known_solution = await find_known_solution(
+            dealer_id,
+            dealer_product,
+            product_url,
+        )
+        if known_solution:
+            return known_solution
+    catalog = await catalog_manager.get()
+    dealer_product = get_not_continuous_words_when_entering(dealer_product)
+    if length > settings.RESULT_CACHE_DEPTH:
+        return await matching_executor.run(
+            catalog,
+            get_suitable_products,
+            dealer_product,
+            levenshtein_distance_max=levenshtein_distance_max,
+            length=length,
+        )
+    key = get_cache_key(catalog, dealer_product, levenshtein_distance_max)
+    solution = result_cache.get(key)
+    if solution is None:
+        solution = await matching_executor.run(
+            catalog,
+            get_suitable_products,
+            dealer_product,
+            levenshtein_distance_max=levenshtein_distance_max,
+            length=settings.RESULT_CACHE_DEPTH,
+        )
+        result_cache.set(key, solution)
+    return solution[:length]
+
+
+async def get_scored_solutions(
+    catalog: CatalogIndex,
+    dealer_products: List[str],
+    length: int,
+    levenshtein_distance_max: int,
+) -> List[List[Dict[str, Any]]]:
+    """Score many dealer products in one pass.
+
+    Only dealer products missing in the cache are scored.
+
+    Args:
+        catalog: index of the manufacturer products.
+        dealer_products: products sold by dealers,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: difference between the names of two products.
+
+    Returns:
+        arrays of matching products for every dealer product.
+    """
+    dealer_products = [
+        get_not_continuous_words_when_entering(product)
+        for product in dealer_products
+    ]
+    if length > settings.RESULT_CACHE_DEPTH:
+        return await matching_executor.run(
+            catalog,
+            get_suitable_products_many,
+            dealer_products,
+            levenshtein_distance_max=levenshtein_distance_max,
+            length=length,
+        )
+    keys = {
+        product: get_cache_key(catalog, product, levenshtein_distance_max)
+        for product in dealer_products
+    }
+    solutions: Dict[str, List[Dict[str, Any]]] = {}
+    missing = []
+    for product, key in keys.items():
+        cached = result_cache.get(key)
+        if cached is None:
+            missing.append(product)
+        else:
+            solutions[product] = cached
+    if missing:
+        for product, solution in zip(
+            missing,
+            await matching_executor.run(
+                catalog,
+                get_suitable_products_many,
+                missing,
+                levenshtein_distance_max=levenshtein_distance_max,
+                length=settings.RESULT_CACHE_DEPTH,
+            ),
+        ):
+            solutions[product] = solution
+            result_cache.set(keys[product], solution)
+    return [solutions[product][:length] for product in dealer_products]
+
+
+async def get_solutions(
+    dealer_products: List[str],
+    length: int = 10,
+    levenshtein_distance_max: int = 50,
+    dealer_ids: Optional[List[int]] = None,
+    product_urls: Optional[List[Optional[str]]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Get recommendations for many dealer products in one pass.
+
+    Dealer products already linked with manufacturer products
+    are not scored.
+
+    Args:
+        dealer_products: products sold by dealers,
+        length: length of the list of recommended products,
+        levenshtein_distance_max: difference between the names of two products,
+        dealer_ids: ids of dealers selling the products,
+        product_urls: urls of the dealer products.
+
+    Returns:
+        arrays of matching products for every dealer product.
+    """
+    catalog = await catalog_manager.get()
+    return await merge_known_solutions(
+        dealer_products,
+        dealer_ids,
+        product_urls,
+        lambda products: get_scored_solutions(
+            catalog,
+            products,
+            length,
+            levenshtein_distance_max,
+        ),
+        catalog,
     )
-    last_index = length if length < len(solution) else len(solution)
-    return solution[0:last_index]
 
 
 if __name__ == '__main__':
@@ -1,10 +1,26 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqladmin import Admin
 
 from app.api.v1.router import router_v1
+from app.config import logger, settings
 from app.core.admin import authentication_backend
+from app.core.router import router_core
+from app.core.warm_up import (
+    build_schemas,
+    open_connections,
+    prepare_catalog,
+    readiness,
+    score_dummy_product,
+)
 from app.database import engine
+from app.ds.engines import get_configured_engines
+from app.ds.executor import matching_executor
+from app.ds.links import link_index
+from app.ds.listener import catalog_listener
 from app.products.admin import (
     DealerAdmin,
     ParsedProductDealerAdmin,
@@ -15,14 +31,53 @@ from app.products.admin import (
 from app.users.admin import UserAdmin
 from app.users.router import router_auth, router_users
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm worker up before serving requests.
+
+    Database connections are opened, catalog index is built,
+    dummy product is scored and schemas are built, readiness endpoint
+    reports the worker as ready when all steps succeed.
+
+    Args:
+        app: application instance.
+    """
+    try:
+        await catalog_listener.start()
+    except Exception:
+        logger.exception('Product changes are not listened')
+    matching_engines = get_configured_engines()
+    await readiness.run(
+        'connections',
+        open_connections,
+        settings.DB_WARM_UP_CONNECTIONS,
+    )
+    if any(
+        matching_engine.uses_catalog for matching_engine in matching_engines
+    ):
+        await readiness.run('catalog', prepare_catalog, matching_engines)
+    await readiness.run('links', link_index.load)
+    await readiness.run('scoring', score_dummy_product, matching_engines)
+    await readiness.run('schemas', build_schemas, app)
+    readiness.completed = True
+    yield
+    readiness.completed = False
+    await catalog_listener.stop()
+    matching_executor.shutdown()
+    await engine.dispose()
+
+
 app = FastAPI(
     title='ProSept',
     version='0.1.0',
     docs_url='/api/v1/docs',
     openapi_url='/api/v1/openapi.json',
+    lifespan=lifespan,
 )
 
 app.include_router(router_v1, prefix='/api')
+app.include_router(router_core, prefix='/api')
 app.include_router(router_auth)
 app.include_router(router_users)
 
@@ -0,0 +1,50 @@
+"""Dealer price date indexes
+
+Revision ID: 0c7d2f5a9e14
+Revises: f6b1d8e3a5c9
+Create Date: 2026-10-18 22:12:45.361804
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0c7d2f5a9e14'
+down_revision: Union[str, None] = 'f6b1d8e3a5c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # indexes are built without locking writes, which is not possible
+    # inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_marketing_dealerprice_dealer_id_date',
+            'marketing_dealerprice',
+            ['dealer_id', 'date'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_marketing_dealerprice_date',
+            'marketing_dealerprice',
+            ['date'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_marketing_dealerprice_date',
+            table_name='marketing_dealerprice',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_marketing_dealerprice_dealer_id_date',
+            table_name='marketing_dealerprice',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,42 @@
+"""Latin normalized names
+
+Revision ID: a4c8e2f6d1b9
+Revises: d3a7f5c1e9b4
+Create Date: 2026-10-19 10:12:44.918305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6d1b9'
+down_revision: Union[str, None] = 'd3a7f5c1e9b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LATIN_CHARACTERS = '[\\u0080-\\u00ff]'
+
+
+def upgrade() -> None:
+    # characters from 128 to 255 are removed by normalization now,
+    # names containing them are normalized again: product names by
+    # listeners, dealer names by import_dealer_names
+    op.execute(
+        f"""
+        UPDATE marketing_product
+        SET name_normalized = NULL
+        WHERE name ~ '{LATIN_CHARACTERS}'
+        """,
+    )
+    op.execute(
+        f"""
+        UPDATE marketing_dealerprice
+        SET name_id = NULL
+        WHERE product_name ~ '{LATIN_CHARACTERS}'
+        """,
+    )
+
+
+def downgrade() -> None:
+    pass
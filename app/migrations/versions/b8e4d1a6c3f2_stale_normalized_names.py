@@ -0,0 +1,51 @@
+"""Stale normalized names
+
+Revision ID: b8e4d1a6c3f2
+Revises: 0c7d2f5a9e14
+Create Date: 2026-10-18 23:05:37.214860
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4d1a6c3f2'
+down_revision: Union[str, None] = '0c7d2f5a9e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # normalized name of renamed product is cleared unless it is changed
+    # by the same statement, listeners fill it again
+    op.execute(
+        """
+        CREATE FUNCTION clear_stale_normalized_name() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NEW.name IS DISTINCT FROM OLD.name
+                AND NEW.name_normalized IS NOT DISTINCT FROM
+                    OLD.name_normalized
+            THEN
+                NEW.name_normalized := NULL;
+            END IF;
+            RETURN NEW;
+        END;
+        $$
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_stale_normalized_name
+        BEFORE UPDATE OF name ON marketing_product
+        FOR EACH ROW EXECUTE FUNCTION clear_stale_normalized_name()
+        """,
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        'DROP TRIGGER product_stale_normalized_name ON marketing_product',
+    )
+    op.execute('DROP FUNCTION clear_stale_normalized_name()')
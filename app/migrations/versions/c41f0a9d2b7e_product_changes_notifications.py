@@ -0,0 +1,101 @@
+"""Product changes notifications
+
+Revision ID: c41f0a9d2b7e
+Revises: 3aed651e6a4a
+Create Date: 2026-10-18 16:05:41.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f0a9d2b7e'
+down_revision: Union[str, None] = '3aed651e6a4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MAX_NOTIFIED_IDS = 500
+
+
+def upgrade() -> None:
+    op.execute('CREATE SEQUENCE marketing_product_change_seq')
+    op.execute(
+        f"""
+        CREATE FUNCTION notify_product_changes() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            changed_ids integer[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(id) INTO changed_ids FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(id) INTO changed_ids FROM old_rows;
+            ELSIF TG_OP = 'UPDATE' THEN
+                SELECT array_agg(coalesce(new_rows.id, old_rows.id))
+                INTO changed_ids
+                FROM new_rows
+                FULL JOIN old_rows ON new_rows.id = old_rows.id
+                WHERE new_rows.name IS DISTINCT FROM old_rows.name
+                    OR new_rows.id IS NULL
+                    OR old_rows.id IS NULL;
+            END IF;
+            IF TG_OP <> 'TRUNCATE' AND changed_ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify(
+                'product_changes',
+                json_build_object(
+                    'sequence', nextval('marketing_product_change_seq'),
+                    'operation', TG_OP,
+                    'ids', CASE
+                        WHEN cardinality(changed_ids) <= {MAX_NOTIFIED_IDS}
+                        THEN changed_ids
+                    END
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_changes_insert
+        AFTER INSERT ON marketing_product
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_product_changes()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_changes_update
+        AFTER UPDATE ON marketing_product
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_product_changes()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_changes_delete
+        AFTER DELETE ON marketing_product
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_product_changes()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_changes_truncate
+        AFTER TRUNCATE ON marketing_product
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_product_changes()
+        """,
+    )
+
+
+def downgrade() -> None:
+    for operation in ('insert', 'update', 'delete', 'truncate'):
+        op.execute(
+            f'DROP TRIGGER product_changes_{operation} ON marketing_product',
+        )
+    op.execute('DROP FUNCTION notify_product_changes()')
+    op.execute('DROP SEQUENCE marketing_product_change_seq')
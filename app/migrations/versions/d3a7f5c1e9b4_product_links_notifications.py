@@ -0,0 +1,151 @@
+"""Product links notifications
+
+Revision ID: d3a7f5c1e9b4
+Revises: b8e4d1a6c3f2
+Create Date: 2026-10-18 23:48:12.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7f5c1e9b4'
+down_revision: Union[str, None] = 'b8e4d1a6c3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MAX_NOTIFIED_IDS = 500
+
+
+def upgrade() -> None:
+    # ids of parsing data with new links are sent, removed links are sent
+    # without ids, so listeners load all links again
+    op.execute(
+        f"""
+        CREATE FUNCTION notify_dealer_price_links() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            changed_ids integer[];
+            removed boolean;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(id), false INTO changed_ids, removed
+                FROM new_rows
+                WHERE product_key IS NOT NULL;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT NULL, bool_or(product_key IS NOT NULL)
+                INTO changed_ids, removed
+                FROM old_rows;
+            ELSE
+                SELECT
+                    array_agg(new_rows.id)
+                        FILTER (WHERE new_rows.product_key IS NOT NULL),
+                    coalesce(bool_or(new_rows.product_key IS NULL), false)
+                INTO changed_ids, removed
+                FROM new_rows
+                JOIN old_rows ON new_rows.id = old_rows.id
+                WHERE new_rows.product_key IS DISTINCT FROM
+                        old_rows.product_key
+                    OR new_rows.product_key IS NOT NULL AND (
+                        new_rows.product_name IS DISTINCT FROM
+                            old_rows.product_name
+                        OR new_rows.product_url IS DISTINCT FROM
+                            old_rows.product_url
+                    );
+            END IF;
+            IF changed_ids IS NULL AND NOT coalesce(removed, false) THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify(
+                'product_links',
+                json_build_object(
+                    'ids', CASE
+                        WHEN NOT coalesce(removed, false)
+                            AND cardinality(changed_ids) <= {MAX_NOTIFIED_IDS}
+                        THEN changed_ids
+                    END
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$
+        """,
+    )
+    op.execute(
+        """
+        CREATE FUNCTION notify_product_dealer_links() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NOT EXISTS (
+                SELECT 1
+                FROM new_rows
+                JOIN old_rows ON new_rows.key = old_rows.key
+                WHERE new_rows.product_id IS DISTINCT FROM
+                    old_rows.product_id
+            ) THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify(
+                'product_links',
+                json_build_object('ids', NULL)::text
+            );
+            RETURN NULL;
+        END;
+        $$
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER dealer_price_links_insert
+        AFTER INSERT ON marketing_dealerprice
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_dealer_price_links()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER dealer_price_links_update
+        AFTER UPDATE ON marketing_dealerprice
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_dealer_price_links()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER dealer_price_links_delete
+        AFTER DELETE ON marketing_dealerprice
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_dealer_price_links()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_dealer_links_update
+        AFTER UPDATE ON marketing_productdealerkey
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_product_dealer_links()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_dealer_links_delete
+        AFTER DELETE ON marketing_productdealerkey
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_product_dealer_links()
+        """,
+    )
+
+
+def downgrade() -> None:
+    for operation in ('insert', 'update', 'delete'):
+        op.execute(
+            f'DROP TRIGGER dealer_price_links_{operation} '
+            'ON marketing_dealerprice',
+        )
+    for operation in ('update', 'delete'):
+        op.execute(
+            f'DROP TRIGGER product_dealer_links_{operation} '
+            'ON marketing_productdealerkey',
+        )
+    op.execute('DROP FUNCTION notify_product_dealer_links()')
+    op.execute('DROP FUNCTION notify_dealer_price_links()')
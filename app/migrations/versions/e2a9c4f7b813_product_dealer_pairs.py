@@ -0,0 +1,116 @@
+"""Product dealer pairs
+
+Duplicate keys of the same dealer and product are merged into the least
+key before the pair is made unique. Deleted keys are copied to
+marketing_productdealerkey_duplicate and the previous keys of the
+remapped parsing data to marketing_dealerprice_product_key_backup.
+Downgrade is lossy: it only drops the constraint, merged keys are not
+restored and the backup tables are kept. Rows of the backup tables
+are marked by the time of the upgrade.
+
+Revision ID: e2a9c4f7b813
+Revises: 7b3f9c2d4e61
+Create Date: 2026-10-18 20:41:17.530264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c4f7b813'
+down_revision: Union[str, None] = '7b3f9c2d4e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS marketing_productdealerkey_duplicate (
+            id integer NOT NULL,
+            key integer NOT NULL,
+            dealer_id integer NOT NULL,
+            product_id integer NOT NULL,
+            kept_key integer NOT NULL,
+            migrated_at timestamp with time zone NOT NULL DEFAULT now()
+        )
+        """,
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS marketing_dealerprice_product_key_backup (
+            dealerprice_id integer NOT NULL,
+            product_key integer NOT NULL,
+            kept_key integer NOT NULL,
+            migrated_at timestamp with time zone NOT NULL DEFAULT now()
+        )
+        """,
+    )
+    # every duplicate key of the pair is replaced by the least key
+    op.execute(
+        """
+        INSERT INTO marketing_productdealerkey_duplicate
+            (id, key, dealer_id, product_id, kept_key)
+        SELECT id, key, dealer_id, product_id, kept_key
+        FROM (
+            SELECT
+                id,
+                key,
+                dealer_id,
+                product_id,
+                min(key) OVER (PARTITION BY dealer_id, product_id)
+                    AS kept_key
+            FROM marketing_productdealerkey
+        ) AS keys
+        WHERE key <> kept_key
+        """,
+    )
+    op.execute(
+        """
+        INSERT INTO marketing_dealerprice_product_key_backup
+            (dealerprice_id, product_key, kept_key)
+        SELECT
+            marketing_dealerprice.id,
+            marketing_dealerprice.product_key,
+            duplicate.kept_key
+        FROM marketing_dealerprice
+        JOIN marketing_productdealerkey_duplicate AS duplicate
+            ON marketing_dealerprice.product_key = duplicate.key
+        WHERE duplicate.migrated_at = now()
+        """,
+    )
+    op.execute(
+        """
+        UPDATE marketing_dealerprice
+        SET product_key = duplicate.kept_key
+        FROM marketing_productdealerkey_duplicate AS duplicate
+        WHERE marketing_dealerprice.product_key = duplicate.key
+            AND duplicate.migrated_at = now()
+        """,
+    )
+    op.execute(
+        """
+        DELETE FROM marketing_productdealerkey
+        USING marketing_productdealerkey_duplicate AS duplicate
+        WHERE marketing_productdealerkey.key = duplicate.key
+            AND duplicate.migrated_at = now()
+        """,
+    )
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_unique_constraint(
+        'uq_marketing_productdealerkey_dealer_id_product_id',
+        'marketing_productdealerkey',
+        ['dealer_id', 'product_id'],
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_constraint(
+        'uq_marketing_productdealerkey_dealer_id_product_id',
+        'marketing_productdealerkey',
+        type_='unique',
+    )
+    # ### end Alembic commands ###
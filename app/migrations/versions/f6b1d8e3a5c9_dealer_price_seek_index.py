@@ -0,0 +1,38 @@
+"""Dealer price seek index
+
+Revision ID: f6b1d8e3a5c9
+Revises: e2a9c4f7b813
+Create Date: 2026-10-18 21:36:02.918475
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b1d8e3a5c9'
+down_revision: Union[str, None] = 'e2a9c4f7b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # index is built without locking writes, which is not possible
+    # inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_marketing_dealerprice_dealer_id_id',
+            'marketing_dealerprice',
+            ['dealer_id', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_marketing_dealerprice_dealer_id_id',
+            table_name='marketing_dealerprice',
+            postgresql_concurrently=True,
+        )
@@ -1,6 +1,11 @@
 # mypy: disable-error-code="list-item, assignment"
+from typing import Any, Dict
+
 from sqladmin import ModelView
+from starlette.requests import Request
 
+from app.ds.normalizer import normalize_product_name
+from app.products.dao import ParsedProductDealerDAO
 from app.products.models import (
     Dealer,
     ParsedProductDealer,
@@ -8,6 +13,7 @@ from app.products.models import (
     ProductDealer,
     Statistics,
 )
+from app.products.utils import get_name_ids
 
 
 class DealerAdmin(ModelView, model=Dealer):
@@ -30,10 +36,31 @@ class ProductAdmin(ModelView, model=Product):
         Product.id,
         Product.name,
     )
+    form_excluded_columns = (Product.name_normalized,)
     icon = 'fa-solid fa-barcode'
     name = 'Product'
     name_plural = 'Products'
 
+    async def on_model_change(
+        self,
+        data: Dict[str, Any],
+        model: Product,
+        is_created: bool,
+        request: Request,
+    ) -> None:
+        """Update normalized name used for candidates retrieval.
+
+        Args:
+            data: form data.
+            model: changed product.
+            is_created: product is created.
+            request: admin area request.
+        """
+        name = data.get('name')
+        data['name_normalized'] = (
+            normalize_product_name(name) if name else None
+        )
+
 
 class ProductDealerAdmin(ModelView, model=ProductDealer):
     """Presentation of the product-dealer model in the admin area."""
@@ -69,10 +96,38 @@ class ParsedProductDealerAdmin(ModelView, model=ParsedProductDealer):
         ParsedProductDealer.date,
         ParsedProductDealer.product_key,
     )
+    form_excluded_columns = (ParsedProductDealer.dealer_name,)
     icon = 'fa-regular fa-circle-down'
     name = 'Parsing data'
     name_plural = 'Parsing data'
 
+    async def after_model_change(
+        self,
+        data: Dict[str, Any],
+        model: ParsedProductDealer,
+        is_created: bool,
+        request: Request,
+    ) -> None:
+        """Link parsing data with its normalized name.
+
+        Args:
+            data: form data.
+            model: changed parsing data.
+            is_created: parsing data is created.
+            request: admin area request.
+        """
+        name_ids = await get_name_ids(
+            [
+                {
+                    'dealer_id': model.dealer_id,
+                    'product_name': model.product_name,
+                },
+            ],
+        )
+        await ParsedProductDealerDAO.update_name_ids(
+            {int(model.id): name_ids[0]},
+        )
+
 
 class StatisticsAdmin(ModelView, model=Statistics):
     """Statistics representation in admin zone."""
@@ -0,0 +1,293 @@
+import asyncio
+import json
+import os
+import sys
+from itertools import chain
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import AUTO_MATCH_CHECKPOINT, CHOOSE_ATTEMPTS, logger, settings
+from app.database import async_session_maker
+from app.ds.catalog import catalog_manager
+from app.ds.executor import MatchingExecutor
+from app.ds.links import get_known_solution, link_index
+from app.ds.normalizer import normalize_dealer_name
+from app.ds.solution_v_2 import get_suitable_products_many
+from app.products.dao import (
+    ParsedProductDealerDAO,
+    ProductDealerDAO,
+    StatisticsDAO,
+)
+
+IMPORTING_PER_TIME = 1000
+
+
+def select_match(
+    solution: List[Dict[str, Any]],
+    threshold: int,
+) -> Optional[int]:
+    """Select manufacturer product matched with enough confidence.
+
+    Args:
+        solution: best scored manufacturer products.
+        threshold: minimal score of the product.
+
+    Returns:
+        Id of the product or None if the best score is below threshold
+        or is shared by another product.
+    """
+    if not solution or solution[0]['levenshtein_distance'] < threshold:
+        return None
+    if (
+        len(solution) > 1
+        and solution[1]['levenshtein_distance']
+        == solution[0]['levenshtein_distance']
+    ):
+        return None
+    return solution[0]['id']
+
+
+def read_checkpoint(catalog_version: str, threshold: int) -> int:
+    """Read id of the last processed parsing data item.
+
+    Args:
+        catalog_version: fingerprint of the product table.
+        threshold: minimal score of the product.
+
+    Returns:
+        Id of the last processed item or 0 if processing was done
+        with another catalog or threshold.
+    """
+    try:
+        with open(AUTO_MATCH_CHECKPOINT, 'r', encoding='utf-8') as file:
+            checkpoint = json.load(file)
+    except (OSError, ValueError):
+        return 0
+    if (
+        checkpoint.get('catalogVersion') != catalog_version
+        or checkpoint.get('threshold') != threshold
+    ):
+        return 0
+    return int(checkpoint.get('lastId', 0))
+
+
+def write_checkpoint(
+    catalog_version: str,
+    threshold: int,
+    last_id: int,
+) -> None:
+    """Save id of the last processed parsing data item.
+
+    Args:
+        catalog_version: fingerprint of the product table.
+        threshold: minimal score of the product.
+        last_id: id of the last processed item.
+    """
+    temporary = f'{AUTO_MATCH_CHECKPOINT}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(
+            {
+                'catalogVersion': catalog_version,
+                'threshold': threshold,
+                'lastId': last_id,
+            },
+            file,
+        )
+    os.replace(temporary, AUTO_MATCH_CHECKPOINT)
+
+
+async def get_pair_keys(
+    pairs: List[Tuple[int, int]],
+) -> Dict[Tuple[int, int], int]:
+    """Get keys of dealer and product pairs creating missing.
+
+    Keys taken by products chosen at the same time are not inserted,
+    keys of such pairs are read again and the rest is retried
+    up to CHOOSE_ATTEMPTS times.
+
+    Args:
+        pairs: distinct dealer and product pairs.
+
+    Returns:
+        Keys of the pairs, pairs without key are missing.
+    """
+    keys = await ProductDealerDAO.get_keys_by_pairs(pairs)
+    for attempt in range(1, CHOOSE_ATTEMPTS + 1):
+        missing = [pair for pair in pairs if pair not in keys]
+        if not missing:
+            break
+        if attempt > 1:
+            logger.warning(
+                f'Product-dealer keys of {len(missing)} pairs were taken, '
+                f'attempt {attempt - 1} failed',
+            )
+        keys.update(await ProductDealerDAO.create_keys(missing))
+        keys.update(
+            await ProductDealerDAO.get_keys_by_pairs(
+                [pair for pair in missing if pair not in keys],
+            ),
+        )
+    return keys
+
+
+async def link_products(
+    parsed_data: List[Dict[str, Any]],
+    product_ids: List[int],
+) -> int:
+    """Link parsing data items with manufacturer products.
+
+    Missing dealer and product pairs are created. Keys and statistics
+    are updated in one transaction only for items still not linked
+    and not skipped by operator. Items whose pair got no key are left
+    for the next run.
+
+    Args:
+        parsed_data: parsing data items.
+        product_ids: ids of the matched manufacturer products.
+
+    Returns:
+        Amount of linked items.
+    """
+    pairs = [
+        (item['dealer_id'], product_id)
+        for item, product_id in zip(parsed_data, product_ids)
+    ]
+    keys = await get_pair_keys(list(dict.fromkeys(pairs)))
+    linked = {
+        item['id']: keys[pair]
+        for item, pair in zip(parsed_data, pairs)
+        if pair in keys
+    }
+    if len(linked) < len(parsed_data):
+        logger.error(
+            f'{len(parsed_data) - len(linked)} parsing data '
+            f'were not linked, product-dealer keys were not created',
+        )
+    async with async_session_maker() as session:
+        updated = await ParsedProductDealerDAO.update_keys(linked, session)
+        await StatisticsDAO.update_success_many(updated, session)
+        await session.commit()
+    if len(updated) < len(linked):
+        logger.debug(
+            f'{len(linked) - len(updated)} parsing data were linked '
+            f'or skipped by operator while matching',
+        )
+    return len(updated)
+
+
+async def auto_match() -> None:
+    """Link unmatched parsing data with confidently matched products.
+
+    Every normalized dealer name is scored once per run, parsing data
+    of the same listing parsed on different days reuse its solution.
+    """
+    catalog = await catalog_manager.build()
+    await link_index.load()
+    threshold = settings.AUTO_MATCH_THRESHOLD
+    executor = MatchingExecutor(
+        'process',
+        settings.AUTO_MATCH_WORKERS or os.cpu_count(),
+    )
+    executor.start(catalog)
+    last_id = read_checkpoint(catalog.version, threshold)
+    logger.debug(
+        f'Auto matching with threshold {threshold} '
+        f'for catalog {catalog.version}, starting after id {last_id}',
+    )
+    processed_number = 0
+    matched_number = 0
+    name_solutions: Dict[str, List[Dict[str, Any]]] = {}
+    started = perf_counter()
+    while True:
+        parsed_data = await ParsedProductDealerDAO.get_unmatched(
+            last_id,
+            IMPORTING_PER_TIME,
+        )
+        if not parsed_data:
+            break
+        known_solutions = [
+            get_known_solution(
+                catalog,
+                item['dealer_id'],
+                item['product_name'],
+                item['product_url'],
+            )
+            for item in parsed_data
+        ]
+        names = [
+            item['normalized_name']
+            or normalize_dealer_name(str(item['product_name']))
+            for item in parsed_data
+        ]
+        dealer_products = list(
+            dict.fromkeys(
+                name
+                for name, known_solution in zip(names, known_solutions)
+                if not known_solution and name not in name_solutions
+            ),
+        )
+        size = max(1, -(-len(dealer_products) // executor.workers))
+        name_solutions.update(
+            zip(
+                dealer_products,
+                chain.from_iterable(
+                    await asyncio.gather(
+                        *[
+                            executor.run(
+                                catalog,
+                                get_suitable_products_many,
+                                dealer_products[start : start + size],
+                                levenshtein_distance_max=threshold,
+                                length=2,
+                            )
+                            for start in range(0, len(dealer_products), size)
+                        ],
+                    ),
+                ),
+            ),
+        )
+        matches = [
+            (
+                item,
+                select_match(
+                    known_solution or name_solutions[name],
+                    threshold,
+                ),
+            )
+            for item, name, known_solution in zip(
+                parsed_data,
+                names,
+                known_solutions,
+            )
+        ]
+        matched = [
+            (item, product_id)
+            for item, product_id in matches
+            if product_id is not None
+        ]
+        linked_number = await link_products(
+            [item for item, _ in matched],
+            [product_id for _, product_id in matched],
+        )
+        last_id = parsed_data[-1]['id']
+        write_checkpoint(catalog.version, threshold, last_id)
+        processed_number += len(parsed_data)
+        matched_number += linked_number
+        logger.debug(
+            f'Processed {processed_number} parsing data, '
+            f'{processed_number / (perf_counter() - started):.1f} rows/sec',
+        )
+    executor.shutdown()
+    elapsed = perf_counter() - started
+    logger.debug(
+        f'Auto matching completed, {matched_number} of {processed_number} '
+        f'parsing data linked in {elapsed:.1f} sec, '
+        f'{processed_number / elapsed if elapsed else 0:.1f} rows/sec',
+    )
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(auto_match())
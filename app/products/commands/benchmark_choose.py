@@ -0,0 +1,216 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.config import logger
+from app.database import async_session_maker
+from app.products.dao import (
+    ParsedProductDealerDAO,
+    ProductDAO,
+    ProductDealerDAO,
+    StatisticsDAO,
+)
+from app.products.utils import generate_product_dealer_key
+
+BENCHMARK_CHOICES = 500
+BENCHMARK_CONCURRENCY = '1,8,32'
+BENCHMARK_OUTPUT = 'benchmark_choose.json'
+RANDOM_SEED = 42
+
+
+async def run_step(
+    method: Callable[..., Awaitable[Any]],
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """Run one query of the previous choice in its own session.
+
+    Session is closed without commit, so changes are rolled back.
+
+    Args:
+        method: DAO method.
+        args: positional arguments of the method.
+        kwargs: keyword arguments of the method.
+
+    Returns:
+        Result of the method.
+    """
+    async with async_session_maker() as session:
+        return await method(*args, session=session, **kwargs)
+
+
+async def choose_sequentially(parsed_data_id: int, product_id: int) -> None:
+    """Choose product with the previous sequence of queries.
+
+    Every query runs in its own session as before, changes are
+    rolled back, so parsing data keeps its key, which exists.
+
+    Args:
+        parsed_data_id: id of parsing data item.
+        product_id: id of chosen product.
+    """
+    parsed_data = await run_step(
+        ParsedProductDealerDAO.find_by_id,
+        parsed_data_id,
+    )
+    if not parsed_data or not await run_step(
+        ProductDAO.find_by_id,
+        product_id,
+    ):
+        return None
+    key = await run_step(
+        ProductDealerDAO.get_key,
+        product_id,
+        parsed_data.dealer_id,
+    )
+    if not parsed_data.product_key:
+        await run_step(StatisticsDAO.update_success, parsed_data_id)
+    if key is None:
+        await run_step(
+            ProductDealerDAO.create,
+            dealer_id=parsed_data.dealer_id,
+            product_id=product_id,
+            key=await generate_product_dealer_key(),
+        )
+    await run_step(
+        ParsedProductDealerDAO.update_key,
+        parsed_data_id,
+        parsed_data.product_key,
+    )
+
+
+async def choose_in_transaction(parsed_data_id: int, product_id: int) -> None:
+    """Choose product with one statement, changes are rolled back.
+
+    Args:
+        parsed_data_id: id of parsing data item.
+        product_id: id of chosen product.
+    """
+    async with async_session_maker() as session:
+        await ParsedProductDealerDAO.choose_product(
+            parsed_data_id,
+            product_id,
+            session,
+        )
+
+
+METHODS: Dict[str, Callable[[int, int], Awaitable[None]]] = {
+    'sequential': choose_sequentially,
+    'transaction': choose_in_transaction,
+}
+
+
+async def run_method(
+    method: Callable[[int, int], Awaitable[None]],
+    choices: List[Tuple[int, int]],
+    concurrency: int,
+) -> Dict[str, Any]:
+    """Measure latency of choices made by concurrent operators.
+
+    Args:
+        method: function choosing product for parsing data.
+        choices: parsing data and product ids.
+        concurrency: amount of concurrent operators.
+
+    Returns:
+        Latency percentiles and throughput.
+    """
+    queue: asyncio.Queue[Tuple[int, int]] = asyncio.Queue()
+    for choice in choices:
+        queue.put_nowait(choice)
+    latencies: List[float] = []
+
+    async def operate() -> None:
+        while not queue.empty():
+            parsed_data_id, product_id = queue.get_nowait()
+            started = perf_counter()
+            await method(parsed_data_id, product_id)
+            latencies.append(perf_counter() - started)
+
+    started = perf_counter()
+    await asyncio.gather(*(operate() for _ in range(concurrency)))
+    elapsed = perf_counter() - started
+    percentiles = (
+        np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        if latencies
+        else [0.0, 0.0, 0.0]
+    )
+    return {
+        'latencyP50Ms': round(float(percentiles[0]), 3),
+        'latencyP95Ms': round(float(percentiles[1]), 3),
+        'latencyP99Ms': round(float(percentiles[2]), 3),
+        'throughput': round(len(latencies) / elapsed, 1) if elapsed else 0,
+    }
+
+
+async def benchmark_choose(
+    choices_number: int = BENCHMARK_CHOICES,
+    concurrency: str = BENCHMARK_CONCURRENCY,
+    output: str = BENCHMARK_OUTPUT,
+) -> Dict[str, Any]:
+    """Benchmark choosing products before and after one statement choice.
+
+    Random products are chosen for random parsing data items,
+    every choice is rolled back, so data is not changed.
+
+    Args:
+        choices_number: amount of choices for every run.
+        concurrency: comma separated amounts of concurrent operators.
+        output: path of the JSON file with results.
+
+    Returns:
+        Benchmark results.
+    """
+    randomizer = random.Random(RANDOM_SEED)
+    parsed_data_ids = await ParsedProductDealerDAO.get_ids()
+    product_ids = await ProductDAO.get_ids()
+    if not parsed_data_ids or not product_ids:
+        logger.error('No parsing data or products to benchmark choices')
+        return {}
+    choices = [
+        (randomizer.choice(parsed_data_ids), randomizer.choice(product_ids))
+        for _ in range(choices_number)
+    ]
+    results = []
+    for operators in [int(number) for number in concurrency.split(',')]:
+        for name, method in METHODS.items():
+            result = {
+                'method': name,
+                'concurrency': operators,
+                'choices': len(choices),
+            }
+            result.update(await run_method(method, choices, operators))
+            logger.debug(f'Choice benchmark result: {result}')
+            results.append(result)
+    report = {'createdAt': datetime.now().isoformat(), 'results': results}
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=4)
+    logger.debug(f'Choice benchmark results saved to {output}')
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark choosing products for parsing data.',
+    )
+    parser.add_argument('--choices', type=int, default=BENCHMARK_CHOICES)
+    parser.add_argument('--concurrency', default=BENCHMARK_CONCURRENCY)
+    parser.add_argument('--output', default=BENCHMARK_OUTPUT)
+    arguments = parser.parse_args()
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(
+        benchmark_choose(
+            arguments.choices,
+            arguments.concurrency,
+            arguments.output,
+        ),
+    )
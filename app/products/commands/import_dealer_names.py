@@ -0,0 +1,43 @@
+import sys
+
+from app.config import logger
+from app.products.dao import ParsedProductDealerDAO
+from app.products.utils import get_name_ids
+
+IMPORTING_PER_TIME = 1000
+
+
+async def import_dealer_names() -> None:
+    """Fill normalized names of parsing data imported without them."""
+    new_number = 0
+    last_id = 0
+    while True:
+        parsed_data = await ParsedProductDealerDAO.get_without_name(
+            last_id,
+            IMPORTING_PER_TIME,
+        )
+        if not parsed_data:
+            break
+        last_id = parsed_data[-1]['id']
+        await ParsedProductDealerDAO.update_name_ids(
+            {
+                item['id']: name_id
+                for item, name_id in zip(
+                    parsed_data,
+                    await get_name_ids(parsed_data),
+                )
+            },
+        )
+        new_number += len(parsed_data)
+    logger.debug(
+        f'Import completed, names of {new_number} parsing data normalized',
+    )
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(import_dealer_names())
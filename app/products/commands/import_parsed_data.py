@@ -7,6 +7,7 @@ from numpy import nan
 from app.config import DATA_IMPORT_LOCATION, CSVFilenames, logger
 from app.core.utils import convert_string_to_float
 from app.products.dao import ParsedProductDealerDAO, StatisticsDAO
+from app.products.utils import get_name_ids
 
 IMPORTING_PER_TIME = 1000
 
@@ -36,10 +37,14 @@ async def import_parsed_data() -> None:
         data_ids = data[['id']].copy()
         data_ids = data_ids.rename(columns={'id': 'parsed_data_id'})
         dicts = data.to_dict('records')
+        for start in range(0, len(dicts), IMPORTING_PER_TIME):
+            chunk = dicts[start : start + IMPORTING_PER_TIME]
+            for item, name_id in zip(chunk, await get_name_ids(chunk)):
+                item['name_id'] = name_id
         amount_of_iterations = len(dicts) // IMPORTING_PER_TIME
         for iterator in range(amount_of_iterations):
             await ParsedProductDealerDAO.create_many(
-                data.to_dict('records')[
+                dicts[
                     iterator
                     * IMPORTING_PER_TIME : (iterator + 1)
                     * IMPORTING_PER_TIME
@@ -53,9 +58,7 @@ async def import_parsed_data() -> None:
                 ],
             )
         await ParsedProductDealerDAO.create_many(
-            data.to_dict('records')[
-                amount_of_iterations * IMPORTING_PER_TIME :
-            ],
+            dicts[amount_of_iterations * IMPORTING_PER_TIME :],
         )
         await StatisticsDAO.create_many(
             data_ids.to_dict('records')[
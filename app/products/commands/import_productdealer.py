@@ -32,6 +32,24 @@ async def import_productdealer() -> None:
         for index, row in data.iterrows():
             if int(row['key']) in existing_productdealer_keys:
                 data.drop(index, inplace=True)
+        data = data.drop_duplicates(['dealer_id', 'product_id'])
+        existing_pairs = await ProductDealerDAO.get_keys_by_pairs(
+            list(
+                zip(
+                    data['dealer_id'].astype(int).tolist(),
+                    data['product_id'].astype(int).tolist(),
+                ),
+            ),
+        )
+        data = data[
+            [
+                (int(dealer_id), int(product_id)) not in existing_pairs
+                for dealer_id, product_id in zip(
+                    data['dealer_id'],
+                    data['product_id'],
+                )
+            ]
+        ]
         new_number = len(data.index)
         await ProductDealerDAO.create_many(data.to_dict('records'))
         wrong_data = wrong_data.drop('key', axis=1)
@@ -0,0 +1,80 @@
+import asyncio
+import sys
+
+from app.config import logger, settings
+from app.ds.catalog import catalog_manager
+from app.ds.executor import matching_executor
+from app.ds.solution_v_2 import get_suitable_products_many
+from app.products.dao import DealerNameDAO, RecommendationDAO
+
+IMPORTING_PER_TIME = 1000
+SCORING_PER_TIME = 100
+LEVENSHTEIN_DISTANCE_MAX = 50
+
+
+async def import_recommendations() -> None:
+    """Precompute recommendations for names of unmatched parsing data.
+
+    Every normalized dealer name is scored once, parsing data
+    of the same listing parsed on different days share recommendations.
+    """
+    catalog = await catalog_manager.build()
+    logger.debug(
+        f'Precomputing recommendations for catalog {catalog.version}',
+    )
+    matching_executor.start(catalog)
+    await RecommendationDAO.delete_stale(catalog.version)
+    new_number = 0
+    last_id = 0
+    while True:
+        names = await DealerNameDAO.get_without_recommendations(
+            catalog.version,
+            last_id,
+            IMPORTING_PER_TIME,
+        )
+        if not names:
+            break
+        last_id = names[-1]['id']
+        chunks = [
+            names[start : start + SCORING_PER_TIME]
+            for start in range(0, len(names), SCORING_PER_TIME)
+        ]
+        chunks_solutions = await asyncio.gather(
+            *[
+                matching_executor.run(
+                    catalog,
+                    get_suitable_products_many,
+                    [name['normalized_name'] for name in chunk],
+                    levenshtein_distance_max=LEVENSHTEIN_DISTANCE_MAX,
+                    length=settings.RECOMMENDATIONS_TOP_K,
+                )
+                for chunk in chunks
+            ],
+        )
+        for chunk, solutions in zip(chunks, chunks_solutions):
+            await RecommendationDAO.create_many(
+                [
+                    {
+                        'name_id': name['id'],
+                        'product_id': solution['id'],
+                        'score': solution['levenshtein_distance'],
+                        'rank': rank,
+                        'catalog_version': catalog.version,
+                    }
+                    for name, name_solutions in zip(chunk, solutions)
+                    for rank, solution in enumerate(name_solutions)
+                ],
+            )
+        new_number += len(names)
+    matching_executor.shutdown()
+    logger.debug(
+        f'Import completed, recommendations for {new_number} '
+        'dealer names precomputed',
+    )
+
+
+if __name__ == '__main__':
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(import_recommendations())
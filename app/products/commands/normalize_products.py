@@ -0,0 +1,34 @@
+import sys
+
+from app.config import logger
+from app.ds.normalizer import normalize_product_name
+from app.products.dao import ProductDAO
+
+IMPORTING_PER_TIME = 1000
+
+
+async def normalize_products() -> None:
+    """Fill normalized names used for candidates retrieval."""
+    products = await ProductDAO.get_ids_names()
+    names = {
+        product['id']: normalize_product_name(product['name'])
+        for product in products
+        if product['name']
+    }
+    ids = list(names)
+    for start in range(0, len(ids), IMPORTING_PER_TIME):
+        await ProductDAO.update_normalized_names(
+            {id: names[id] for id in ids[start : start + IMPORTING_PER_TIME]},
+        )
+    logger.debug(
+        f'Normalization completed, {len(names)} product names normalized',
+    )
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    if sys.platform == 'win32' and sys.version_info.minor >= 8:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.get_event_loop_policy().new_event_loop()
+    asyncio.run(normalize_products())
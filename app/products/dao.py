@@ -1,19 +1,30 @@
 from datetime import date
 from math import ceil
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dao import BaseDAO
-from app.database import async_session_maker
+from app.config import settings
+from app.core.dao import BaseDAO, use_session
+from app.ds.cache import ResultCache
+from app.ds.normalizer import normalize_product_name
 from app.products.models import (
     Dealer,
+    DealerName,
     ParsedProductDealer,
     Product,
     ProductDealer,
+    Recommendation,
     Statistics,
 )
 
+total_cache: ResultCache[Tuple[Optional[int], int]] = ResultCache(
+    settings.TOTAL_CACHE_SIZE,
+    settings.TOTAL_CACHE_TTL,
+)
+
 
 class DealerDAO(BaseDAO):
     """Interface for working with dealer models."""
@@ -26,12 +37,180 @@ class ProductDAO(BaseDAO):
 
     model = Product
 
+    @staticmethod
+    def with_normalized_name(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add normalized name used for candidates retrieval."""
+        if data.get('name') and not data.get('name_normalized'):
+            return {
+                **data,
+                'name_normalized': normalize_product_name(data['name']),
+            }
+        return data
+
     @classmethod
-    async def get_ids_names(cls) -> List[Dict[str, Any]]:
-        """Get id and name of all products."""
-        async with async_session_maker() as session:
+    async def create(
+        cls,
+        session: Optional[AsyncSession] = None,
+        **data: Any,
+    ) -> None:
+        """Create product with normalized name."""
+        await super().create(session, **cls.with_normalized_name(data))
+
+    @classmethod
+    async def create_many(
+        cls,
+        values: List[Dict[str, Any]],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """Create products with normalized names."""
+        await super().create_many(
+            [cls.with_normalized_name(item) for item in values],
+            session,
+        )
+
+    @classmethod
+    async def get_not_normalized(
+        cls,
+        ids: Optional[List[int]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get id and name of products without normalized name."""
+        async with use_session(session) as db_session:
+            query = sa.select(cls.model.id, cls.model.name).where(
+                cls.model.name_normalized.is_(None),
+                cls.model.name.is_not(None),
+            )
+            if ids is not None:
+                query = query.where(cls.model.id.in_(ids))
+            result = await db_session.execute(query)
+            return result.mappings().all()
+
+    @classmethod
+    async def get_ids_names(
+        cls,
+        ids: Optional[List[int]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get id and name of all products or products with provided ids."""
+        async with use_session(session) as db_session:
             query = sa.select(cls.model.id, cls.model.name)
-            result = await session.execute(query)
+            if ids is not None:
+                query = query.where(cls.model.id.in_(ids))
+            result = await db_session.execute(query)
+            return result.mappings().all()
+
+    @classmethod
+    async def get_catalog_version(
+        cls,
+        session: Optional[AsyncSession] = None,
+    ) -> str:
+        """Get fingerprint of ids and names of all products.
+
+        Fingerprint is calculated on the database side, so only one short
+        string is transferred.
+        """
+        async with use_session(session) as db_session:
+            query = sa.select(
+                sa.func.md5(
+                    sa.func.coalesce(
+                        sa.func.string_agg(
+                            sa.cast(cls.model.id, sa.String)
+                            + ':'
+                            + sa.func.coalesce(cls.model.name, ''),
+                            aggregate_order_by(
+                                sa.literal('|'),
+                                cls.model.id,
+                            ),
+                        ),
+                        '',
+                    ),
+                ),
+            )
+            result = await db_session.execute(query)
+            return result.scalar_one()
+
+    @classmethod
+    async def update_normalized_names(
+        cls,
+        names: Dict[int, str],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """Update normalized names of many products in one statement."""
+        if not names:
+            return None
+        async with use_session(session) as db_session:
+            await db_session.execute(
+                sa.update(cls.model),
+                [
+                    {'id': id, 'name_normalized': name}
+                    for id, name in names.items()
+                ],
+            )
+
+    @classmethod
+    async def get_similar(
+        cls,
+        queries: List[str],
+        limit: int,
+        threshold: float,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get products with normalized names similar to the queries.
+
+        Candidates are found with pg_trgm similarity operator
+        using trigram index, at most limit products for every query.
+        Position is the index of the query starting from 1.
+        """
+        async with use_session(session) as db_session:
+            await db_session.execute(
+                sa.select(
+                    sa.func.set_config(
+                        'pg_trgm.similarity_threshold',
+                        str(threshold),
+                        True,
+                    ),
+                ),
+            )
+            dealer_products = (
+                sa.func.unnest(
+                    sa.literal(queries, type_=ARRAY(sa.String)),
+                )
+                .table_valued('query', with_ordinality='position')
+                .render_derived()
+                .alias('dealer_products')
+            )
+            candidates = (
+                sa.select(
+                    cls.model.id,
+                    cls.model.name,
+                    cls.model.name_normalized,
+                )
+                .where(
+                    cls.model.name_normalized.op('%')(
+                        dealer_products.c.query,
+                    ),
+                )
+                .order_by(
+                    sa.func.similarity(
+                        cls.model.name_normalized,
+                        dealer_products.c.query,
+                    ).desc(),
+                    cls.model.id,
+                )
+                .limit(limit)
+                .lateral('candidates')
+            )
+            query = (
+                sa.select(
+                    dealer_products.c.position,
+                    candidates.c.id,
+                    candidates.c.name,
+                    candidates.c.name_normalized,
+                )
+                .select_from(dealer_products)
+                .join(candidates, sa.true())
+            )
+            result = await db_session.execute(query)
             return result.mappings().all()
 
 
@@ -41,27 +220,30 @@ class ProductDealerDAO(BaseDAO):
     model = ProductDealer
 
     @classmethod
-    async def get_min_key(cls) -> int:
+    async def get_min_key(cls, session: Optional[AsyncSession] = None) -> int:
         """Get minimum key value."""
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = sa.select(sa.func.min(cls.model.key))
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def get_max_key(cls) -> int:
+    async def get_max_key(cls, session: Optional[AsyncSession] = None) -> int:
         """Get maximum key value."""
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = sa.select(sa.func.max(cls.model.key))
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def get_keys(cls) -> List[int]:
+    async def get_keys(
+        cls,
+        session: Optional[AsyncSession] = None,
+    ) -> List[int]:
         """Get maximum key value."""
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = sa.select(cls.model.key)
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalars().all()
 
     @classmethod
@@ -69,16 +251,170 @@ class ProductDealerDAO(BaseDAO):
         cls,
         product_id: Union[int, sa.Column[int]],
         dealer_id: Union[int, sa.Column[int]],
+        session: Optional[AsyncSession] = None,
     ) -> int:
         """Get key by product_id and dealer_id."""
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = sa.select(cls.model.key).filter_by(
                 product_id=product_id,
                 dealer_id=dealer_id,
             )
-            result = await session.execute(query)
+            result = await db_session.execute(query)
             return result.scalar_one_or_none()
 
+    @classmethod
+    async def get_keys_by_pairs(
+        cls,
+        pairs: List[Tuple[int, int]],
+        session: Optional[AsyncSession] = None,
+    ) -> Dict[Tuple[int, int], int]:
+        """Get keys of existing dealer and product pairs."""
+        if not pairs:
+            return {}
+        async with use_session(session) as db_session:
+            query = sa.select(
+                cls.model.dealer_id,
+                cls.model.product_id,
+                cls.model.key,
+            ).where(
+                sa.tuple_(cls.model.dealer_id, cls.model.product_id).in_(
+                    pairs,
+                ),
+            )
+            result = await db_session.execute(query)
+            return {
+                (dealer_id, product_id): key
+                for dealer_id, product_id, key in result.all()
+            }
+
+    @classmethod
+    async def create_keys(
+        cls,
+        pairs: List[Tuple[int, int]],
+        session: Optional[AsyncSession] = None,
+    ) -> Dict[Tuple[int, int], int]:
+        """Create keys of dealer and product pairs in one statement.
+
+        Keys follow the maximum key. Pairs whose key or pair itself was
+        taken by a concurrent statement are not inserted, so caller
+        reads their keys and repeats for the rest.
+        """
+        if not pairs:
+            return {}
+        numbered = sa.values(
+            sa.column('dealer_id', sa.Integer),
+            sa.column('product_id', sa.Integer),
+            sa.column('number', sa.Integer),
+            name='pairs',
+        ).data(
+            [
+                (dealer_id, product_id, number)
+                for number, (dealer_id, product_id) in enumerate(pairs, 1)
+            ],
+        )
+        maximum_key = sa.select(
+            sa.func.coalesce(sa.func.max(cls.model.key), 0),
+        ).scalar_subquery()
+        async with use_session(session) as db_session:
+            result = await db_session.execute(
+                insert(cls.model)
+                .from_select(
+                    ['dealer_id', 'product_id', 'key'],
+                    sa.select(
+                        numbered.c.dealer_id,
+                        numbered.c.product_id,
+                        maximum_key + numbered.c.number,
+                    ),
+                )
+                .on_conflict_do_nothing()
+                .returning(
+                    cls.model.dealer_id,
+                    cls.model.product_id,
+                    cls.model.key,
+                ),
+            )
+            return {
+                (dealer_id, product_id): key
+                for dealer_id, product_id, key in result.all()
+            }
+
+
+class DealerNameDAO(BaseDAO):
+    """Interface for working with normalized dealer names."""
+
+    model = DealerName
+
+    @classmethod
+    async def get_name_ids(
+        cls,
+        names: List[Tuple[int, str]],
+        session: Optional[AsyncSession] = None,
+    ) -> Dict[Tuple[int, str], int]:
+        """Get ids of dealer and normalized name pairs creating missing."""
+        if not names:
+            return {}
+        names = list(dict.fromkeys(names))
+        async with use_session(session) as db_session:
+            await db_session.execute(
+                insert(cls.model)
+                .values(
+                    [
+                        {'dealer_id': dealer_id, 'normalized_name': name}
+                        for dealer_id, name in names
+                    ],
+                )
+                .on_conflict_do_nothing(
+                    index_elements=['dealer_id', 'normalized_name'],
+                ),
+            )
+            result = await db_session.execute(
+                sa.select(
+                    cls.model.dealer_id,
+                    cls.model.normalized_name,
+                    cls.model.id,
+                ).where(
+                    sa.tuple_(
+                        cls.model.dealer_id,
+                        cls.model.normalized_name,
+                    ).in_(names),
+                ),
+            )
+            return {
+                (dealer_id, name): id for dealer_id, name, id in result.all()
+            }
+
+    @classmethod
+    async def get_without_recommendations(
+        cls,
+        catalog_version: str,
+        after_id: int,
+        limit: int,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get names of unmatched parsing data without recommendations.
+
+        Names are ordered by id and start after the provided id.
+        """
+        async with use_session(session) as db_session:
+            query = (
+                sa.select(cls.model.id, cls.model.normalized_name)
+                .where(
+                    cls.model.id > after_id,
+                    sa.exists().where(
+                        ParsedProductDealer.name_id == cls.model.id,
+                        ParsedProductDealer.product_key.is_(None),
+                    ),
+                    ~sa.exists().where(
+                        Recommendation.name_id == cls.model.id,
+                        Recommendation.catalog_version == catalog_version,
+                    ),
+                )
+                .order_by(cls.model.id)
+                .limit(limit)
+            )
+            result = await db_session.execute(query)
+            return result.mappings().all()
+
 
 class ParsedProductDealerDAO(BaseDAO):
     """Interface for working with parsing data models."""
@@ -93,64 +429,441 @@ class ParsedProductDealerDAO(BaseDAO):
         dealer_id: int,
         page: int,
         limit: int,
+        after_id: Optional[int] = None,
+        with_total: bool = True,
+        session: Optional[AsyncSession] = None,
     ) -> Dict[str, Any]:
-        """Get all parsing data."""
-        offset = (page - 1) * limit
-        async with async_session_maker() as session:
+        """Get all parsing data.
+
+        Items start after the provided id if it is provided, so the page
+        is found by the index seek, otherwise page number is used.
+        Page and total are read in one statement, total is cached
+        with the greatest id of the dealer parsing data and counted
+        again only when it changes. Total is not counted if it is
+        not requested, total_page is None then.
+        """
+        conditions = (
+            cls.model.dealer_id == dealer_id,
+            cls.model.date >= date_from,
+            cls.model.date <= date_to,
+        )
+        query = (
+            sa.select(cls.model.__table__.columns)
+            .where(*conditions)
+            .order_by(cls.model.id)
+            .limit(limit)
+        )
+        if after_id is None:
+            query = query.offset((page - 1) * limit)
+        else:
+            query = query.where(cls.model.id > after_id)
+        items_page = query.subquery('page')
+        version = (
+            sa.select(sa.func.max(cls.model.id))
+            .where(cls.model.dealer_id == dealer_id)
+            .scalar_subquery()
+        )
+        count = (
+            sa.select(sa.func.count())
+            .select_from(cls.model)
+            .where(*conditions)
+            .scalar_subquery()
+        )
+        key = (dealer_id, date_from, date_to)
+        cached = total_cache.get(key) if with_total else None
+        if not with_total:
+            total: Any = sa.null()
+        elif cached is None:
+            total = count
+        else:
+            # uncorrelated subquery is executed only when it is needed,
+            # so rows are not counted while the version is the same
+            total = sa.case((version == cached[0], cached[1]), else_=count)
+        summary = sa.select(
+            version.label('version'),
+            total.label('total'),
+        ).subquery('summary')
+        async with use_session(session) as db_session:
+            result = await db_session.execute(
+                sa.select(summary, items_page)
+                .select_from(summary)
+                .outerjoin(items_page, sa.true())
+                .order_by(items_page.c.id),
+            )
+            rows = result.mappings().all()
+        items = [
+            {column.name: row[column.name] for column in items_page.columns}
+            for row in rows
+            if row['id'] is not None
+        ]
+        total_list = None
+        if with_total:
+            if cached is None or cached[0] != rows[0]['version']:
+                total_cache.set(key, (rows[0]['version'], rows[0]['total']))
+            total_list = ceil(rows[0]['total'] / limit)
+        return {
+            'items': items,
+            'page': page,
+            'size': limit,
+            'total_page': total_list,
+        }
+
+    @classmethod
+    async def choose_product(
+        cls,
+        id: int,
+        product_id: int,
+        session: Optional[AsyncSession] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Link parsing data with product in one statement.
+
+        Parsing data row is locked, product-dealer key is inserted
+        if the pair has no key, statistics and product_key are updated.
+        Nothing is changed if the product does not exist, product_id
+        is None then. New key is the free key closest to the existing
+        ones, concurrent statements may take the same key, so caller
+        retries on integrity error.
+
+        Returns None if parsing data does not exist.
+        """
+        parsed = (
+            sa.select(
+                cls.model.id,
+                cls.model.dealer_id,
+                cls.model.product_key,
+                cls.model.product_name,
+                cls.model.product_url,
+            )
+            .where(cls.model.id == id)
+            .with_for_update()
+            .cte('parsed')
+        )
+        product = (
+            sa.select(Product.id)
+            .where(Product.id == product_id)
+            .cte('product')
+        )
+        existing = (
+            sa.select(ProductDealer.key)
+            .join(parsed, ProductDealer.dealer_id == parsed.c.dealer_id)
+            .where(ProductDealer.product_id == product_id)
+            .cte('existing')
+        )
+        keys = ProductDealer.__table__.alias('keys')
+        following = ProductDealer.__table__.alias('following')
+        free_key = sa.func.coalesce(
+            sa.select(sa.func.min(keys.c.key) - 1)
+            .having(sa.func.min(keys.c.key) > 1)
+            .scalar_subquery(),
+            sa.select(keys.c.key + 1)
+            .where(~sa.exists().where(following.c.key == keys.c.key + 1))
+            .order_by(keys.c.key)
+            .limit(1)
+            .scalar_subquery(),
+            1,
+        )
+        inserted = (
+            insert(ProductDealer)
+            .from_select(
+                ['dealer_id', 'product_id', 'key'],
+                sa.select(parsed.c.dealer_id, product.c.id, free_key)
+                .join(product, sa.true())
+                .where(~sa.exists(sa.select(existing.c.key))),
+            )
+            .on_conflict_do_update(
+                index_elements=['dealer_id', 'product_id'],
+                set_={'key': ProductDealer.key},
+            )
+            .returning(ProductDealer.key)
+            .cte('inserted')
+        )
+        chosen = sa.func.coalesce(
+            sa.select(existing.c.key).scalar_subquery(),
+            sa.select(inserted.c.key).scalar_subquery(),
+        )
+        statistics = (
+            sa.update(Statistics)
+            .where(
+                Statistics.parsed_data_id == parsed.c.id,
+                parsed.c.product_key.is_(None),
+                sa.exists(sa.select(product.c.id)),
+            )
+            .values(successfull=True, skipped=False)
+            .returning(Statistics.id)
+            .cte('statistics')
+        )
+        updated = (
+            sa.update(cls.model)
+            .where(
+                cls.model.id == parsed.c.id,
+                sa.exists(sa.select(product.c.id)),
+                cls.model.product_key.is_distinct_from(chosen),
+            )
+            .values(product_key=chosen)
+            .returning(cls.model.product_key)
+            .cte('updated')
+        )
+        query = sa.select(
+            parsed.c.dealer_id,
+            parsed.c.product_name,
+            parsed.c.product_url,
+            sa.select(product.c.id).scalar_subquery().label('product_id'),
+            sa.func.coalesce(
+                sa.select(updated.c.product_key).scalar_subquery(),
+                parsed.c.product_key,
+            ).label('key'),
+            sa.select(sa.func.count())
+            .select_from(statistics)
+            .scalar_subquery()
+            .label('statistics'),
+        )
+        async with use_session(session) as db_session:
+            result = await db_session.execute(query)
+            return result.mappings().one_or_none()
+
+    @classmethod
+    async def get_product_name(
+        cls,
+        id: int,
+        session: Optional[AsyncSession] = None,
+    ) -> str:
+        """Get id and name of all products."""
+        async with use_session(session) as db_session:
+            query = sa.select(cls.model.product_name).where(cls.model.id == id)
+            result = await db_session.execute(query)
+            return result.scalar_one_or_none()
+
+    @classmethod
+    async def get_product_names(
+        cls,
+        ids: List[int],
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get product name, url and dealer of parsing data items."""
+        async with use_session(session) as db_session:
+            query = sa.select(
+                cls.model.id,
+                cls.model.product_name,
+                cls.model.product_url,
+                cls.model.dealer_id,
+            ).where(cls.model.id.in_(ids))
+            result = await db_session.execute(query)
+            return result.mappings().all()
+
+    @classmethod
+    async def get_confirmed_links(
+        cls,
+        ids: Optional[List[int]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get parsing data linked with products by product key.
+
+        Items are ordered by id, so the latest links go last.
+        Only parsing data with provided ids is returned if ids are given.
+        """
+        async with use_session(session) as db_session:
             query = (
-                sa.select(cls.model.__table__.columns)
-                .select_from(cls.model)
-                .where(
-                    sa.and_(
-                        cls.model.date >= date_from,
-                        cls.model.date <= date_to,
-                    ),
+                sa.select(
+                    cls.model.dealer_id,
+                    cls.model.product_name,
+                    cls.model.product_url,
+                    ProductDealer.product_id,
+                )
+                .join(
+                    ProductDealer,
+                    cls.model.product_key == ProductDealer.key,
                 )
-                .filter(cls.model.dealer_id == dealer_id)
                 .order_by(cls.model.id)
-                .offset(offset)
+            )
+            if ids is not None:
+                query = query.where(cls.model.id.in_(ids))
+            result = await db_session.execute(query)
+            return result.mappings().all()
+
+    @classmethod
+    async def get_without_name(
+        cls,
+        after_id: int,
+        limit: int,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get parsing data without normalized name.
+
+        Items are ordered by id and start after the provided id.
+        """
+        async with use_session(session) as db_session:
+            query = (
+                sa.select(
+                    cls.model.id,
+                    cls.model.dealer_id,
+                    cls.model.product_name,
+                )
+                .where(cls.model.id > after_id, cls.model.name_id.is_(None))
+                .order_by(cls.model.id)
                 .limit(limit)
             )
-            total = await session.execute(
-                sa.select(cls.model.id)
+            result = await db_session.execute(query)
+            return result.mappings().all()
+
+    @classmethod
+    async def get_unmatched(
+        cls,
+        after_id: int,
+        limit: int,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get parsing data without product key not skipped by operator.
+
+        Items are ordered by id and start after the provided id,
+        normalized name is None for items without it.
+        """
+        async with use_session(session) as db_session:
+            query = (
+                sa.select(
+                    cls.model.id,
+                    cls.model.product_name,
+                    cls.model.product_url,
+                    cls.model.dealer_id,
+                    DealerName.normalized_name,
+                )
+                .outerjoin(DealerName, cls.model.name_id == DealerName.id)
                 .where(
-                    sa.and_(
-                        cls.model.date >= date_from,
-                        cls.model.date <= date_to,
+                    cls.model.id > after_id,
+                    cls.model.product_key.is_(None),
+                    ~sa.exists().where(
+                        Statistics.parsed_data_id == cls.model.id,
+                        Statistics.skipped,
                     ),
                 )
-                .filter(cls.model.dealer_id == dealer_id),
-            )
-            total_list = ceil(len(total.scalars().all()) / limit)
-            result = await session.execute(query)
-            items = result.mappings().all()
-            response = {
-                'items': items,
-                'page': page,
-                'size': limit,
-                'total_page': total_list,
-            }
-            return response
-
-    @classmethod
-    async def get_product_name(cls, id: int) -> str:
-        """Get id and name of all products."""
-        async with async_session_maker() as session:
-            query = sa.select(cls.model.product_name).where(cls.model.id == id)
-            result = await session.execute(query)
-            return result.scalar_one_or_none()
+                .order_by(cls.model.id)
+                .limit(limit)
+            )
+            result = await db_session.execute(query)
+            return result.mappings().all()
 
     @classmethod
-    async def update_key(cls, id: int, key: int) -> None:
+    async def update_key(
+        cls,
+        id: int,
+        key: int,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
         """Update product_key value."""
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = (
                 sa.update(cls.model)
                 .where(cls.model.id == id)
                 .values(product_key=key)
             )
-            await session.execute(query)
-            await session.commit()
+            await db_session.execute(query)
+
+    @classmethod
+    async def update_keys(
+        cls,
+        keys: Dict[int, int],
+        session: Optional[AsyncSession] = None,
+    ) -> List[int]:
+        """Set product_key values of many items in one statement.
+
+        Items linked or skipped by operator since they were read
+        are left as is.
+
+        Returns:
+            Ids of updated items.
+        """
+        if not keys:
+            return []
+        new_keys = sa.values(
+            sa.column('id', sa.Integer),
+            sa.column('key', sa.Integer),
+            name='new_keys',
+        ).data(list(keys.items()))
+        async with use_session(session) as db_session:
+            result = await db_session.execute(
+                sa.update(cls.model)
+                .where(
+                    cls.model.id == new_keys.c.id,
+                    cls.model.product_key.is_(None),
+                    ~sa.exists().where(
+                        Statistics.parsed_data_id == cls.model.id,
+                        Statistics.skipped,
+                    ),
+                )
+                .values(product_key=new_keys.c.key)
+                .returning(cls.model.id),
+            )
+            return list(result.scalars().all())
+
+    @classmethod
+    async def update_name_ids(
+        cls,
+        name_ids: Dict[int, int],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """Update name_id values of many items in one statement."""
+        if not name_ids:
+            return None
+        async with use_session(session) as db_session:
+            await db_session.execute(
+                sa.update(cls.model),
+                [
+                    {'id': id, 'name_id': name_id}
+                    for id, name_id in name_ids.items()
+                ],
+            )
+
+
+class RecommendationDAO(BaseDAO):
+    """Interface for working with precomputed recommendations."""
+
+    model = Recommendation
+
+    @classmethod
+    async def get_recommendations(
+        cls,
+        parsed_data_id: int,
+        catalog_version: str,
+        limit: int,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get best precomputed recommendations for parsing data item.
+
+        Recommendations are shared by parsing data with the same name.
+        """
+        async with use_session(session) as db_session:
+            query = (
+                sa.select(
+                    cls.model.product_id.label('id'),
+                    Product.name.label('product_name'),
+                    cls.model.score.label('levenshtein_distance'),
+                )
+                .join(Product, cls.model.product_id == Product.id)
+                .join(
+                    ParsedProductDealer,
+                    cls.model.name_id == ParsedProductDealer.name_id,
+                )
+                .where(
+                    ParsedProductDealer.id == parsed_data_id,
+                    cls.model.catalog_version == catalog_version,
+                )
+                .order_by(cls.model.rank)
+                .limit(limit)
+            )
+            result = await db_session.execute(query)
+            return result.mappings().all()
+
+    @classmethod
+    async def delete_stale(
+        cls,
+        catalog_version: str,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """Delete recommendations made for another catalog version."""
+        async with use_session(session) as db_session:
+            query = sa.delete(cls.model).where(
+                cls.model.catalog_version != catalog_version,
+            )
+            await db_session.execute(query)
 
 
 class StatisticsDAO(BaseDAO):
@@ -159,89 +872,98 @@ class StatisticsDAO(BaseDAO):
     model = Statistics
 
     @classmethod
-    async def update_success(cls, dealerprice_id: int) -> None:
+    async def update_success(
+        cls,
+        dealerprice_id: int,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
         """Update success value to True."""
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = (
                 sa.update(cls.model)
                 .where(cls.model.parsed_data_id == dealerprice_id)
                 .values(successfull=True, skipped=False)
             )
-            await session.execute(query)
-            await session.commit()
+            await db_session.execute(query)
+
+    @classmethod
+    async def update_success_many(
+        cls,
+        dealerprice_ids: List[int],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """Update success value to True for many items not skipped."""
+        if not dealerprice_ids:
+            return None
+        async with use_session(session) as db_session:
+            query = (
+                sa.update(cls.model)
+                .where(
+                    cls.model.parsed_data_id.in_(dealerprice_ids),
+                    cls.model.skipped.is_(False),
+                )
+                .values(successfull=True)
+            )
+            await db_session.execute(query)
 
     @classmethod
-    async def update_skip(cls, dealerprice_id: int) -> None:
+    async def update_skip(
+        cls,
+        dealerprice_id: int,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
         """Update product_key value."""
-        async with async_session_maker() as session:
+        async with use_session(session) as db_session:
             query = (
                 sa.update(cls.model)
                 .where(cls.model.parsed_data_id == dealerprice_id)
                 .values(skipped=True)
             )
-            await session.execute(query)
-            await session.commit()
+            await db_session.execute(query)
+
+    @staticmethod
+    def get_response(successfull: int, skipped: int) -> Dict[str, Any]:
+        """Get statistics with percent of successfull parsing data."""
+        try:
+            percent = f'{round(successfull / (successfull + skipped) * 100)}'
+        except ZeroDivisionError:
+            percent = '-'
+        return {
+            'QuantitySuccessfull': successfull,
+            'QuantitySkipped': skipped,
+            'percent': percent,
+        }
+
+    @classmethod
+    def count(cls, date_from: date, date_to: date) -> sa.Select:
+        """Count successfull and skipped parsing data in one scan."""
+        return (
+            sa.select(
+                sa.func.count().filter(cls.model.successfull),
+                sa.func.count().filter(cls.model.skipped),
+            )
+            .select_from(cls.model)
+            .join(
+                ParsedProductDealer,
+                cls.model.parsed_data_id == ParsedProductDealer.id,
+            )
+            .where(
+                ParsedProductDealer.date >= date_from,
+                ParsedProductDealer.date <= date_to,
+            )
+        )
 
     @classmethod
     async def get_general_stat(
         cls,
         date_from: date,
         date_to: date,
+        session: Optional[AsyncSession] = None,
     ) -> Dict[str, Any]:
         """Get statistics for all dealers."""
-        async with async_session_maker() as session:
-            query_successfull = await session.execute(
-                (
-                    sa.select(sa.func.count(cls.model.id))
-                    .join(
-                        ParsedProductDealer,
-                        cls.model.parsed_data_id == ParsedProductDealer.id,
-                        isouter=True,
-                    )
-                    .where(
-                        sa.and_(
-                            ParsedProductDealer.date >= date_from,
-                            ParsedProductDealer.date <= date_to,
-                        ),
-                    )
-                    .filter(
-                        cls.model.successfull,
-                    )
-                ),
-            )
-            query_skipped = await session.execute(
-                (
-                    sa.select(sa.func.count(cls.model.id))
-                    .join(
-                        ParsedProductDealer,
-                        cls.model.parsed_data_id == ParsedProductDealer.id,
-                        isouter=True,
-                    )
-                    .where(
-                        sa.and_(
-                            ParsedProductDealer.date >= date_from,
-                            ParsedProductDealer.date <= date_to,
-                        ),
-                    )
-                    .filter(
-                        cls.model.skipped,
-                    )
-                ),
-            )
-            successfull = query_successfull.scalar_one_or_none()
-            skipped = query_skipped.scalar_one_or_none()
-            try:
-                percent = (
-                    f'{round(successfull /(successfull + skipped) * 100)}'
-                )
-            except ZeroDivisionError:
-                percent = '-'
-            response = {
-                'QuantitySuccessfull': successfull,
-                'QuantitySkipped': skipped,
-                'percent': percent,
-            }
-            return response
+        async with use_session(session) as db_session:
+            result = await db_session.execute(cls.count(date_from, date_to))
+            return cls.get_response(*result.one())
 
     @classmethod
     async def get_dealer_stat(
@@ -249,60 +971,51 @@ class StatisticsDAO(BaseDAO):
         dealer_id: int,
         date_from: date,
         date_to: date,
+        session: Optional[AsyncSession] = None,
     ) -> Dict[str, Any]:
         """Get dealer statistics."""
-        async with async_session_maker() as session:
-            query_successfull = await session.execute(
-                (
-                    sa.select(sa.func.count(cls.model.id))
-                    .join(
-                        ParsedProductDealer,
-                        cls.model.parsed_data_id == ParsedProductDealer.id,
-                        isouter=True,
-                    )
-                    .where(
-                        sa.and_(
-                            ParsedProductDealer.date >= date_from,
-                            ParsedProductDealer.date <= date_to,
-                        ),
-                    )
-                    .filter(
-                        ParsedProductDealer.dealer_id == dealer_id,
-                        cls.model.successfull,
-                    )
-                ),
-            )
-            query_skipped = await session.execute(
-                (
-                    sa.select(sa.func.count(cls.model.id))
-                    .join(
-                        ParsedProductDealer,
-                        cls.model.parsed_data_id == ParsedProductDealer.id,
-                        isouter=True,
-                    )
-                    .where(
-                        sa.and_(
-                            ParsedProductDealer.date >= date_from,
-                            ParsedProductDealer.date <= date_to,
-                        ),
-                    )
-                    .filter(
-                        ParsedProductDealer.dealer_id == dealer_id,
-                        cls.model.skipped,
-                    )
+        async with use_session(session) as db_session:
+            result = await db_session.execute(
+                cls.count(date_from, date_to).where(
+                    ParsedProductDealer.dealer_id == dealer_id,
                 ),
             )
-            successfull = query_successfull.scalar_one_or_none()
-            skipped = query_skipped.scalar_one_or_none()
-            try:
-                percent = (
-                    f'{round(successfull /(successfull + skipped) * 100)}'
+            return cls.get_response(*result.one())
+
+    @classmethod
+    async def get_dealers_stat(
+        cls,
+        date_from: date,
+        date_to: date,
+        session: Optional[AsyncSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get statistics of every dealer in one grouped query.
+
+        Dealers without parsing data in the period have zero counts.
+        """
+        async with use_session(session) as db_session:
+            result = await db_session.execute(
+                sa.select(
+                    Dealer.id,
+                    sa.func.count(cls.model.id).filter(cls.model.successfull),
+                    sa.func.count(cls.model.id).filter(cls.model.skipped),
                 )
-            except ZeroDivisionError:
-                percent = '-'
-            response = {
-                'QuantitySuccessfull': successfull,
-                'QuantitySkipped': skipped,
-                'percent': percent,
-            }
-            return response
+                .outerjoin(
+                    ParsedProductDealer,
+                    sa.and_(
+                        ParsedProductDealer.dealer_id == Dealer.id,
+                        ParsedProductDealer.date >= date_from,
+                        ParsedProductDealer.date <= date_to,
+                    ),
+                )
+                .outerjoin(
+                    cls.model,
+                    cls.model.parsed_data_id == ParsedProductDealer.id,
+                )
+                .group_by(Dealer.id)
+                .order_by(Dealer.id),
+            )
+            return [
+                {'dealerId': dealer_id, **cls.get_response(*counts)}
+                for dealer_id, *counts in result.all()
+            ]
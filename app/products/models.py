@@ -5,8 +5,10 @@ from sqlalchemy import (
     Date,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 
@@ -23,6 +25,7 @@ class Dealer(Base):
 
     product_dealer = relationship('ProductDealer', back_populates='dealer')
     parsed_data = relationship('ParsedProductDealer', back_populates='dealer')
+    names = relationship('DealerName', back_populates='dealer')
 
     def __repr__(self) -> str:
         """Represent dealer model.
@@ -42,6 +45,7 @@ class Product(Base):
     article = Column(String, nullable=False, unique=True)
     ean_13 = Column(BigInteger)
     name = Column(String)
+    name_normalized = Column(String)
     cost = Column(Float)
     recommended_price = Column(Float)
     category_id = Column(Integer)
@@ -68,6 +72,13 @@ class ProductDealer(Base):
     """Model of connection between dealer and product by key."""
 
     __tablename__ = 'marketing_productdealerkey'
+    __table_args__ = (
+        UniqueConstraint(
+            'dealer_id',
+            'product_id',
+            name='uq_marketing_productdealerkey_dealer_id_product_id',
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     key = Column(Integer, unique=True, nullable=False)
@@ -98,10 +109,50 @@ class ProductDealer(Base):
         return f'Product {self.product_id} from the dealer {self.dealer_id}'
 
 
+class DealerName(Base):
+    """Normalized name of the dealer product model."""
+
+    __tablename__ = 'marketing_dealername'
+    __table_args__ = (
+        UniqueConstraint(
+            'dealer_id',
+            'normalized_name',
+            name='uq_marketing_dealername_dealer_id_normalized_name',
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    dealer_id = Column(
+        Integer,
+        ForeignKey('marketing_dealer.id'),
+        nullable=False,
+    )
+    normalized_name = Column(String, nullable=False)
+
+    dealer = relationship('Dealer', back_populates='names')
+    parsed_data = relationship(
+        'ParsedProductDealer',
+        back_populates='dealer_name',
+    )
+
+    def __repr__(self) -> str:
+        """Represent the dealer name model.
+
+        Returns:
+            String with the normalized name.
+        """
+        return f'Dealer name {self.normalized_name}'
+
+
 class ParsedProductDealer(Base):
     """Parsing data model."""
 
     __tablename__ = 'marketing_dealerprice'
+    __table_args__ = (
+        Index('ix_marketing_dealerprice_dealer_id_id', 'dealer_id', 'id'),
+        Index('ix_marketing_dealerprice_dealer_id_date', 'dealer_id', 'date'),
+        Index('ix_marketing_dealerprice_date', 'date'),
+    )
 
     id = Column(Integer, primary_key=True)
     product_key = Column(Integer, ForeignKey('marketing_productdealerkey.key'))
@@ -114,12 +165,18 @@ class ParsedProductDealer(Base):
         ForeignKey('marketing_dealer.id'),
         nullable=False,
     )
+    name_id = Column(
+        Integer,
+        ForeignKey('marketing_dealername.id'),
+        index=True,
+    )
 
     product_dealer = relationship(
         'ProductDealer',
         back_populates='parsed_data',
     )
     dealer = relationship('Dealer', back_populates='parsed_data')
+    dealer_name = relationship('DealerName', back_populates='parsed_data')
     statistics = relationship('Statistics', back_populates='parsed_data')
 
     def __repr__(self) -> str:
@@ -158,3 +215,43 @@ class Statistics(Base):
             String with the parsing product id.
         """
         return f'Statistics of parsed data {self.parsed_data_id}'
+
+
+class Recommendation(Base):
+    """Precomputed recommendation model."""
+
+    __tablename__ = 'marketing_recommendation'
+    __table_args__ = (
+        Index(
+            'ix_marketing_recommendation_name_id_version_rank',
+            'name_id',
+            'catalog_version',
+            'rank',
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name_id = Column(
+        Integer,
+        ForeignKey('marketing_dealername.id', ondelete='CASCADE'),
+        nullable=False,
+    )
+    product_id = Column(
+        Integer,
+        ForeignKey('marketing_product.id', ondelete='CASCADE'),
+        nullable=False,
+    )
+    score = Column(Integer, nullable=False)
+    rank = Column(Integer, nullable=False)
+    catalog_version = Column(String, nullable=False)
+
+    def __repr__(self) -> str:
+        """Represent the recommendation model.
+
+        Returns:
+            String with the dealer name id and the product id.
+        """
+        return (
+            f'Recommendation of product {self.product_id} '
+            f'for dealer name {self.name_id}'
+        )
@@ -1,20 +1,49 @@
-from app.products.dao import ProductDealerDAO
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 
-async def generate_product_dealer_key() -> int:
+from app.ds.normalizer import normalize_dealer_name
+from app.products.dao import DealerNameDAO, ProductDealerDAO
+
+
+async def generate_product_dealer_key(
+    session: Optional[AsyncSession] = None,
+) -> int:
     """Generate unique key for new ProductDealer model.
 
+    Args:
+        session: request session.
+
     Returns:
         Generated key.
     """
-    minimum_key = await ProductDealerDAO.get_min_key()
+    minimum_key = await ProductDealerDAO.get_min_key(session)
     if minimum_key > 1:
         return minimum_key - 1
-    maximum_key = await ProductDealerDAO.get_max_key()
-    keys = await ProductDealerDAO.get_keys()
+    maximum_key = await ProductDealerDAO.get_max_key(session)
+    keys = await ProductDealerDAO.get_keys(session)
     if len(keys) < maximum_key - minimum_key + 1:
         allowed_between_keys = set(range(minimum_key, maximum_key + 1)) - set(
             keys,
         )
         return min(allowed_between_keys)
     return maximum_key + 1
+
+
+async def get_name_ids(parsed_data: List[Dict[str, Any]]) -> List[int]:
+    """Get ids of normalized names of parsing data items.
+
+    Missing names are added to the dictionary.
+
+    Args:
+        parsed_data: dealer ids and product names of parsing data items.
+
+    Returns:
+        Name id of every parsing data item.
+    """
+    names = [
+        (int(item['dealer_id']), normalize_dealer_name(item['product_name']))
+        for item in parsed_data
+    ]
+    name_ids = await DealerNameDAO.get_name_ids(names)
+    return [name_ids[name] for name in names]
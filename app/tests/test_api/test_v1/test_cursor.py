@@ -0,0 +1,9 @@
+from app.api.v1.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    """Test decoding of encoded and invalid cursors."""
+    for id in (0, 1, 2**40):
+        assert decode_cursor(encode_cursor(id)) == id
+    for cursor in ('', '!!', 'bm90IGpzb24', encode_cursor(1)[:-2]):
+        assert decode_cursor(cursor) is None
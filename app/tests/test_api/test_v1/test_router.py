@@ -1,16 +1,22 @@
-from typing import Dict
+from typing import Any, Dict
 
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import event
 
 from app.api.v1.router import (
     add_product_key,
     add_skipped,
     dealer_products,
+    dealer_static,
+    dealers_static,
+    get_batch_recommendations,
     get_dealers,
+    get_metrics,
     get_recommendations,
 )
 from app.config import TOKEN_NAME
+from app.database import engine
 from app.main import app
 from app.users.router import login_user
 
@@ -20,6 +26,7 @@ class TestURLs:
 
     get_urls = {
         'dealers': app.url_path_for(get_dealers.__name__),
+        'metrics': app.url_path_for(get_metrics.__name__),
         'parsed_data_exists': app.url_path_for(
             dealer_products.__name__,
             dealerId=1,
@@ -63,8 +70,30 @@ class TestURLs:
 
     post_urls = {
         'login': app.url_path_for(login_user.__name__),
+        'batch_recommendations': app.url_path_for(
+            get_batch_recommendations.__name__,
+        ),
     }
 
+    async def login(
+        self,
+        user: Dict[str, str],
+        async_client: AsyncClient,
+    ) -> str:
+        """Login as user.
+
+        Returns:
+            Access token.
+        """
+        login_response = await async_client.post(
+            self.post_urls['login'],
+            json={
+                'email': user['email'],
+                'password': user['password'],
+            },
+        )
+        return login_response.cookies[TOKEN_NAME]
+
     async def test_status_codes(
         self,
         user: Dict[str, str],
@@ -77,6 +106,11 @@ class TestURLs:
                 status.HTTP_401_UNAUTHORIZED,
                 status.HTTP_200_OK,
             ),
+            (
+                self.get_urls['metrics'],
+                status.HTTP_401_UNAUTHORIZED,
+                status.HTTP_200_OK,
+            ),
             (
                 self.get_urls['parsed_data_exists'],
                 status.HTTP_401_UNAUTHORIZED,
@@ -162,3 +196,128 @@ class TestURLs:
             )
             assert unauth_response.status_code == unauth_status_code
             assert auth_response.status_code == auth_status_code
+
+    async def test_batch_recommendations(
+        self,
+        user: Dict[str, str],
+        async_client: AsyncClient,
+    ) -> None:
+        """Test batch recommendations match single recommendations."""
+        access_token = await self.login(user, async_client)
+        unauth_response = await async_client.post(
+            self.post_urls['batch_recommendations'],
+            json={'ids': [1, 100], 'limit': 5},
+        )
+        assert unauth_response.status_code == status.HTTP_401_UNAUTHORIZED
+        auth_response = await async_client.post(
+            self.post_urls['batch_recommendations'],
+            json={'ids': [1, 100], 'limit': 5},
+            cookies={TOKEN_NAME: access_token},
+        )
+        assert auth_response.status_code == status.HTTP_200_OK
+        recommendations = auth_response.json()
+        assert set(recommendations) == {'1'}
+        single_response = await async_client.get(
+            self.get_urls['recommendations_exist'] + '?limit=5',
+            cookies={TOKEN_NAME: access_token},
+        )
+        assert recommendations['1'] == single_response.json()
+
+    async def test_cursor_pagination(
+        self,
+        user: Dict[str, str],
+        async_client: AsyncClient,
+    ) -> None:
+        """Test cursor pages match numbered pages."""
+        access_token = await self.login(user, async_client)
+        url = self.get_urls['parsed_data_exists']
+        first_page = await async_client.get(
+            url + '?size=1&page=1',
+            cookies={TOKEN_NAME: access_token},
+        )
+        second_page = await async_client.get(
+            url + '?size=1&page=2',
+            cookies={TOKEN_NAME: access_token},
+        )
+        next_cursor = first_page.json()['nextCursor']
+        assert next_cursor
+        cursor_page = await async_client.get(
+            url + f'?size=1&page=5&cursor={next_cursor}',
+            cookies={TOKEN_NAME: access_token},
+        )
+        assert cursor_page.status_code == status.HTTP_200_OK
+        assert cursor_page.json()['items'] == second_page.json()['items']
+        invalid_page = await async_client.get(
+            url + '?cursor=invalid',
+            cookies={TOKEN_NAME: access_token},
+        )
+        assert invalid_page.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_optional_total(
+        self,
+        user: Dict[str, str],
+        async_client: AsyncClient,
+    ) -> None:
+        """Test total is cached and skipped when it is not requested."""
+        access_token = await self.login(user, async_client)
+        url = self.get_urls['parsed_data_exists'] + '?size=1'
+        counted = await async_client.get(
+            url,
+            cookies={TOKEN_NAME: access_token},
+        )
+        cached = await async_client.get(
+            url,
+            cookies={TOKEN_NAME: access_token},
+        )
+        skipped = await async_client.get(
+            url + '&withTotal=false',
+            cookies={TOKEN_NAME: access_token},
+        )
+        assert counted.json()['totalPage'] > 0
+        assert cached.json() == counted.json()
+        assert skipped.json()['totalPage'] is None
+        assert skipped.json()['items'] == counted.json()['items']
+
+    async def test_choose_checks_out_one_connection(
+        self,
+        user: Dict[str, str],
+        async_client: AsyncClient,
+    ) -> None:
+        """Test choosing product uses one connection of the pool."""
+        access_token = await self.login(user, async_client)
+        checkouts = []
+
+        def count_checkout(*args: Any) -> None:
+            checkouts.append(args)
+
+        event.listen(engine.sync_engine.pool, 'checkout', count_checkout)
+        try:
+            response = await async_client.patch(
+                self.patch_urls['solution'],
+                cookies={TOKEN_NAME: access_token},
+            )
+        finally:
+            event.remove(engine.sync_engine.pool, 'checkout', count_checkout)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(checkouts) == 1
+
+    async def test_statistics_by_dealer(
+        self,
+        user: Dict[str, str],
+        async_client: AsyncClient,
+    ) -> None:
+        """Test statistics of every dealer match dealer statistics."""
+        access_token = await self.login(user, async_client)
+        response = await async_client.get(
+            app.url_path_for(dealers_static.__name__),
+            cookies={TOKEN_NAME: access_token},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()
+        for statistics in response.json():
+            dealer_id = statistics.pop('dealerId')
+            dealer_response = await async_client.get(
+                app.url_path_for(dealer_static.__name__, dealerId=dealer_id),
+                cookies={TOKEN_NAME: access_token},
+            )
+            assert dealer_response.json() == statistics
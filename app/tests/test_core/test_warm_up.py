@@ -0,0 +1,44 @@
+from typing import NoReturn
+
+from httpx import AsyncClient
+
+from app.core.warm_up import Readiness, readiness
+
+
+async def fail() -> NoReturn:
+    """Fail warm-up step.
+
+    Raises:
+        RuntimeError: always.
+    """
+    raise RuntimeError('Warm-up failed')
+
+
+async def test_readiness_steps() -> None:
+    """Check worker is ready only when every warm-up step succeeded."""
+    state = Readiness()
+    await state.run('schemas', lambda: None)
+    assert not state.ready
+    state.completed = True
+    assert state.ready
+    await state.run('connections', fail)
+    assert not state.ready
+    assert state.metrics() == {
+        'ready': False,
+        'steps': {'schemas': True, 'connections': False},
+    }
+
+
+async def test_readiness_endpoint(async_client: AsyncClient) -> None:
+    """Check readiness endpoint reflects warm-up state."""
+    completed, steps = readiness.completed, readiness.steps
+    readiness.completed, readiness.steps = False, {'schemas': True}
+    try:
+        response = await async_client.get('/api/v1/ready')
+        assert response.status_code == 503
+        readiness.completed = True
+        response = await async_client.get('/api/v1/ready')
+        assert response.status_code == 200
+        assert response.json() == {'ready': True, 'steps': {'schemas': True}}
+    finally:
+        readiness.completed, readiness.steps = completed, steps
@@ -0,0 +1,46 @@
+from typing import Any, Dict, List
+
+from app.ds.catalog import CatalogIndex
+from app.ds.commands.benchmark import inflate_catalog, run_engine
+from app.ds.engines import engines
+
+
+class TestBenchmark:
+    """Test benchmark of the matching engines."""
+
+    def test_inflate_catalog(self, products: List[Dict[str, Any]]) -> None:
+        """Test inflated catalog keeps real products with unique ids.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        real_products = [product for product in products if product['name']]
+        inflated = inflate_catalog(products, 3)
+        assert len(inflated) == len(real_products) * 3
+        assert inflated[: len(real_products)] == real_products
+        assert len({product['id'] for product in inflated}) == len(inflated)
+
+    async def test_run_engine(
+        self,
+        products: List[Dict[str, Any]],
+    ) -> None:
+        """Test every catalog engine finds products by their own names.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        queries = [
+            {'product_name': product['name'], 'product_id': product['id']}
+            for product in products
+            if product['name']
+        ][:20]
+        for engine in engines.values():
+            if engine.get_suitable_products is None:
+                continue
+            result = await run_engine(engine, catalog, queries)
+            assert result['recall1'] <= result['recall5']
+            assert result['recall5'] <= result['recall10']
+            assert result['recall10'] > 0.5
+            assert result['latencyP50Ms'] <= result['latencyP99Ms']
+            assert result['throughput'] > 0
@@ -0,0 +1,30 @@
+from app.ds.cache import ResultCache
+
+
+class TestResultCache:
+    """Test recommendation result cache."""
+
+    def test_least_recently_used_eviction(self) -> None:
+        """Test the least recently used result is evicted first."""
+        cache: ResultCache[int] = ResultCache(maxsize=2, ttl=60)
+        cache.set('first', 1)
+        cache.set('second', 2)
+        assert cache.get('first') == 1
+        cache.set('third', 3)
+        assert cache.get('second') is None
+        assert cache.get('first') == 1
+        assert cache.get('third') == 3
+        assert len(cache) == 2
+        assert cache.metrics() == {
+            'size': 2,
+            'maxsize': 2,
+            'hits': 3,
+            'misses': 1,
+        }
+
+    def test_expiration(self) -> None:
+        """Test expired results are not returned."""
+        cache: ResultCache[int] = ResultCache(maxsize=2, ttl=-1)
+        cache.set('first', 1)
+        assert cache.get('first') is None
+        assert len(cache) == 0
@@ -0,0 +1,123 @@
+import asyncio
+from time import monotonic
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.ds.catalog import CatalogIndex, CatalogManager, catalog_manager
+from app.ds.links import link_index
+from app.ds.listener import CatalogListener
+from app.products.dao import ProductDAO
+
+
+class TestCatalogChanges:
+    """Test applying product changes to catalog index."""
+
+    def test_updated_equal_to_rebuilt(
+        self,
+        products: List[Dict[str, Any]],
+    ) -> None:
+        """Test updated catalog equals rebuilt one position by position.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        catalog = CatalogIndex.from_records('old', products)
+        changed = [products[0]['id'], products[1]['id'], 10**6]
+        records = [
+            {'id': products[0]['id'], 'name': 'Новый гель для стирки'},
+            {'id': 10**6, 'name': 'Новое средство для мытья'},
+        ]
+        updated = catalog.updated('new', records, changed)
+        rebuilt = CatalogIndex.from_records(
+            'new',
+            records + [product for product in products[2:]],
+        )
+        assert updated.version == 'new'
+        assert updated.ids == rebuilt.ids
+        assert updated.names_processed == rebuilt.names_processed
+        assert updated.ngrams.postings.keys() == rebuilt.ngrams.postings.keys()
+        for ngram, positions in rebuilt.ngrams.postings.items():
+            assert np.array_equal(updated.ngrams.postings[ngram], positions)
+        assert products[1]['id'] not in updated.positions
+
+    async def test_apply_changes(
+        self,
+        products: List[Dict[str, Any]],
+    ) -> None:
+        """Test changes are applied in place and lost changes cause rebuild.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        manager = CatalogManager()
+        manager.listening = True
+        catalog = await manager.build()
+        assert manager.synchronized
+        updated = await manager.apply_changes(
+            [{'sequence': 6, 'ids': [products[0]['id']]}],
+        )
+        assert updated is not None and updated is not catalog
+        assert sorted(updated.ids) == sorted(catalog.ids)
+        late = await manager.apply_changes(
+            [{'sequence': 3, 'ids': [products[1]['id']]}],
+        )
+        assert late is not None and late is not updated
+        assert sorted(late.ids) == sorted(catalog.ids)
+        rebuilt = await manager.apply_changes([{'sequence': 9, 'ids': None}])
+        assert rebuilt is not None and rebuilt.names == catalog.names
+        manager.synchronized = False
+        rebuilt = await manager.apply_changes(
+            [{'sequence': 10, 'ids': [products[0]['id']]}],
+        )
+        assert rebuilt is not None and rebuilt.names == catalog.names
+        assert manager.synchronized
+
+    async def test_version_cached(self) -> None:
+        """Test fingerprint is cached until invalidated without index."""
+        manager = CatalogManager()
+        version = await manager.get_version()
+        manager.version = 'cached'
+        assert await manager.get_version() == 'cached'
+        await manager.apply_changes([{'sequence': 1, 'ids': [1]}])
+        assert await manager.get_version() == version
+
+    async def test_load_current_version(
+        self,
+        products: List[Dict[str, Any]],
+    ) -> None:
+        """Test stale catalog index is not used after loading.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        manager = CatalogManager()
+        manager.index = CatalogIndex.from_records('stale', products)
+        manager.checked_at = monotonic()
+        catalog = await manager.load()
+        assert catalog.version != 'stale'
+        assert catalog.version == await ProductDAO.get_catalog_version()
+
+    async def test_lost_connection(self) -> None:
+        """Test lost listening connection makes catalog not synchronized."""
+        listener = CatalogListener()
+        listener.lost = asyncio.Event()
+        listener.connection = connection = object()
+        listening = catalog_manager.listening
+        synchronized = catalog_manager.synchronized
+        links_listening = link_index.listening
+        catalog_manager.listening = catalog_manager.synchronized = True
+        link_index.listening = True
+        try:
+            listener.terminate(object())
+            assert not listener.lost.is_set()
+            assert catalog_manager.synchronized
+            listener.terminate(connection)
+            assert listener.lost.is_set()
+            assert not catalog_manager.listening
+            assert not catalog_manager.synchronized
+            assert not link_index.listening
+        finally:
+            catalog_manager.listening = listening
+            catalog_manager.synchronized = synchronized
+            link_index.listening = links_listening
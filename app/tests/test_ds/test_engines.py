@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from app.config import settings
+from app.ds.engines import MatchingEngine, ShadowScorer, engines, get_engine
+
+
+def get_fake_engine(
+    name: str,
+    solutions: List[List[Dict[str, Any]]],
+) -> MatchingEngine:
+    """Create engine returning fixed recommendations.
+
+    Args:
+        name: name of the engine.
+        solutions: recommendations returned by the engine.
+
+    Returns:
+        Matching engine.
+    """
+
+    async def get_solution(*args: Any) -> List[Dict[str, Any]]:
+        return solutions[0]
+
+    async def get_solutions(*args: Any) -> List[List[Dict[str, Any]]]:
+        return solutions
+
+    return MatchingEngine(name, get_solution, get_solutions, get_solution)
+
+
+class TestEngines:
+    """Test registry of the matching engines."""
+
+    def test_default_engine(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test default engine follows deployment settings.
+
+        Args:
+            monkeypatch: pytest fixture changing settings.
+        """
+        monkeypatch.setattr(settings, 'MATCHING_ENGINE', 'levenshtein')
+        monkeypatch.setattr(settings, 'CANDIDATES_RETRIEVAL', 'memory')
+        assert get_engine().name == 'levenshtein'
+        monkeypatch.setattr(settings, 'CANDIDATES_RETRIEVAL', 'database')
+        assert get_engine().name == 'trgm'
+        assert not get_engine().uses_catalog
+        assert get_engine('tfidf').name == 'tfidf'
+        with pytest.raises(KeyError):
+            get_engine('unknown')
+
+    async def test_shadow_scoring(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test shadow engine results are compared with primary ones.
+
+        Args:
+            monkeypatch: pytest fixture changing settings.
+        """
+        primary = get_fake_engine('primary', [])
+        shadow = get_fake_engine(
+            'shadow',
+            [[{'id': 1}, {'id': 3}], [{'id': 5}]],
+        )
+        monkeypatch.setitem(engines, 'shadow', shadow)
+        monkeypatch.setattr(settings, 'SHADOW_ENGINE', 'shadow')
+        monkeypatch.setattr(settings, 'SHADOW_SAMPLE_RATE', 1.0)
+        scorer = ShadowScorer()
+        scorer.submit(
+            primary,
+            [[{'id': 1}, {'id': 2}], [{'id': 4}]],
+            ['first', 'second'],
+            10,
+            50,
+        )
+        await asyncio.gather(*scorer.tasks)
+        metrics = scorer.metrics()
+        assert metrics['comparisons'] == 2
+        assert metrics['topAgreement'] == 0.5
+        assert metrics['topKOverlap'] == 0.25
+        assert shadow.metrics()['calls'] == 1
+        scorer.submit(shadow, [], [], 10, 50)
+        assert not scorer.tasks
+        monkeypatch.setattr(settings, 'SHADOW_SAMPLE_RATE', 0.0)
+        scorer.submit(primary, [], [], 10, 50)
+        assert not scorer.tasks
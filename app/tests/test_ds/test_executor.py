@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+import pytest
+
+from app.ds.catalog import CatalogIndex
+from app.ds.executor import MatchingExecutor
+
+
+def get_catalog(version: str, snapshot: Optional[str] = None) -> CatalogIndex:
+    """Create small catalog index.
+
+    Args:
+        version: fingerprint of the product table.
+        snapshot: path of the snapshot the index is loaded from.
+
+    Returns:
+        Catalog index.
+    """
+    catalog = CatalogIndex.from_records(
+        version,
+        [{'id': 1, 'name': 'Гель для стирки PROSEPT'}],
+    )
+    catalog.snapshot = snapshot
+    return catalog
+
+
+class TestMatchingExecutor:
+    """Test catalog changes of the process pool."""
+
+    async def test_switch_to_newer_catalog(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test pool follows only newer catalogs and reuses snapshots.
+
+        Args:
+            monkeypatch: pytest fixture replacing pool start.
+        """
+        executor = MatchingExecutor('process', 1)
+        started: List[str] = []
+
+        def start(catalog: CatalogIndex) -> None:
+            started.append(catalog.version)
+            executor.pool = object()  # type: ignore[assignment]
+            executor.use(catalog)
+
+        monkeypatch.setattr(executor, 'start', start)
+        old = get_catalog('old')
+        new = get_catalog('new')
+        await executor.switch(new)
+        await executor.switch(old)
+        assert started == ['new']
+        assert executor.version == 'new'
+        newest = get_catalog('newest', 'newest.snapshot')
+        await executor.switch(newest)
+        assert started == ['new']
+        assert executor.version == 'newest'
+        assert executor.snapshot == 'newest.snapshot'
+        await executor.switch(get_catalog('delta'))
+        assert started == ['new', 'delta']
@@ -0,0 +1,40 @@
+from time import monotonic
+
+from app.ds.links import LinkIndex
+
+
+class TestLinkIndex:
+    """Test index of confirmed dealer product links."""
+
+    def test_find_by_url_and_name(self) -> None:
+        """Test links are found by url first and then by name."""
+        links = LinkIndex()
+        links.add(1, 'Средство PROSEPT Bath, 0.5л', 'https://shop/1', 10)
+        links.add(1, 'Гель PROSEPT', None, 20)
+        assert links.find(1, 'другое имя', 'https://shop/1 ') == 10
+        assert links.find(1, 'средство prosept bath 0 5л', None) == 10
+        assert links.find(1, 'Гель  PROSEPT', 'https://shop/2') == 20
+        assert links.find(2, 'Гель PROSEPT', None) is None
+
+    def test_latest_link_wins(self) -> None:
+        """Test new choice replaces previous link."""
+        links = LinkIndex()
+        links.add(1, 'Гель PROSEPT', None, 20)
+        links.add(1, 'Гель PROSEPT', None, 30)
+        assert links.find(1, 'Гель PROSEPT', None) == 30
+
+    async def test_expired(self) -> None:
+        """Test index is loaded again when links may be missed."""
+        links = LinkIndex()
+        await links.update([1])
+        assert links.expired
+        links.loaded = links.listening = True
+        links.loaded_at = monotonic()
+        assert not links.expired
+        links.listening = False
+        assert not links.expired
+        links.loaded_at = 0.0
+        assert links.expired
+        links.listening = True
+        links.invalidate()
+        assert links.expired
@@ -0,0 +1,72 @@
+from typing import Any, Dict, List
+
+from app.config import settings
+from app.ds.catalog import CatalogIndex
+from app.ds.ngram import get_ngrams
+from app.ds.normalizer import (
+    full_process,
+    get_not_continuous_words_when_entering,
+)
+from app.ds.solution_v_2 import get_suitable_products
+from app.tests.test_ds.test_solution import brute_force
+
+
+class TestNgramIndex:
+    """Test candidate pruning with n-gram inverted index."""
+
+    def test_get_ngrams(self) -> None:
+        """Test splitting string into padded trigrams."""
+        assert get_ngrams('гель') == {' ге', 'гел', 'ель', 'ль '}
+        assert get_ngrams('a b') == {' a ', ' b '}
+        assert get_ngrams('') == set()
+
+    def test_candidates_limit(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test candidates are sorted and limited.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        for parsed_data_item in parsed_data:
+            query = full_process(parsed_data_item['product_name'])
+            for limit in (1, 5, 10):
+                candidates = catalog.ngrams.candidates(query, limit).tolist()
+                assert len(candidates) <= limit
+                assert candidates == sorted(candidates)
+
+    def test_pruned_top_matches_brute_force(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test top-k with pruned candidates is equal to full scan.
+
+        Only a quarter of the catalog are n-gram candidates.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        assert len(catalog) >= 4
+        default_limit = settings.NGRAM_CANDIDATES
+        settings.NGRAM_CANDIDATES = len(catalog) // 4
+        try:
+            for parsed_data_item in parsed_data:
+                dealer_product = get_not_continuous_words_when_entering(
+                    parsed_data_item['product_name'],
+                )
+                for length in (1, 10):
+                    assert get_suitable_products(
+                        dealer_product,
+                        catalog,
+                        50,
+                        length,
+                    ) == brute_force(dealer_product, catalog, 50, length)
+        finally:
+            settings.NGRAM_CANDIDATES = default_limit
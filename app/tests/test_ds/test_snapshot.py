@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.ds.catalog import CatalogIndex
+from app.ds.snapshot import get_current_snapshot, write_snapshot
+
+
+class TestSnapshot:
+    """Test memory mapped catalog snapshot."""
+
+    def test_snapshot_equal_to_catalog(
+        self,
+        products: List[Dict[str, Any]],
+        tmp_path: Path,
+    ) -> None:
+        """Test catalog loaded from snapshot is equal to the built one.
+
+        Args:
+            products: pytest fixture with products data.
+            tmp_path: pytest fixture with temporary directory.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        path = write_snapshot(catalog, str(tmp_path))
+        assert get_current_snapshot(str(tmp_path)) == path
+        loaded = CatalogIndex.from_snapshot(path)
+        assert loaded.version == catalog.version
+        assert loaded.snapshot == path
+        assert loaded.ids == catalog.ids
+        assert loaded.names == catalog.names
+        assert loaded.names_processed == catalog.names_processed
+        assert loaded.names_raw_processed == catalog.names_raw_processed
+        assert loaded.ngrams.postings.keys() == catalog.ngrams.postings.keys()
+        for ngram, positions in catalog.ngrams.postings.items():
+            assert np.array_equal(loaded.ngrams.postings[ngram], positions)
+
+    def test_snapshot_swap(
+        self,
+        products: List[Dict[str, Any]],
+        tmp_path: Path,
+    ) -> None:
+        """Test new snapshot becomes current and only two are kept.
+
+        Args:
+            products: pytest fixture with products data.
+            tmp_path: pytest fixture with temporary directory.
+        """
+        paths = [
+            write_snapshot(
+                CatalogIndex.from_records(version, products),
+                str(tmp_path),
+            )
+            for version in ('first', 'second', 'third')
+        ]
+        assert get_current_snapshot(str(tmp_path)) == paths[-1]
+        assert not os.path.exists(paths[0])
+        assert os.path.exists(paths[1])
@@ -0,0 +1,185 @@
+from typing import Any, Dict, List
+
+from fuzzywuzzy import fuzz, utils
+
+from app.config import settings
+from app.ds.catalog import CatalogIndex
+from app.ds.normalizer import (
+    full_process,
+    get_not_continuous_words_when_entering,
+)
+from app.ds.scoring import extract, pruning_counters, score_matrix
+from app.ds.solution_v_2 import get_cache_key, get_suitable_products
+
+
+def brute_force(
+    dealer_product: str,
+    catalog: CatalogIndex,
+    levenshtein_distance_max: int,
+    length: int,
+) -> List[Dict[str, Any]]:
+    """Score dealer product against every product with fuzzywuzzy.
+
+    Args:
+        dealer_product: preprocessed product sold by dealer.
+        catalog: index of the manufacturer products.
+        levenshtein_distance_max: minimum score of suitable product.
+        length: length of the list of recommended products.
+
+    Returns:
+        Suitable products in descending order of score.
+    """
+    suitable_products = []
+    for product_id, name, name_split in zip(
+        catalog.ids,
+        catalog.names,
+        catalog.names_split,
+    ):
+        l_d = fuzz.token_sort_ratio(dealer_product, name_split)
+        if l_d >= levenshtein_distance_max:
+            suitable_products.append(
+                {
+                    'id': product_id,
+                    'product_name': name,
+                    'levenshtein_distance': l_d,
+                },
+            )
+    return sorted(
+        suitable_products,
+        key=lambda x: x['levenshtein_distance'],
+        reverse=True,
+    )[:length]
+
+
+class TestSolution:
+    """Test matching of dealer products with manufacturer products."""
+
+    def test_batch_scoring_matches_brute_force(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test batch top-k scoring returns the same as per-row loop.
+
+        N-gram pruning is disabled, so only the batch scorer is checked.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        default_limit = settings.NGRAM_CANDIDATES
+        settings.NGRAM_CANDIDATES = 0
+        try:
+            for parsed_data_item in parsed_data:
+                dealer_product = get_not_continuous_words_when_entering(
+                    parsed_data_item['product_name'],
+                )
+                for length in (1, 5, 10):
+                    assert get_suitable_products(
+                        dealer_product,
+                        catalog,
+                        50,
+                        length,
+                    ) == brute_force(dealer_product, catalog, 50, length)
+        finally:
+            settings.NGRAM_CANDIDATES = default_limit
+
+    def test_cache_key_without_pruning_limit(
+        self,
+        products: List[Dict[str, Any]],
+    ) -> None:
+        """Test n-gram pruning limit does not split cached rankings.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        default_limit = settings.NGRAM_CANDIDATES
+        try:
+            settings.NGRAM_CANDIDATES = 0
+            key = get_cache_key(catalog, 'Гель PROSEPT', 50)
+            settings.NGRAM_CANDIDATES = len(catalog) // 4
+            assert get_cache_key(catalog, 'гель  prosept', 50) == key
+        finally:
+            settings.NGRAM_CANDIDATES = default_limit
+
+    def test_latin_characters_removed(self) -> None:
+        """Test characters removed by fuzzywuzzy do not change scores."""
+        dealer_product = 'Гель «PROSEPT» 0,5 л × 2 шт, 20°C, café\xa0bath'
+        product = 'гель prosept 0 5 л 2 шт 20c cafe bath'
+        assert full_process(dealer_product) == utils.full_process(
+            dealer_product,
+            force_ascii=True,
+        )
+        assert score_matrix(
+            [full_process(dealer_product)],
+            [full_process(product)],
+            0,
+        )[0][0] == fuzz.token_sort_ratio(dealer_product, product)
+        assert (
+            score_matrix(
+                [full_process('abc«def')],
+                [full_process('abcdef')],
+                0,
+            )[0][0]
+            == 100
+        )
+
+    def test_upper_bounds(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test upper bounds are not below the scores.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        for parsed_data_item in parsed_data:
+            query = full_process(parsed_data_item['product_name'])
+            assert (
+                catalog.bounds.upper(query)
+                >= score_matrix([query], catalog.names_processed, 0)[0]
+            ).all()
+
+    def test_score_bounds_keep_results(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test pruning by score bounds does not change selected products.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        candidates = pruning_counters.candidates
+        for parsed_data_item in parsed_data:
+            query = full_process(
+                get_not_continuous_words_when_entering(
+                    parsed_data_item['product_name'],
+                ),
+            )
+            for score_cutoff, length in ((0, 10), (50, 1), (50, 10), (90, 5)):
+                assert extract(
+                    query,
+                    catalog.names_processed,
+                    score_cutoff,
+                    length,
+                    catalog.bounds,
+                ) == extract(
+                    query,
+                    catalog.names_processed,
+                    score_cutoff,
+                    length,
+                )
+        metrics = pruning_counters.metrics()
+        assert metrics['candidates'] > candidates
+        assert metrics['candidates'] == sum(
+            metrics[stage]
+            for stage in ('length', 'histogram', 'heap', 'scored')
+        )
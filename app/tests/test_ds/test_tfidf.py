@@ -0,0 +1,71 @@
+from typing import Any, Dict, List
+
+from app.ds.catalog import CatalogIndex
+from app.ds.normalizer import get_not_continuous_words_when_entering
+from app.ds.solution_tfidf import (
+    get_suitable_products,
+    get_suitable_products_many,
+)
+
+
+class TestTfidf:
+    """Test TF-IDF matching engine."""
+
+    def test_product_name_is_top_match(
+        self,
+        products: List[Dict[str, Any]],
+    ) -> None:
+        """Test manufacturer product is found by its own name.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        for product in products:
+            if not product['name']:
+                continue
+            solution = get_suitable_products(
+                get_not_continuous_words_when_entering(product['name']),
+                catalog,
+                50,
+                10,
+            )
+            assert solution[0]['levenshtein_distance'] == 100
+            assert product['id'] in [
+                item['id']
+                for item in solution
+                if item['levenshtein_distance'] == 100
+            ]
+
+    def test_many_equal_to_single(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test batch scoring returns the same ranked lists.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        dealer_products = [
+            get_not_continuous_words_when_entering(item['product_name'])
+            for item in parsed_data
+        ]
+        solutions = get_suitable_products_many(dealer_products, catalog, 0, 5)
+        for dealer_product, solution in zip(dealer_products, solutions):
+            assert len(solution) <= 5
+            scores = [item['levenshtein_distance'] for item in solution]
+            assert scores == sorted(scores, reverse=True)
+            assert solution == get_suitable_products(
+                dealer_product,
+                catalog,
+                0,
+                5,
+            )
+
+    def test_empty_catalog(self) -> None:
+        """Test empty catalog has no recommendations."""
+        catalog = CatalogIndex.from_records('test', [])
+        assert get_suitable_products('гель', catalog, 0, 10) == []
@@ -0,0 +1,55 @@
+from typing import Any, Dict, List
+
+from app.ds.catalog import CatalogIndex
+from app.ds.normalizer import (
+    get_not_continuous_words_when_entering,
+    normalize_product_name,
+)
+from app.ds.solution_trgm import rescore_candidates
+from app.ds.solution_v_2 import get_suitable_products
+
+
+class TestTrigramRetrieval:
+    """Test scoring of candidates retrieved by database."""
+
+    def test_normalized_names(self, products: List[Dict[str, Any]]) -> None:
+        """Test stored normalized names are equal to catalog names.
+
+        Args:
+            products: pytest fixture with products data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        assert [
+            normalize_product_name(name) for name in catalog.names
+        ] == catalog.names_processed
+
+    def test_rescore_whole_catalog(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test rescoring all products is equal to in-memory matching.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        catalog = CatalogIndex.from_records('test', products)
+        candidates = [
+            {'id': id, 'name': name, 'name_normalized': normalized}
+            for id, name, normalized in zip(
+                catalog.ids,
+                catalog.names,
+                catalog.names_processed,
+            )
+        ]
+        for parsed_data_item in parsed_data[:20]:
+            dealer_product = get_not_continuous_words_when_entering(
+                parsed_data_item['product_name'],
+            )
+            assert rescore_candidates(
+                dealer_product,
+                candidates,
+                50,
+                10,
+            ) == get_suitable_products(dealer_product, catalog, 50, 10)
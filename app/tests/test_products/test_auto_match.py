@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from app.products.commands import auto_match
+from app.products.commands.auto_match import (
+    read_checkpoint,
+    select_match,
+    write_checkpoint,
+)
+
+
+def test_select_match() -> None:
+    """Test only confident and unambiguous matches are selected."""
+    assert select_match([], 95) is None
+    assert select_match([{'id': 1, 'levenshtein_distance': 94}], 95) is None
+    assert select_match([{'id': 1, 'levenshtein_distance': 95}], 95) == 1
+    assert (
+        select_match(
+            [
+                {'id': 1, 'levenshtein_distance': 100},
+                {'id': 2, 'levenshtein_distance': 100},
+            ],
+            95,
+        )
+        is None
+    )
+    assert (
+        select_match(
+            [
+                {'id': 1, 'levenshtein_distance': 100},
+                {'id': 2, 'levenshtein_distance': 97},
+            ],
+            95,
+        )
+        == 1
+    )
+
+
+def test_checkpoint(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test checkpoint is used only for the same catalog and threshold.
+
+    Args:
+        tmp_path: pytest fixture with temporary directory.
+        monkeypatch: pytest fixture for patching.
+    """
+    monkeypatch.setattr(
+        auto_match,
+        'AUTO_MATCH_CHECKPOINT',
+        str(tmp_path / 'checkpoint.json'),
+    )
+    assert read_checkpoint('version', 95) == 0
+    write_checkpoint('version', 95, 42)
+    assert read_checkpoint('version', 95) == 42
+    assert read_checkpoint('other', 95) == 0
+    assert read_checkpoint('version', 90) == 0
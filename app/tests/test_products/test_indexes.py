@@ -0,0 +1,146 @@
+from datetime import date
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker, engine
+from app.products.dao import ParsedProductDealerDAO, StatisticsDAO
+
+SEED_DEALERS = 200
+SEED_ITEMS = 100000
+
+
+async def seed(session: AsyncSession) -> int:
+    """Add dealers with parsing data and statistics.
+
+    Args:
+        session: session rolled back after the test.
+
+    Returns:
+        Id of the seeded dealer.
+    """
+    await session.execute(
+        text(
+            'INSERT INTO marketing_dealer (name) '
+            "SELECT 'seed dealer ' || i FROM generate_series(1, :dealers) i",
+        ),
+        {'dealers': SEED_DEALERS},
+    )
+    dealer_id = (
+        await session.execute(
+            text(
+                'SELECT min(id) FROM marketing_dealer '
+                "WHERE name LIKE 'seed dealer %'",
+            ),
+        )
+    ).scalar_one()
+    await session.execute(
+        text(
+            'INSERT INTO marketing_dealerprice '
+            '(price, product_name, date, dealer_id) '
+            "SELECT 1, 'seed product ' || i, "
+            "DATE '2020-01-01' + i % 1000, :dealer_id + i % :dealers "
+            'FROM generate_series(1, :items) i',
+        ),
+        {
+            'dealer_id': dealer_id,
+            'dealers': SEED_DEALERS,
+            'items': SEED_ITEMS,
+        },
+    )
+    await session.execute(
+        text(
+            'INSERT INTO marketing_statistics '
+            '(parsed_data_id, successfull, skipped) '
+            'SELECT id, id % 10 = 0, id % 10 = 1 FROM marketing_dealerprice '
+            "WHERE product_name LIKE 'seed product %'",
+        ),
+    )
+    for table in ('marketing_dealerprice', 'marketing_statistics'):
+        await session.execute(text(f'ANALYZE {table}'))
+    return dealer_id
+
+
+def get_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Walk the plan tree.
+
+    Args:
+        plan: plan node of EXPLAIN in JSON format.
+
+    Yields:
+        Plan nodes.
+    """
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from get_nodes(child)
+
+
+async def get_plan_nodes(
+    session: AsyncSession,
+    statements: List[Tuple[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Explain the statements.
+
+    Args:
+        session: session with seeded data.
+        statements: executed statements with parameters.
+
+    Returns:
+        Plan nodes of all statements.
+    """
+    connection = await session.connection()
+    nodes: List[Dict[str, Any]] = []
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            f'EXPLAIN (FORMAT JSON) {statement}',
+            parameters,
+        )
+        nodes.extend(get_nodes(result.scalar_one()[0]['Plan']))
+    return nodes
+
+
+async def test_dealer_queries_use_indexes() -> None:
+    """Test dealer listing and statistics do not scan whole tables.
+
+    Parsing data is found by the dealer indexes, statistics
+    are found by the unique parsing data id.
+    """
+    async with async_session_maker() as session:
+        dealer_id = await seed(session)
+        statements: List[Tuple[str, Any]] = []
+
+        def capture(*args: Any) -> None:
+            statements.append((args[2], args[3]))
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+        try:
+            await ParsedProductDealerDAO.product_list(
+                date(2020, 3, 1),
+                date(2021, 3, 1),
+                dealer_id,
+                page=2,
+                limit=50,
+                session=session,
+            )
+            await StatisticsDAO.get_dealer_stat(
+                dealer_id,
+                date(2020, 3, 1),
+                date(2021, 3, 1),
+                session,
+            )
+        finally:
+            event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+        nodes = await get_plan_nodes(session, statements)
+        scans = [
+            (node['Node Type'], node['Relation Name'])
+            for node in nodes
+            if 'Relation Name' in node
+        ]
+        indexes = {
+            node['Index Name'] for node in nodes if 'Index Name' in node
+        }
+        assert ('Seq Scan', 'marketing_dealerprice') not in scans
+        assert ('Seq Scan', 'marketing_statistics') not in scans
+        assert 'ix_marketing_dealerprice_dealer_id_date' in indexes
+        assert 'marketing_statistics_parsed_data_id_key' in indexes
@@ -1,6 +1,16 @@
 from typing import Any, Dict, List
 
-from app.products.dao import ProductDAO, ProductDealerDAO, StatisticsDAO
+from app.database import async_session_maker
+from app.ds.normalizer import normalize_dealer_name, normalize_product_name
+from app.products.dao import (
+    DealerNameDAO,
+    ParsedProductDealerDAO,
+    ProductDAO,
+    ProductDealerDAO,
+    RecommendationDAO,
+    StatisticsDAO,
+)
+from app.products.utils import generate_product_dealer_key, get_name_ids
 
 
 async def test_get_product_ids_names(products: List[Dict[str, Any]]) -> None:
@@ -18,6 +28,22 @@ async def test_get_product_ids_names(products: List[Dict[str, Any]]) -> None:
         assert set(id_name.keys()) == {'id', 'name'}
 
 
+async def test_create_product_normalizes_name() -> None:
+    """Test products are created with normalized names."""
+    id = max(await ProductDAO.get_ids()) + 1
+    name = 'Средство для мытья полов PROSEPT Multipower 1л'
+    async with async_session_maker() as session:
+        await ProductDAO.create(
+            session,
+            id=id,
+            article=f'test-{id}',
+            name=name,
+        )
+        product = await ProductDAO.find_by_id(id, session)
+        assert product.name_normalized == normalize_product_name(name)
+        assert not await ProductDAO.get_not_normalized([id], session)
+
+
 class TestProductDealerKeys:
     """TestClass for testing DAO functions with product-dealer keys."""
 
@@ -76,6 +102,55 @@ class TestProductDealerKeys:
             )
             assert found_key == product_dealer_item['key']
 
+    async def test_get_keys_by_pairs(
+        self,
+        product_dealer: List[Dict[str, Any]],
+    ) -> None:
+        """Test getting keys of many dealer and product pairs.
+
+        Args:
+            product_dealer: pytest fixrute with product-dealer data.
+        """
+        keys = await ProductDealerDAO.get_keys_by_pairs(
+            [
+                (item['dealer_id'], item['product_id'])
+                for item in product_dealer
+            ]
+            + [(0, 0)],
+        )
+        assert keys == {
+            (item['dealer_id'], item['product_id']): item['key']
+            for item in product_dealer
+        }
+
+    async def test_create_keys(
+        self,
+        product_dealer: List[Dict[str, Any]],
+    ) -> None:
+        """Test creating keys skips pairs which already have keys.
+
+        Args:
+            product_dealer: pytest fixrute with product-dealer data.
+        """
+        dealer_id = product_dealer[0]['dealer_id']
+        existing = (dealer_id, product_dealer[0]['product_id'])
+        linked = {
+            item['product_id']
+            for item in product_dealer
+            if item['dealer_id'] == dealer_id
+        }
+        product_id = next(
+            product_id
+            for product_id in await ProductDAO.get_ids()
+            if product_id not in linked
+        )
+        async with async_session_maker() as session:
+            maximum_key = await ProductDealerDAO.get_max_key(session)
+            assert await ProductDealerDAO.create_keys(
+                [existing, (dealer_id, product_id)],
+                session,
+            ) == {(dealer_id, product_id): maximum_key + 2}
+
 
 class TestStatisticsDAO:
     """TestClass for statistics DAO."""
@@ -114,3 +189,245 @@ class TestStatisticsDAO:
             )
             assert statistic_item.successfull is True
             assert statistic_item.skipped is False
+
+    async def test_success_many(
+        self,
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test changing successfull parameter of many items.
+
+        Args:
+            parsed_data: pytest fixture with parsed data.
+        """
+        ids = [parsed_data_item['id'] for parsed_data_item in parsed_data]
+        await StatisticsDAO.update_success_many(ids)
+        for parsed_data_item_id in ids:
+            statistic_item = await StatisticsDAO.find_one_or_none(
+                parsed_data_id=parsed_data_item_id,
+            )
+            assert statistic_item.successfull is True
+            assert statistic_item.skipped is False
+
+    async def test_unmatched_not_skipped(
+        self,
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test parsing data skipped by operator is not auto matched.
+
+        Args:
+            parsed_data: pytest fixture with parsed data.
+        """
+        async with async_session_maker() as session:
+            unmatched = await ParsedProductDealerDAO.get_unmatched(
+                0,
+                len(parsed_data),
+                session,
+            )
+            assert unmatched
+            await StatisticsDAO.update_skip(unmatched[0]['id'], session)
+            await StatisticsDAO.update_success_many(
+                [unmatched[0]['id']],
+                session,
+            )
+            statistic_item = await StatisticsDAO.find_one_or_none(
+                session,
+                parsed_data_id=unmatched[0]['id'],
+            )
+            assert statistic_item.skipped is True
+            assert [
+                item['id']
+                for item in await ParsedProductDealerDAO.get_unmatched(
+                    0,
+                    len(parsed_data),
+                    session,
+                )
+            ] == [item['id'] for item in unmatched[1:]]
+
+    async def test_update_keys_not_chosen(
+        self,
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test keys are set only for items not linked or skipped.
+
+        Args:
+            parsed_data: pytest fixture with parsed data.
+        """
+        async with async_session_maker() as session:
+            unmatched = await ParsedProductDealerDAO.get_unmatched(
+                0,
+                len(parsed_data),
+                session,
+            )
+            assert len(unmatched) > 2
+            key = await ProductDealerDAO.get_max_key(session)
+            skipped, chosen, free = (item['id'] for item in unmatched[:3])
+            await StatisticsDAO.update_skip(skipped, session)
+            await ParsedProductDealerDAO.update_key(chosen, key, session)
+            updated = await ParsedProductDealerDAO.update_keys(
+                {skipped: key, chosen: key, free: key},
+                session,
+            )
+            assert updated == [free]
+            for id in (skipped, free):
+                parsed_data_model = await ParsedProductDealerDAO.find_by_id(
+                    id,
+                    session,
+                )
+                assert parsed_data_model.product_key == (
+                    key if id == free else None
+                )
+
+
+class TestChooseProduct:
+    """TestClass for choosing product in one statement."""
+
+    async def test_choose_new_pair(
+        self,
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test choosing product without key of the pair.
+
+        Args:
+            parsed_data: pytest fixture with parsed data.
+        """
+        parsed_data_item = parsed_data[0]
+        dealer_id = parsed_data_item['dealer_id']
+        product_ids = await ProductDAO.get_ids()
+        linked = await ProductDealerDAO.get_keys_by_pairs(
+            [(dealer_id, product_id) for product_id in product_ids],
+        )
+        product_id = next(
+            product_id
+            for product_id in product_ids
+            if (dealer_id, product_id) not in linked
+        )
+        key = await generate_product_dealer_key()
+        async with async_session_maker() as session:
+            chosen = await ParsedProductDealerDAO.choose_product(
+                parsed_data_item['id'],
+                product_id,
+                session,
+            )
+            assert chosen is not None
+            assert chosen['product_id'] == product_id
+            assert chosen['key'] == key
+            assert (
+                await ProductDealerDAO.get_key(
+                    product_id,
+                    dealer_id,
+                    session=session,
+                )
+                == key
+            )
+            parsed_data_model = await ParsedProductDealerDAO.find_by_id(
+                parsed_data_item['id'],
+                session,
+            )
+            assert parsed_data_model.product_key == key
+
+    async def test_choose_not_existing(
+        self,
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test choosing not existing product or parsing data.
+
+        Args:
+            parsed_data: pytest fixture with parsed data.
+        """
+        product_id = max(await ProductDAO.get_ids()) + 1
+        async with async_session_maker() as session:
+            chosen = await ParsedProductDealerDAO.choose_product(
+                parsed_data[0]['id'],
+                product_id,
+                session,
+            )
+            assert chosen is not None
+            assert chosen['product_id'] is None
+            assert not await ProductDealerDAO.find_one_or_none(
+                session,
+                product_id=product_id,
+            )
+            assert (
+                await ParsedProductDealerDAO.choose_product(
+                    max(item['id'] for item in parsed_data) + 1,
+                    product_id,
+                    session,
+                )
+                is None
+            )
+
+
+class TestRecommendationDAO:
+    """TestClass for precomputed recommendations DAO."""
+
+    async def test_recommendations_by_version(
+        self,
+        products: List[Dict[str, Any]],
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test reading and invalidating precomputed recommendations.
+
+        Args:
+            products: pytest fixture with products data.
+            parsed_data: pytest fixture with parsed data.
+        """
+        parsed_data_id = parsed_data[0]['id']
+        name_id = (await get_name_ids(parsed_data[:1]))[0]
+        await ParsedProductDealerDAO.update_name_ids({parsed_data_id: name_id})
+        await RecommendationDAO.create_many(
+            [
+                {
+                    'name_id': name_id,
+                    'product_id': product['id'],
+                    'score': 100 - rank,
+                    'rank': rank,
+                    'catalog_version': 'old',
+                }
+                for rank, product in enumerate(reversed(products[:3]))
+            ],
+        )
+        recommendations = await RecommendationDAO.get_recommendations(
+            parsed_data_id,
+            'old',
+            2,
+        )
+        assert [item['id'] for item in recommendations] == [
+            product['id'] for product in reversed(products[1:3])
+        ]
+        assert recommendations[0]['product_name'] == products[2]['name']
+        assert recommendations[0]['levenshtein_distance'] == 100
+        assert not await RecommendationDAO.get_recommendations(
+            parsed_data_id,
+            'new',
+            2,
+        )
+        await RecommendationDAO.delete_stale('new')
+        assert not await RecommendationDAO.get_recommendations(
+            parsed_data_id,
+            'old',
+            2,
+        )
+
+
+class TestDealerNameDAO:
+    """TestClass for normalized dealer names DAO."""
+
+    async def test_get_name_ids(
+        self,
+        parsed_data: List[Dict[str, Any]],
+    ) -> None:
+        """Test equal normalized names of a dealer share one id.
+
+        Args:
+            parsed_data: pytest fixture with parsed data.
+        """
+        items = parsed_data[:20]
+        name_ids = await get_name_ids(items)
+        assert await get_name_ids(items) == name_ids
+        names = [
+            (item['dealer_id'], normalize_dealer_name(item['product_name']))
+            for item in items
+        ]
+        assert len(set(name_ids)) == len(set(names))
+        for name, name_id in zip(names, name_ids):
+            assert (await DealerNameDAO.get_name_ids([name]))[name] == name_id
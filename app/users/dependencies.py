@@ -3,8 +3,10 @@ from typing import Awaitable
 
 from fastapi import Depends, Request
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import TOKEN_NAME, logger, settings
+from app.database import get_session
 from app.users.dao import UserDAO
 from app.users.exceptions import (
     NoTokenException,
@@ -35,11 +37,15 @@ def get_token(request: Request) -> str:
     return token
 
 
-async def get_current_user(token: str = Depends(get_token)) -> Awaitable[User]:
+async def get_current_user(
+    token: str = Depends(get_token),
+    session: AsyncSession = Depends(get_session),
+) -> Awaitable[User]:
     """Get the current user from a request.
 
     Args:
         token: transferred token.
+        session: request session.
 
     Returns:
         User object from database.
@@ -68,7 +74,7 @@ async def get_current_user(token: str = Depends(get_token)) -> Awaitable[User]:
     if not user_id:
         logger.error(UserInfoNotFoundException.detail)
         raise UserInfoNotFoundException
-    user = await UserDAO.find_by_id(int(user_id))
+    user = await UserDAO.find_by_id(int(user_id), session)
     if not user:
         logger.error(WrongUserInfoException.detail)
         raise WrongUserInfoException